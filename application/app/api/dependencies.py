@@ -1,13 +1,16 @@
 """API dependencies for dependency injection."""
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Generator, AsyncGenerator
 
 from app.services.database import db_service
 from app.services.device_service import DeviceService
 from app.services.telemetry_service import TelemetryService
 from app.services.alert_service import AlertService
+from app.services.async_services import AsyncDeviceService, AsyncTelemetryService, AsyncAlertService
 from app.services.ml_service import ml_service
+from app.services.ml_executor import ml_executor
 from app.services.mqtt_service import mqtt_service
 
 
@@ -20,6 +23,15 @@ def get_db() -> Generator[Session, None, None]:
         db_service.close_session(session)
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session."""
+    session = db_service.get_async_session()
+    try:
+        yield session
+    finally:
+        await db_service.close_async_session(session)
+
+
 def get_device_service(db: Session = Depends(get_db)) -> DeviceService:
     """Get device service."""
     return DeviceService(db)
@@ -35,11 +47,31 @@ def get_alert_service(db: Session = Depends(get_db)) -> AlertService:
     return AlertService(db)
 
 
+def get_async_device_service(db: AsyncSession = Depends(get_async_db)) -> AsyncDeviceService:
+    """Get async device service."""
+    return AsyncDeviceService(db)
+
+
+def get_async_telemetry_service(db: AsyncSession = Depends(get_async_db)) -> AsyncTelemetryService:
+    """Get async telemetry service."""
+    return AsyncTelemetryService(db)
+
+
+def get_async_alert_service(db: AsyncSession = Depends(get_async_db)) -> AsyncAlertService:
+    """Get async alert service."""
+    return AsyncAlertService(db)
+
+
 def get_ml_service():
     """Get ML service."""
     return ml_service
 
 
+def get_ml_executor():
+    """Get ML inference executor."""
+    return ml_executor
+
+
 def get_mqtt_service():
     """Get MQTT service."""
     return mqtt_service
@@ -1,13 +1,15 @@
 """Alert management API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import Optional, List
+from datetime import datetime, timedelta
 
-from app.services.alert_service import AlertService
+from app.services.async_services import AsyncAlertService
 from app.schemas.alert import (
     AlertCreate, AlertUpdate, AlertResponse, AlertListResponse,
     AlertType, AlertSeverity, AlertStatus
 )
-from app.api.dependencies import get_alert_service
+from app.schemas.pagination import TotalMode
+from app.api.dependencies import get_async_alert_service
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
@@ -15,11 +17,11 @@ router = APIRouter(prefix="/alerts", tags=["alerts"])
 @router.post("/", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
 async def create_alert(
     alert_data: AlertCreate,
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Create a new alert."""
     try:
-        alert = alert_service.create_alert(alert_data)
+        alert = await alert_service.create_alert(alert_data)
         return alert
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -33,21 +35,27 @@ async def list_alerts(
     alert_type: Optional[AlertType] = Query(None, description="Filter by alert type"),
     severity: Optional[AlertSeverity] = Query(None, description="Filter by severity"),
     status: Optional[AlertStatus] = Query(None, description="Filter by status"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     page_size: int = Query(50, ge=1, le=200, description="Page size"),
-    alert_service: AlertService = Depends(get_alert_service)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    total: TotalMode = Query(TotalMode.EXACT, description="Return an exact, estimated or no total"),
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """List alerts with filtering and pagination."""
     try:
-        result = alert_service.list_alerts(
+        result = await alert_service.list_alerts(
             device_id=device_id,
             alert_type=alert_type,
             severity=severity,
             status=status,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to list alerts")
 
@@ -55,11 +63,11 @@ async def list_alerts(
 @router.get("/active", response_model=List[AlertResponse])
 async def get_active_alerts(
     device_id: Optional[str] = Query(None, description="Filter by device ID"),
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Get active alerts."""
     try:
-        alerts = alert_service.get_active_alerts(device_id=device_id)
+        alerts = await alert_service.get_active_alerts(device_id=device_id)
         return alerts
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get active alerts")
@@ -67,11 +75,11 @@ async def get_active_alerts(
 
 @router.get("/critical", response_model=List[AlertResponse])
 async def get_critical_alerts(
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Get critical alerts."""
     try:
-        alerts = alert_service.get_critical_alerts()
+        alerts = await alert_service.get_critical_alerts()
         return alerts
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get critical alerts")
@@ -80,10 +88,10 @@ async def get_critical_alerts(
 @router.get("/{alert_id}", response_model=AlertResponse)
 async def get_alert(
     alert_id: str,
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Get alert by ID."""
-    alert = alert_service.get_alert(alert_id)
+    alert = await alert_service.get_alert(alert_id)
     if not alert:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
     return alert
@@ -93,10 +101,10 @@ async def get_alert(
 async def update_alert(
     alert_id: str,
     alert_data: AlertUpdate,
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Update alert status."""
-    alert = alert_service.update_alert(alert_id, alert_data)
+    alert = await alert_service.update_alert(alert_id, alert_data)
     if not alert:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
     return alert
@@ -105,80 +113,45 @@ async def update_alert(
 @router.patch("/{alert_id}/acknowledge", response_model=AlertResponse)
 async def acknowledge_alert(
     alert_id: str,
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Acknowledge an alert."""
-    success = alert_service.acknowledge_alert(alert_id)
+    success = await alert_service.acknowledge_alert(alert_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found or already acknowledged")
     
     # Return updated alert
-    alert = alert_service.get_alert(alert_id)
+    alert = await alert_service.get_alert(alert_id)
     return alert
 
 
 @router.patch("/{alert_id}/resolve", response_model=AlertResponse)
 async def resolve_alert(
     alert_id: str,
-    alert_service: AlertService = Depends(get_alert_service)
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Resolve an alert."""
-    success = alert_service.resolve_alert(alert_id)
+    success = await alert_service.resolve_alert(alert_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found or already resolved")
     
     # Return updated alert
-    alert = alert_service.get_alert(alert_id)
+    alert = await alert_service.get_alert(alert_id)
     return alert
 
 
 @router.get("/{device_id}/summary")
 async def get_device_alert_summary(
     device_id: str,
-    alert_service: AlertService = Depends(get_alert_service)
+    hours: Optional[int] = Query(None, ge=1, description="Only count alerts from the last N hours"),
+    alert_service: AsyncAlertService = Depends(get_async_alert_service)
 ):
     """Get alert summary for a device."""
     try:
-        # Get all alerts for device
-        all_alerts = alert_service.list_alerts(device_id=device_id, page_size=1000)
-        
-        # Calculate summary statistics
-        total_alerts = all_alerts.total
-        active_alerts = sum(1 for alert in all_alerts.alerts if alert.status == AlertStatus.ACTIVE)
-        acknowledged_alerts = sum(1 for alert in all_alerts.alerts if alert.status == AlertStatus.ACKNOWLEDGED)
-        resolved_alerts = sum(1 for alert in all_alerts.alerts if alert.status == AlertStatus.RESOLVED)
-        
-        # Count by severity
-        critical_count = sum(1 for alert in all_alerts.alerts if alert.severity == AlertSeverity.CRITICAL)
-        high_count = sum(1 for alert in all_alerts.alerts if alert.severity == AlertSeverity.HIGH)
-        medium_count = sum(1 for alert in all_alerts.alerts if alert.severity == AlertSeverity.MEDIUM)
-        low_count = sum(1 for alert in all_alerts.alerts if alert.severity == AlertSeverity.LOW)
-        
-        # Count by type
-        drone_detected_count = sum(1 for alert in all_alerts.alerts if alert.alert_type == AlertType.DRONE_DETECTED)
-        anomaly_count = sum(1 for alert in all_alerts.alerts if alert.alert_type == AlertType.ANOMALY)
-        system_error_count = sum(1 for alert in all_alerts.alerts if alert.alert_type == AlertType.SYSTEM_ERROR)
-        device_offline_count = sum(1 for alert in all_alerts.alerts if alert.alert_type == AlertType.DEVICE_OFFLINE)
+        start_time = datetime.utcnow() - timedelta(hours=hours) if hours else None
         
-        return {
-            "device_id": device_id,
-            "total_alerts": total_alerts,
-            "active_alerts": active_alerts,
-            "acknowledged_alerts": acknowledged_alerts,
-            "resolved_alerts": resolved_alerts,
-            "severity_breakdown": {
-                "critical": critical_count,
-                "high": high_count,
-                "medium": medium_count,
-                "low": low_count
-            },
-            "type_breakdown": {
-                "drone_detected": drone_detected_count,
-                "anomaly": anomaly_count,
-                "system_error": system_error_count,
-                "device_offline": device_offline_count
-            }
-        }
+        # Exact counts from a single aggregate query
+        return await alert_service.get_alert_summary(device_id, start_time=start_time)
         
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get alert summary")
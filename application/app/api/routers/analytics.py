@@ -2,13 +2,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
 from typing import Optional, Dict, Any
 import logging
+import uuid
 
 from app.services.ml_service import MLService
+from app.services.ml_executor import MLExecutor
 from app.services.telemetry_service import TelemetryService
 from app.services.alert_service import AlertService
 from app.schemas.telemetry import ProcessingResult
 from app.schemas.alert import AlertCreate, AlertType, AlertSeverity
-from app.api.dependencies import get_ml_service, get_telemetry_service, get_alert_service
+from app.api.dependencies import get_ml_service, get_ml_executor, get_telemetry_service, get_alert_service
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -19,7 +21,7 @@ logger = logging.getLogger(__name__)
 async def process_audio_file(
     audio_file: UploadFile = File(..., description="Audio file to process"),
     device_id: str = Form(..., description="Device ID"),
-    ml_service: MLService = Depends(get_ml_service)
+    ml_executor: MLExecutor = Depends(get_ml_executor)
 ):
     """Process audio file for drone detection."""
     try:
@@ -33,8 +35,8 @@ async def process_audio_file(
         # Read audio data
         audio_data = await audio_file.read()
         
-        # Process with ML service
-        result = ml_service.process_audio_data(audio_data, 22050)  # Default sample rate
+        # Process in the ML worker pool, off the event loop
+        result = await ml_executor.process_audio_data_async(audio_data, 22050)  # Default sample rate
         
         logger.info(f"Audio processing completed for device {device_id}: "
                    f"drone_detected={result.is_drone_detected}, "
@@ -65,16 +67,14 @@ async def trigger_audio_processing(
     device_id: Optional[str] = Query(None, description="Process audio for specific device"),
     telemetry_service: TelemetryService = Depends(get_telemetry_service),
     alert_service: AlertService = Depends(get_alert_service),
-    ml_service: MLService = Depends(get_ml_service)
+    ml_executor: MLExecutor = Depends(get_ml_executor)
 ):
     """Manually trigger audio processing for unprocessed data."""
     try:
-        # Get unprocessed audio data
-        unprocessed_data = telemetry_service.get_unprocessed_audio_data(limit=10)
-        
-        if device_id:
-            # Filter by device if specified
-            unprocessed_data = [d for d in unprocessed_data if d.device_id == device_id]
+        # Claim unprocessed audio data (only the device's rows, if specified)
+        # so background workers skip these rows
+        worker_id = f"manual:{uuid.uuid4()}"
+        unprocessed_data = telemetry_service.claim_unprocessed_audio_data(worker_id, limit=10, device_id=device_id)
         
         processed_count = 0
         alerts_created = 0
@@ -86,8 +86,8 @@ async def trigger_audio_processing(
                 if not audio_path:
                     continue
                 
-                # Process audio with ML service
-                result = ml_service.process_audio_file(audio_path)
+                # Process audio in the ML worker pool, off the event loop
+                result = await ml_executor.process_audio_file_async(audio_path)
                 
                 # Update telemetry data with results
                 telemetry_service.update_processing_result(data.id, result)
@@ -96,7 +96,7 @@ async def trigger_audio_processing(
                 # Create alert if drone detected
                 if result.is_drone_detected and result.confidence_score > 0.7:
                     alert_data = AlertCreate(
-                        device_id=data.device_id,
+                        device_id=data.device_external_id,
                         alert_type=AlertType.DRONE_DETECTED,
                         severity=AlertSeverity.HIGH if result.confidence_score > 0.9 else AlertSeverity.MEDIUM,
                         message=f"Drone detected with confidence {result.confidence_score:.2f}",
@@ -128,7 +128,7 @@ async def trigger_audio_processing(
 
 @router.get("/detection-stats")
 async def get_detection_stats(
-    hours: int = Query(24, ge=1, le=168, description="Time range in hours"),
+    hours: int = Query(24, ge=1, le=8760, description="Time range in hours"),
     telemetry_service: TelemetryService = Depends(get_telemetry_service)
 ):
     """Get drone detection statistics."""
@@ -138,50 +138,18 @@ async def get_detection_stats(
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
-        # Get processed audio data in time range
-        data, total = telemetry_service.get_telemetry_data(
-            device_id="",  # Get all devices
-            start_time=start_time,
-            end_time=end_time,
-            page=1,
-            page_size=1000
-        )
-        
-        # Filter for processed audio data
-        processed_audio = [d for d in data if d.data_type == "audio" and d.processed and d.processing_result]
-        
-        # Calculate statistics
-        total_processed = len(processed_audio)
-        drone_detections = sum(1 for d in processed_audio 
-                             if d.processing_result and d.processing_result.get("is_drone_detected", False))
-        
-        high_confidence_detections = sum(1 for d in processed_audio 
-                                       if d.processing_result and 
-                                       d.processing_result.get("is_drone_detected", False) and
-                                       d.processing_result.get("confidence_score", 0) > 0.9)
-        
-        avg_confidence = 0
-        if drone_detections > 0:
-            confidences = [d.processing_result.get("confidence_score", 0) 
-                          for d in processed_audio 
-                          if d.processing_result and d.processing_result.get("is_drone_detected", False)]
-            avg_confidence = sum(confidences) / len(confidences)
-        
-        # Classification breakdown
-        classifications = {}
-        for d in processed_audio:
-            if d.processing_result and "classification" in d.processing_result:
-                classification = d.processing_result["classification"]
-                classifications[classification] = classifications.get(classification, 0) + 1
+        # Aggregated in the database across all devices
+        stats = telemetry_service.get_detection_stats(start_time, end_time)
+        total_processed = stats["total_processed"]
         
         return {
             "time_range_hours": hours,
             "total_processed": total_processed,
-            "drone_detections": drone_detections,
-            "high_confidence_detections": high_confidence_detections,
-            "detection_rate": drone_detections / total_processed if total_processed > 0 else 0,
-            "avg_confidence": round(avg_confidence, 3),
-            "classifications": classifications
+            "drone_detections": stats["drone_detections"],
+            "high_confidence_detections": stats["high_confidence_detections"],
+            "detection_rate": stats["drone_detections"] / total_processed if total_processed > 0 else 0,
+            "avg_confidence": round(stats["avg_confidence"], 3),
+            "classifications": stats["classifications"]
         }
         
     except Exception as e:
@@ -3,12 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import Optional
 from datetime import datetime
 
-from app.services.device_service import DeviceService
+from app.services.async_services import AsyncDeviceService
 from app.schemas.device import (
     DeviceCreate, DeviceUpdate, DeviceResponse, DeviceListResponse,
     DeviceType, DeviceStatus
 )
-from app.api.dependencies import get_device_service
+from app.schemas.pagination import TotalMode
+from app.api.dependencies import get_async_device_service
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
@@ -16,11 +17,11 @@ router = APIRouter(prefix="/devices", tags=["devices"])
 @router.post("/", response_model=DeviceResponse, status_code=status.HTTP_201_CREATED)
 async def create_device(
     device_data: DeviceCreate,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Create a new IoT device."""
     try:
-        device = device_service.create_device(device_data)
+        device = await device_service.create_device(device_data)
         return device
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -30,23 +31,29 @@ async def create_device(
 
 @router.get("/", response_model=DeviceListResponse)
 async def list_devices(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     device_type: Optional[DeviceType] = Query(None, description="Filter by device type"),
     status: Optional[DeviceStatus] = Query(None, description="Filter by device status"),
     search: Optional[str] = Query(None, description="Search in device name, ID, or location"),
-    device_service: DeviceService = Depends(get_device_service)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    total: TotalMode = Query(TotalMode.EXACT, description="Return an exact, estimated or no total"),
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """List devices with pagination and filtering."""
     try:
-        result = device_service.list_devices(
+        result = await device_service.list_devices(
             page=page,
             page_size=page_size,
             device_type=device_type,
             status=status,
-            search=search
+            search=search,
+            cursor=cursor,
+            total_mode=total
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to list devices")
 
@@ -54,10 +61,10 @@ async def list_devices(
 @router.get("/{device_id}", response_model=DeviceResponse)
 async def get_device(
     device_id: str,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Get device by ID."""
-    device = device_service.get_device(device_id)
+    device = await device_service.get_device(device_id)
     if not device:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
     return device
@@ -67,10 +74,10 @@ async def get_device(
 async def update_device(
     device_id: str,
     device_data: DeviceUpdate,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Update device information."""
-    device = device_service.update_device(device_id, device_data)
+    device = await device_service.update_device(device_id, device_data)
     if not device:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
     return device
@@ -79,10 +86,10 @@ async def update_device(
 @router.delete("/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_device(
     device_id: str,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Delete device."""
-    success = device_service.delete_device(device_id)
+    success = await device_service.delete_device(device_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
 
@@ -91,25 +98,25 @@ async def delete_device(
 async def update_device_status(
     device_id: str,
     status: DeviceStatus,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Update device status."""
-    success = device_service.update_device_status(device_id, status)
+    success = await device_service.update_device_status(device_id, status)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
     
     # Return updated device
-    device = device_service.get_device(device_id)
+    device = await device_service.get_device(device_id)
     return device
 
 
 @router.get("/{device_id}/health")
 async def get_device_health(
     device_id: str,
-    device_service: DeviceService = Depends(get_device_service)
+    device_service: AsyncDeviceService = Depends(get_async_device_service)
 ):
     """Get device health status."""
-    device = device_service.get_device(device_id)
+    device = await device_service.get_device(device_id)
     if not device:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
     
@@ -1,8 +1,9 @@
 """Metrics API endpoints."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
 import time
 
+from app.services.device_metrics import COLUMNS
 from app.services.metrics_service import metrics_service
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
@@ -14,6 +15,33 @@ async def get_metrics():
     return metrics_service.get_metrics_response()
 
 
+@router.get("/devices")
+async def get_device_metrics(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort_by: str = Query("telemetry_total", description="Counter to sort devices by (descending)")
+):
+    """Get per-device metrics, paginated."""
+    if sort_by not in COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort_by must be one of: {', '.join(COLUMNS)}"
+        )
+    return metrics_service.get_device_metrics(offset=offset, limit=limit, sort_by=sort_by)
+
+
+@router.get("/devices/{device_id}")
+async def get_device_metrics_by_id(device_id: str):
+    """Get metrics for a single device."""
+    metrics = metrics_service.device_table.get(device_id)
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No metrics recorded for device"
+        )
+    return metrics
+
+
 @router.get("/health")
 async def get_metrics_health():
     """Get metrics service health."""
@@ -20,7 +20,13 @@ async def get_mqtt_status(
         return {
             "connected": mqtt_service.is_connected(),
             "broker": f"{mqtt_service.client._host}:{mqtt_service.client._port}" if mqtt_service.client else "Not configured",
-            "subscriptions": list(mqtt_service.subscriptions.keys())
+            "subscriptions": list(mqtt_service.subscriptions.keys()),
+            "ingest": {
+                "queue_depth": mqtt_service.ingest.depth(),
+                "accepted": mqtt_service.ingest.accepted,
+                "dropped": mqtt_service.ingest.dropped,
+                "processed": mqtt_service.ingest.processed
+            }
         }
     except Exception as e:
         logger.error(f"Failed to get MQTT status: {e}")
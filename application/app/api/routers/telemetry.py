@@ -1,14 +1,21 @@
 """Telemetry data API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response
 from typing import Optional, List
 from datetime import datetime, timedelta
+import json
 
-from app.services.telemetry_service import TelemetryService
+from app.config import settings
+
+from app.services.async_services import AsyncTelemetryService
+from app.services.audio_storage import audio_storage
+from app.services.audio_upload import UploadTooLargeError, stream_upload_to_file
+from app.services.background_tasks import background_tasks
 from app.schemas.telemetry import (
-    TelemetryDataCreate, TelemetryDataResponse, AudioDataCreate, ProcessingResult,
-    DataType
+    TelemetryDataCreate, TelemetryDataResponse, ProcessingResult,
+    DataType, TelemetryBatchResponse, TelemetryDataListResponse, StoredAudioCreate
 )
-from app.api.dependencies import get_telemetry_service
+from app.schemas.pagination import TotalMode
+from app.api.dependencies import get_async_telemetry_service
 
 router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 
@@ -16,11 +23,11 @@ router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 @router.post("/", response_model=TelemetryDataResponse, status_code=status.HTTP_201_CREATED)
 async def create_telemetry_data(
     data: TelemetryDataCreate,
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Create new telemetry data."""
     try:
-        telemetry = telemetry_service.create_telemetry_data(data)
+        telemetry = await telemetry_service.create_telemetry_data(data)
         return telemetry
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -28,13 +35,57 @@ async def create_telemetry_data(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create telemetry data")
 
 
+@router.post("/batch", response_model=TelemetryBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_telemetry_batch(
+    request: Request,
+    response: Response,
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
+):
+    """Create telemetry data for a batch of readings.
+    
+    Accepts either a JSON array of readings or an NDJSON body
+    (``application/x-ndjson``, one reading per line). Each reading is
+    reported individually so devices can retry only the failed ones.
+    Returns 201 when every reading is stored and 207 otherwise.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    
+    try:
+        if "ndjson" in content_type:
+            readings = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            readings = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid batch body: {e}")
+    
+    if not isinstance(readings, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Batch body must be a list of readings")
+    if not readings:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Batch is empty")
+    if len(readings) > settings.telemetry_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.telemetry_batch_max_items} readings"
+        )
+    
+    try:
+        result = await telemetry_service.create_telemetry_batch(readings)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create telemetry batch")
+    
+    if result.failed:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return result
+
+
 @router.post("/audio", response_model=TelemetryDataResponse, status_code=status.HTTP_201_CREATED)
 async def upload_audio_data(
     device_id: str = Form(..., description="Device ID"),
     audio_file: UploadFile = File(..., description="Audio file"),
     sample_rate: int = Form(22050, description="Audio sample rate"),
     duration: float = Form(..., description="Audio duration in seconds"),
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Upload audio data for processing."""
     try:
@@ -45,57 +96,71 @@ async def upload_audio_data(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Reject unknown devices before anything is written to storage
+        if not await telemetry_service.device_exists(device_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Device {device_id} not found")
         
-        # Create audio data
-        audio_data_create = AudioDataCreate(
+        # Stream straight to storage, hashing and size-checking each chunk,
+        # then file it under its content hash (identical retries share a file).
+        # Stored files are never deleted here: another upload may already
+        # reference the same key, so a failed registration leaves the file
+        # unreferenced rather than risk removing a shared clip.
+        upload = await stream_upload_to_file(audio_file, audio_storage.staging_path())
+        stored = audio_storage.commit(upload.path, upload.sha256)
+        
+        telemetry = await telemetry_service.register_audio_file(StoredAudioCreate(
             device_id=device_id,
-            audio_data=audio_data,
+            audio_file_path=stored.key,
+            file_size=upload.size,
+            sha256=upload.sha256,
             sample_rate=sample_rate,
             duration=duration,
             metadata={
                 "filename": audio_file.filename,
                 "content_type": audio_file.content_type,
-                "file_size": len(audio_data)
+                "file_size": upload.size
             }
-        )
+        ))
         
-        telemetry = telemetry_service.create_audio_data(audio_data_create)
+        # Wake audio workers instead of waiting for the next poll
+        background_tasks.notify_audio_available()
         return telemetry
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to upload audio: {str(e)}")
 
 
-@router.get("/{device_id}", response_model=List[TelemetryDataResponse])
+@router.get("/{device_id}", response_model=TelemetryDataListResponse)
 async def get_telemetry_data(
     device_id: str,
     start_time: Optional[datetime] = Query(None, description="Start time filter"),
     end_time: Optional[datetime] = Query(None, description="End time filter"),
     data_type: Optional[DataType] = Query(None, description="Filter by data type"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     page_size: int = Query(100, ge=1, le=1000, description="Page size"),
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    total: TotalMode = Query(TotalMode.EXACT, description="Return an exact, estimated or no total"),
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Get telemetry data for a device."""
     try:
-        data, total = telemetry_service.get_telemetry_data(
+        return await telemetry_service.list_telemetry_data(
             device_id=device_id,
             start_time=start_time,
             end_time=end_time,
             data_type=data_type,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total
         )
         
-        return {
-            "data": data,
-            "total": total,
-            "page": page,
-            "page_size": page_size
-        }
-        
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -107,7 +172,7 @@ async def get_latest_telemetry_data(
     device_id: str,
     limit: int = Query(10, ge=1, le=100, description="Number of latest records"),
     data_type: Optional[DataType] = Query(None, description="Filter by data type"),
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Get latest telemetry data for a device."""
     try:
@@ -115,7 +180,7 @@ async def get_latest_telemetry_data(
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=1)
         
-        data, total = telemetry_service.get_telemetry_data(
+        data, total = await telemetry_service.get_telemetry_data(
             device_id=device_id,
             start_time=start_time,
             end_time=end_time,
@@ -136,11 +201,11 @@ async def get_latest_telemetry_data(
 async def get_audio_file(
     device_id: str,
     telemetry_id: str,
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Get audio file for telemetry data."""
     try:
-        file_path = telemetry_service.get_audio_file_path(telemetry_id)
+        file_path = await telemetry_service.get_audio_file_path(telemetry_id)
         if not file_path:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio file not found")
         
@@ -155,39 +220,31 @@ async def get_audio_file(
 @router.get("/{device_id}/stats")
 async def get_telemetry_stats(
     device_id: str,
-    hours: int = Query(24, ge=1, le=168, description="Time range in hours"),
-    telemetry_service: TelemetryService = Depends(get_telemetry_service)
+    hours: int = Query(24, ge=1, le=8760, description="Time range in hours"),
+    telemetry_service: AsyncTelemetryService = Depends(get_async_telemetry_service)
 ):
     """Get telemetry statistics for a device."""
     try:
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
-        # Get all data in time range
-        data, total = telemetry_service.get_telemetry_data(
+        # Exact counts from a single aggregate query
+        counts = await telemetry_service.get_telemetry_stats(
             device_id=device_id,
             start_time=start_time,
-            end_time=end_time,
-            page=1,
-            page_size=1000  # Large page size to get all data
+            end_time=end_time
         )
-        
-        # Calculate statistics
-        audio_count = sum(1 for d in data if d.data_type == DataType.AUDIO)
-        sensor_count = sum(1 for d in data if d.data_type == DataType.SENSOR)
-        status_count = sum(1 for d in data if d.data_type == DataType.STATUS)
-        
-        processed_count = sum(1 for d in data if d.processed)
+        total = counts["total"]
         
         return {
             "device_id": device_id,
             "time_range_hours": hours,
             "total_records": total,
-            "audio_records": audio_count,
-            "sensor_records": sensor_count,
-            "status_records": status_count,
-            "processed_records": processed_count,
-            "processing_rate": processed_count / total if total > 0 else 0
+            "audio_records": counts[DataType.AUDIO.value],
+            "sensor_records": counts[DataType.SENSOR.value],
+            "status_records": counts[DataType.STATUS.value],
+            "processed_records": counts["processed"],
+            "processing_rate": counts["processed"] / total if total > 0 else 0
         }
         
     except ValueError as e:
@@ -3,8 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
 from typing import Optional, List
 from datetime import datetime
 import logging
+import time
 
+from app.services.audio_upload import UploadTooLargeError, check_upload_size
 from app.services.use_case_ml_service import use_case_ml_service
+from app.services.metrics_service import metrics_service
+from app.services.rollup_engine import rollup_engine, REQUESTS, ANALYSIS, ALERTS, HOUR
 from app.schemas.use_cases import (
     TrafficAnalysisRequest, TrafficAnalysisResult,
     SirenDetectionRequest, SirenDetectionResult,
@@ -14,7 +18,7 @@ from app.schemas.use_cases import (
     UnifiedAnalysisRequest, UnifiedAnalysisResult,
     DashboardMetrics, HeatmapData, TimeSeriesData
 )
-from app.config import UseCaseType
+from app.config import settings, UseCaseType
 
 router = APIRouter(prefix="/use-cases", tags=["use-cases"])
 
@@ -39,8 +43,8 @@ async def analyze_traffic(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse metadata if provided
         import json
@@ -50,7 +54,7 @@ async def analyze_traffic(
         request = TrafficAnalysisRequest(
             device_id=device_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             metadata=parsed_metadata
         )
         
@@ -60,6 +64,8 @@ async def analyze_traffic(
         logger.info(f"Traffic analysis completed for device {device_id}: {result.event_type}")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to analyze traffic: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to analyze traffic: {str(e)}")
@@ -84,8 +90,8 @@ async def detect_siren(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse metadata if provided
         import json
@@ -95,7 +101,7 @@ async def detect_siren(
         request = SirenDetectionRequest(
             device_id=device_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             emergency_priority=emergency_priority,
             metadata=parsed_metadata
         )
@@ -106,6 +112,8 @@ async def detect_siren(
         logger.info(f"Siren detection completed for device {device_id}: {result.siren_detected}")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to detect siren: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to detect siren: {str(e)}")
@@ -131,8 +139,8 @@ async def analyze_noise_mapping(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse metadata if provided
         import json
@@ -143,7 +151,7 @@ async def analyze_noise_mapping(
         request = NoiseMappingRequest(
             device_id=device_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             measurement_duration_s=measurement_duration_s,
             calibration_data=parsed_calibration,
             metadata=parsed_metadata
@@ -155,6 +163,8 @@ async def analyze_noise_mapping(
         logger.info(f"Noise mapping analysis completed for device {device_id}: {result.noise_level}")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to analyze noise mapping: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to analyze noise mapping: {str(e)}")
@@ -181,8 +191,8 @@ async def analyze_industrial_monitoring(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse metadata if provided
         import json
@@ -194,7 +204,7 @@ async def analyze_industrial_monitoring(
             device_id=device_id,
             machinery_id=machinery_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             machinery_type=machinery_type,
             operating_conditions=parsed_conditions,
             metadata=parsed_metadata
@@ -206,6 +216,8 @@ async def analyze_industrial_monitoring(
         logger.info(f"Industrial monitoring analysis completed for device {device_id}: {result.anomaly_detected}")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to analyze industrial monitoring: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to analyze industrial monitoring: {str(e)}")
@@ -232,8 +244,8 @@ async def analyze_wildlife_monitoring(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse metadata if provided
         import json
@@ -243,7 +255,7 @@ async def analyze_wildlife_monitoring(
         request = WildlifeMonitoringRequest(
             device_id=device_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             habitat_type=habitat_type,
             season=season,
             time_of_day=time_of_day,
@@ -256,6 +268,8 @@ async def analyze_wildlife_monitoring(
         logger.info(f"Wildlife monitoring analysis completed for device {device_id}: {len(result.species_detected)} species")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to analyze wildlife monitoring: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to analyze wildlife monitoring: {str(e)}")
@@ -281,8 +295,8 @@ async def analyze_unified(
                 detail="File must be an audio file"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
+        # Analyze the spooled upload in place instead of reading it into memory
+        check_upload_size(audio_file)
         
         # Parse use cases
         use_case_list = [UseCaseType(uc.strip()) for uc in use_cases.split(',')]
@@ -295,7 +309,7 @@ async def analyze_unified(
         request = UnifiedAnalysisRequest(
             device_id=device_id,
             location=location,
-            audio_data=audio_data,
+            audio_source=audio_file.file,
             use_cases=use_case_list,
             priority=priority,
             metadata=parsed_metadata
@@ -307,6 +321,8 @@ async def analyze_unified(
         logger.info(f"Unified analysis completed for device {device_id}: {len(result.results)} use cases")
         return result
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to perform unified analysis: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to perform unified analysis: {str(e)}")
@@ -319,29 +335,30 @@ async def get_dashboard_metrics(
 ):
     """Get dashboard metrics for visualization."""
     try:
-        # Mock implementation - in production, this would query the database
-        from datetime import datetime, timedelta
+        # Answered from the incremental rollups, not by scanning telemetry
+        now = time.time()
+        window = hours * HOUR
+        requests = rollup_engine.window(REQUESTS, seconds=window, end=now)
+        analyses = rollup_engine.window(ANALYSIS, seconds=window, end=now)
+        alerts = rollup_engine.window(ALERTS, seconds=window, end=now)
+        device_table = metrics_service.device_table
+        error_rate = requests["errors"] / requests["count"] if requests["count"] else 0.0
         
         return DashboardMetrics(
             timestamp=datetime.utcnow(),
-            device_count=150,
-            active_devices=142,
-            events_processed=15420,
-            alerts_generated=23,
-            system_health=0.95,
+            device_count=len(device_table),
+            active_devices=device_table.active_count(now - settings.device_active_window_s),
+            events_processed=analyses["count"],
+            alerts_generated=alerts["count"],
+            system_health=1.0 - error_rate,
             performance_metrics={
-                "avg_latency_ms": 85.2,
-                "throughput_rps": 95.8,
-                "error_rate": 0.02,
-                "cpu_usage": 0.65,
-                "memory_usage": 0.72
+                "avg_latency_ms": requests["avg"],
+                "throughput_rps": requests["rate_per_s"],
+                "error_rate": error_rate,
+                "avg_processing_time_ms": analyses["avg"],
+                "analysis_error_rate": analyses["errors"] / analyses["count"] if analyses["count"] else 0.0
             },
-            cost_metrics={
-                "cost_per_event": 0.008,
-                "daily_cost": 123.45,
-                "monthly_cost": 3703.50,
-                "cost_trend": 0.05
-            }
+            cost_metrics={}
         )
         
     except Exception as e:
@@ -9,7 +9,10 @@ import os
 from app.config import settings
 from app.services.database import db_service
 from app.services.mqtt_service import mqtt_service
+from app.services.mqtt_ingest import TELEMETRY_TOPIC_FILTER, store_telemetry_batch
 from app.services.background_tasks import background_tasks
+from app.services.ml_executor import ml_executor
+from app.middleware.metrics_middleware import MetricsMiddleware
 from app.api.routers import devices, telemetry, alerts, analytics, mqtt, auth, metrics, use_cases, monitoring
 
 # Configure logging
@@ -39,9 +42,15 @@ async def lifespan(app: FastAPI):
         # Connect to MQTT broker
         if mqtt_service.connect():
             logger.info("Connected to MQTT broker")
+            # One wildcard subscription stores telemetry from every device
+            mqtt_service.subscribe(TELEMETRY_TOPIC_FILTER, store_telemetry_batch, batch=True)
         else:
             logger.warning("Failed to connect to MQTT broker")
         
+        # Start ML worker processes before the audio workers that use them
+        ml_executor.start()
+        logger.info("ML executor started")
+        
         # Start background tasks
         background_tasks.start()
         logger.info("Background tasks started")
@@ -60,10 +69,18 @@ async def lifespan(app: FastAPI):
         background_tasks.stop()
         logger.info("Background tasks stopped")
         
+        # Stop ML worker processes
+        ml_executor.shutdown()
+        logger.info("ML executor stopped")
+        
         # Disconnect from MQTT
         mqtt_service.disconnect()
         logger.info("Disconnected from MQTT broker")
         
+        # Release async database connections
+        await db_service.dispose_async_engine()
+        logger.info("Async database engine disposed")
+        
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
 
@@ -91,6 +108,9 @@ app.add_middleware(
     allowed_hosts=["*"]  # Configure appropriately for production
 )
 
+# Add request metrics middleware (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(devices.router)
 app.include_router(telemetry.router)
@@ -1,50 +1,81 @@
 """Metrics collection middleware."""
 import time
 import logging
-from fastapi import Request, Response
-from typing import Callable
+import threading
+from typing import Set, Tuple
 
+from app.config import settings
 from app.services.metrics_service import metrics_service
+from app.services.nfr_compliance_service import nfr_compliance_service
+from app.services.rollup_engine import rollup_engine
 
 logger = logging.getLogger(__name__)
 
+# Label used for requests that matched no route (404s, scanners)
+UNMATCHED_ROUTE = "__unmatched__"
+
+# Label used once the route series cap is reached
+OTHER_ROUTE = "__other__"
+
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
 
 class MetricsMiddleware:
-    """Middleware for collecting HTTP request metrics."""
+    """Pure ASGI middleware for collecting HTTP request metrics.
+    
+    Requests are labelled by the matched route template (``/devices/{device_id}``)
+    rather than the raw path, unknown methods and unmatched paths share one label,
+    and the number of distinct method/route pairs is capped, so label
+    cardinality stays bounded however many devices call the API.
+    """
     
-    def __init__(self, app):
+    def __init__(self, app, max_series: int = None):
         self.app = app
+        self.max_series = max_series or settings.metrics_max_route_series
+        self._series: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
     
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
         
-        request = Request(scope, receive)
-        start_time = time.time()
-        
-        # Process request
-        response_sent = False
+        start_time = time.perf_counter_ns()
+        status_code = 500
         
         async def send_wrapper(message):
-            nonlocal response_sent
-            if message["type"] == "http.response.start" and not response_sent:
-                response_sent = True
-                
-                # Calculate duration
-                duration = time.time() - start_time
-                
-                # Extract metrics
-                method = request.method
-                path = request.url.path
-                status_code = message.get("status", 500)
-                
-                # Record metrics
-                try:
-                    metrics_service.record_request(method, path, status_code, duration)
-                except Exception as e:
-                    logger.error(f"Failed to record request metrics: {e}")
-            
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
             await send(message)
         
-        await self.app(scope, receive, send_wrapper)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = (time.perf_counter_ns() - start_time) / 1e9
+            try:
+                method, endpoint = self._labels(scope)
+                metrics_service.record_request(method, endpoint, status_code, duration)
+                nfr_compliance_service.record_latency_sample(duration * 1000)
+                rollup_engine.record_request(duration * 1000, status_code)
+            except Exception as e:
+                logger.error(f"Failed to record request metrics: {e}")
+    
+    def _labels(self, scope) -> Tuple[str, str]:
+        """Get bounded method and route labels for a request."""
+        method = scope.get("method", "")
+        if method not in KNOWN_METHODS:
+            method = "OTHER"
+        
+        # The router stores the matched route in the scope
+        route = scope.get("route")
+        endpoint = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+        
+        series = (method, endpoint)
+        if series in self._series:
+            return series
+        with self._lock:
+            if len(self._series) >= self.max_series:
+                return method, OTHER_ROUTE
+            self._series.add(series)
+        return series
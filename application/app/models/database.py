@@ -1,10 +1,13 @@
 """Database models for IoT sound detection system."""
 from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
+# Composite and partial indexes for the hot queries are managed in
+# app.services.schema_indexes so existing databases can be migrated too.
 Base = declarative_base()
 
 
@@ -22,6 +25,8 @@ class Device(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     metadata = Column(JSON, nullable=True)
+    swarm_type = Column(String, nullable=True)  # set for swarm agents, indexed with status/location
+    tags = Column(MutableDict.as_mutable(JSON), nullable=True)  # swarm agent attributes and configuration
     
     # Relationships
     telemetry_data = relationship("TelemetryData", back_populates="device")
@@ -31,6 +36,8 @@ class Device(Base):
 class TelemetryData(Base):
     """Telemetry data from IoT devices."""
     __tablename__ = "telemetry_data"
+    # One partition per day on PostgreSQL (see app.services.telemetry_partitions)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     device_id = Column(String, ForeignKey("devices.id"), nullable=False, index=True)
@@ -40,10 +47,16 @@ class TelemetryData(Base):
     audio_file_path = Column(String, nullable=True)
     processed = Column(Boolean, default=False)
     processing_result = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_by = Column(String, nullable=True)  # worker holding the processing lease
+    claimed_until = Column(DateTime, nullable=True)  # lease expiry; expired claims can be re-claimed
+    # Partition key, so it is part of the table's primary key
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, nullable=False)
     
     # Relationships
     device = relationship("Device", back_populates="telemetry_data")
+    
+    # Rows are still identified by id alone
+    __mapper_args__ = {"primary_key": [id]}
 
 
 class Alert(Base):
@@ -67,6 +67,7 @@ class AlertResponse(BaseModel):
 class AlertListResponse(BaseModel):
     """Schema for alert list response."""
     alerts: list[AlertResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
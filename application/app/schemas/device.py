@@ -56,6 +56,7 @@ class DeviceResponse(BaseModel):
 class DeviceListResponse(BaseModel):
     """Schema for device list response."""
     devices: list[DeviceResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
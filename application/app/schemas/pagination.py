@@ -0,0 +1,9 @@
+"""Pagination-related Pydantic schemas."""
+from enum import Enum
+
+
+class TotalMode(str, Enum):
+    """How list endpoints report the total number of matching rows."""
+    EXACT = "exact"  # COUNT(*) over the filtered query
+    ESTIMATED = "estimated"  # planner row estimate (exact where the database has no estimate)
+    NONE = "none"  # omitted; keeps cursor paging constant-time
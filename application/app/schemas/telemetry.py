@@ -1,6 +1,6 @@
 """Telemetry data Pydantic schemas."""
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List
 from datetime import datetime
 from enum import Enum
 
@@ -36,6 +36,45 @@ class TelemetryDataResponse(BaseModel):
         from_attributes = True
 
 
+class ClaimedAudioData(TelemetryDataResponse):
+    """Audio telemetry claimed by a processing worker."""
+    device_external_id: str = Field(..., description="Device identifier of the recording device")
+
+
+class TelemetryDataListResponse(BaseModel):
+    """Schema for a page of telemetry data."""
+    data: List[TelemetryDataResponse]
+    total: Optional[int] = Field(None, description="Matching records (omitted or estimated per the total option)")
+    page: int
+    page_size: int
+    next_cursor: Optional[str] = Field(None, description="Token for the next page; null on the last page")
+
+
+class BatchItemStatus(str, Enum):
+    """Per-item outcome of a batch telemetry ingest."""
+    CREATED = "created"
+    INVALID = "invalid"
+    DEVICE_NOT_FOUND = "device_not_found"
+    FAILED = "failed"
+
+
+class TelemetryBatchItemResult(BaseModel):
+    """Outcome for a single reading in a batch."""
+    index: int = Field(..., description="Position of the reading in the submitted batch")
+    status: BatchItemStatus = Field(..., description="Ingest outcome")
+    id: Optional[str] = Field(None, description="Telemetry record ID when created")
+    device_id: Optional[str] = Field(None, description="Device identifier of the reading")
+    error: Optional[str] = Field(None, description="Reason the reading was not stored")
+
+
+class TelemetryBatchResponse(BaseModel):
+    """Schema for batch telemetry ingest response."""
+    total: int
+    created: int
+    failed: int
+    results: List[TelemetryBatchItemResult]
+
+
 class AudioDataCreate(BaseModel):
     """Schema for audio data upload."""
     device_id: str = Field(..., description="Device identifier")
@@ -45,6 +84,17 @@ class AudioDataCreate(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Audio metadata")
 
 
+class StoredAudioCreate(BaseModel):
+    """Schema for registering an audio file already written to storage."""
+    device_id: str = Field(..., description="Device identifier")
+    audio_file_path: str = Field(..., description="Audio storage key of the stored file")
+    file_size: int = Field(..., description="Stored file size in bytes")
+    sha256: str = Field(..., description="SHA-256 of the stored file")
+    sample_rate: int = Field(22050, description="Audio sample rate")
+    duration: float = Field(..., description="Audio duration in seconds")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Audio metadata")
+
+
 class ProcessingResult(BaseModel):
     """Schema for ML processing results."""
     is_drone_detected: bool = Field(..., description="Whether drone was detected")
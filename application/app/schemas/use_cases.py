@@ -58,7 +58,8 @@ class TrafficAnalysisRequest(BaseModel):
     """Request for traffic analysis."""
     device_id: str = Field(..., description="Device identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
 
@@ -83,7 +84,8 @@ class SirenDetectionRequest(BaseModel):
     """Request for siren detection."""
     device_id: str = Field(..., description="Device identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     emergency_priority: bool = Field(False, description="High priority emergency")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
@@ -109,7 +111,8 @@ class NoiseMappingRequest(BaseModel):
     """Request for noise mapping analysis."""
     device_id: str = Field(..., description="Device identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     measurement_duration_s: int = Field(300, ge=60, le=3600)
     calibration_data: Optional[Dict[str, Any]] = Field(None)
@@ -138,7 +141,8 @@ class IndustrialMonitoringRequest(BaseModel):
     device_id: str = Field(..., description="Device identifier")
     machinery_id: str = Field(..., description="Machinery identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     machinery_type: str = Field(..., description="Type of machinery")
     operating_conditions: Optional[Dict[str, Any]] = Field(None)
@@ -167,7 +171,8 @@ class WildlifeMonitoringRequest(BaseModel):
     """Request for wildlife monitoring analysis."""
     device_id: str = Field(..., description="Device identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     habitat_type: str = Field(..., description="Type of habitat")
     season: Optional[str] = Field(None, description="Season of the year")
@@ -195,7 +200,8 @@ class UnifiedAnalysisRequest(BaseModel):
     """Unified request for sound analysis."""
     device_id: str = Field(..., description="Device identifier")
     location: str = Field(..., description="Geographic location")
-    audio_data: bytes = Field(..., description="Audio data for analysis")
+    audio_data: Optional[bytes] = Field(None, description="Audio data for analysis")
+    audio_source: Optional[Any] = Field(None, exclude=True, description="Uploaded file object or path, read instead of audio_data")
     use_cases: List[UseCaseType] = Field(..., description="Use cases to analyze")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     priority: int = Field(1, ge=1, le=5, description="Analysis priority")
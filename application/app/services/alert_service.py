@@ -1,15 +1,20 @@
 """Alert management service."""
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional
+from sqlalchemy import and_, or_, desc, func
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import logging
 
 from app.models.database import Alert, Device
+from app.services.device_cache import device_id_cache
+from app.services.metrics_service import metrics_service
+from app.services.pagination import paginate
+from app.services.rollup_engine import rollup_engine
 from app.schemas.alert import (
     AlertCreate, AlertUpdate, AlertResponse, AlertListResponse
 )
 from app.schemas.alert import AlertType, AlertSeverity, AlertStatus
+from app.schemas.pagination import TotalMode
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +28,14 @@ class AlertService:
     def create_alert(self, alert_data: AlertCreate) -> AlertResponse:
         """Create a new alert."""
         try:
-            # Verify device exists
-            device = self.db.query(Device).filter(Device.device_id == alert_data.device_id).first()
-            if not device:
+            # Resolve device primary key
+            device_pk = device_id_cache.resolve(self.db, alert_data.device_id)
+            if not device_pk:
                 raise ValueError(f"Device {alert_data.device_id} not found")
             
             # Create alert
             alert = Alert(
-                device_id=device.id,
+                device_id=device_pk,
                 alert_type=alert_data.alert_type.value,
                 severity=alert_data.severity.value,
                 message=alert_data.message,
@@ -43,6 +48,8 @@ class AlertService:
             self.db.commit()
             self.db.refresh(alert)
             
+            metrics_service.record_alert(alert_data.alert_type.value, alert_data.severity.value)
+            rollup_engine.record_alert(alert_data.device_id, alert_data.severity.value)
             logger.info(f"Alert created for device {alert_data.device_id}: {alert_data.alert_type}")
             return AlertResponse.from_orm(alert)
             
@@ -96,9 +103,15 @@ class AlertService:
         severity: Optional[AlertSeverity] = None,
         status: Optional[AlertStatus] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
     ) -> AlertListResponse:
-        """List alerts with filtering and pagination."""
+        """List alerts with filtering and pagination, newest first.
+        
+        Pass the previous page's ``next_cursor`` to continue with keyset
+        pagination on ``(created_at, id)``.
+        """
         try:
             query = self.db.query(Alert)
             
@@ -111,7 +124,7 @@ class AlertService:
                     # Return empty result if device not found
                     return AlertListResponse(
                         alerts=[],
-                        total=0,
+                        total=0 if total_mode != TotalMode.NONE else None,
                         page=page,
                         page_size=page_size
                     )
@@ -123,12 +136,15 @@ class AlertService:
             if status:
                 query = query.filter(Alert.status == status.value)
             
-            # Get total count
-            total = query.count()
-            
-            # Apply pagination and ordering
-            offset = (page - 1) * page_size
-            alerts = query.order_by(desc(Alert.created_at)).offset(offset).limit(page_size).all()
+            alerts, total, next_cursor = paginate(
+                query,
+                Alert.created_at,
+                Alert.id,
+                page_size,
+                cursor=cursor,
+                page=page,
+                total_mode=total_mode
+            )
             
             # Convert to response format
             alert_responses = [AlertResponse.from_orm(alert) for alert in alerts]
@@ -137,13 +153,52 @@ class AlertService:
                 alerts=alert_responses,
                 total=total,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
             logger.error(f"Failed to list alerts: {e}")
             raise
     
+    def get_alert_summary(self, device_id: str, start_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Count a device's alerts by status, severity and type in one aggregate query."""
+        try:
+            groups = (("status", Alert.status, AlertStatus), ("severity", Alert.severity, AlertSeverity),
+                      ("type", Alert.alert_type, AlertType))
+            counts = {}
+            device_pk = device_id_cache.resolve(self.db, device_id)
+            if device_pk:
+                columns = [func.count().label("total")]
+                for prefix, column, values in groups:
+                    columns.extend(
+                        func.count().filter(column == value.value).label(f"{prefix}_{value.value}")
+                        for value in values
+                    )
+                
+                query = self.db.query(*columns).filter(Alert.device_id == device_pk)
+                if start_time:
+                    query = query.filter(Alert.created_at >= start_time)
+                counts = query.one()._asdict()
+            
+            breakdown = {
+                prefix: {value.value: counts.get(f"{prefix}_{value.value}", 0) for value in values}
+                for prefix, _, values in groups
+            }
+            return {
+                "device_id": device_id,
+                "total_alerts": counts.get("total", 0),
+                "active_alerts": breakdown["status"][AlertStatus.ACTIVE.value],
+                "acknowledged_alerts": breakdown["status"][AlertStatus.ACKNOWLEDGED.value],
+                "resolved_alerts": breakdown["status"][AlertStatus.RESOLVED.value],
+                "severity_breakdown": breakdown["severity"],
+                "type_breakdown": breakdown["type"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get alert summary for device {device_id}: {e}")
+            raise
+    
     def get_active_alerts(self, device_id: Optional[str] = None) -> List[AlertResponse]:
         """Get active alerts."""
         try:
@@ -0,0 +1,232 @@
+"""Async variants of the database-backed services.
+
+Each async service runs the matching synchronous service on an
+``AsyncSession`` via ``run_sync``, so queries go through the async driver
+and never block the event loop while the business logic stays in one place.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+
+from app.services.device_service import DeviceService
+from app.services.telemetry_service import TelemetryService
+from app.services.alert_service import AlertService
+from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceResponse, DeviceListResponse
+from app.schemas.device import DeviceType, DeviceStatus
+from app.schemas.telemetry import (
+    TelemetryDataCreate, TelemetryDataResponse, AudioDataCreate, TelemetryBatchResponse, DataType,
+    TelemetryDataListResponse, StoredAudioCreate
+)
+from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertListResponse
+from app.schemas.alert import AlertType, AlertSeverity, AlertStatus
+from app.schemas.pagination import TotalMode
+
+
+class AsyncServiceBase:
+    """Base class running a synchronous service on an async session."""
+    
+    service_class = None
+    
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+    
+    async def _run(self, method_name: str, *args, **kwargs) -> Any:
+        """Run a method of the synchronous service without blocking the loop."""
+        def call(sync_session):
+            service = self.service_class(sync_session)
+            return getattr(service, method_name)(*args, **kwargs)
+        
+        return await self.db.run_sync(call)
+
+
+class AsyncDeviceService(AsyncServiceBase):
+    """Async service for managing IoT devices."""
+    
+    service_class = DeviceService
+    
+    async def create_device(self, device_data: DeviceCreate) -> DeviceResponse:
+        """Create a new device."""
+        return await self._run("create_device", device_data)
+    
+    async def get_device(self, device_id: str) -> Optional[DeviceResponse]:
+        """Get device by ID."""
+        return await self._run("get_device", device_id)
+    
+    async def update_device(self, device_id: str, device_data: DeviceUpdate) -> Optional[DeviceResponse]:
+        """Update device information."""
+        return await self._run("update_device", device_id, device_data)
+    
+    async def delete_device(self, device_id: str) -> bool:
+        """Delete device."""
+        return await self._run("delete_device", device_id)
+    
+    async def list_devices(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        device_type: Optional[DeviceType] = None,
+        status: Optional[DeviceStatus] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> DeviceListResponse:
+        """List devices with pagination and filtering."""
+        return await self._run(
+            "list_devices",
+            page=page,
+            page_size=page_size,
+            device_type=device_type,
+            status=status,
+            search=search,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    
+    async def update_device_status(self, device_id: str, status: DeviceStatus) -> bool:
+        """Update device status."""
+        return await self._run("update_device_status", device_id, status)
+
+
+class AsyncTelemetryService(AsyncServiceBase):
+    """Async service for managing telemetry data."""
+    
+    service_class = TelemetryService
+    
+    async def device_exists(self, device_id: str) -> bool:
+        """Check a device is registered."""
+        return await self._run("device_exists", device_id)
+    
+    async def create_telemetry_data(self, data: TelemetryDataCreate) -> TelemetryDataResponse:
+        """Create new telemetry data entry."""
+        return await self._run("create_telemetry_data", data)
+    
+    async def create_telemetry_batch(self, readings: List[Dict[str, Any]]) -> TelemetryBatchResponse:
+        """Create telemetry data for many readings in a single transaction."""
+        return await self._run("create_telemetry_batch", readings)
+    
+    async def create_audio_data(self, data: AudioDataCreate) -> TelemetryDataResponse:
+        """Create audio telemetry data with file storage."""
+        return await self._run("create_audio_data", data)
+    
+    async def register_audio_file(self, data: StoredAudioCreate) -> TelemetryDataResponse:
+        """Create audio telemetry data for a file already streamed to storage."""
+        return await self._run("register_audio_file", data)
+    
+    async def get_telemetry_data(
+        self,
+        device_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        data_type: Optional[DataType] = None,
+        page: int = 1,
+        page_size: int = 100
+    ) -> Tuple[List[TelemetryDataResponse], int]:
+        """Get telemetry data for a device with filtering."""
+        return await self._run(
+            "get_telemetry_data",
+            device_id=device_id,
+            start_time=start_time,
+            end_time=end_time,
+            data_type=data_type,
+            page=page,
+            page_size=page_size
+        )
+    
+    async def list_telemetry_data(
+        self,
+        device_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        data_type: Optional[DataType] = None,
+        page: int = 1,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> TelemetryDataListResponse:
+        """Get a page of telemetry data for a device, newest first."""
+        return await self._run(
+            "list_telemetry_data",
+            device_id=device_id,
+            start_time=start_time,
+            end_time=end_time,
+            data_type=data_type,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    
+    async def get_telemetry_stats(
+        self,
+        device_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Count a device's telemetry by data type and processing state."""
+        return await self._run("get_telemetry_stats", device_id, start_time=start_time, end_time=end_time)
+    
+    async def get_audio_file_path(self, telemetry_id: str) -> Optional[str]:
+        """Get audio file path for telemetry data."""
+        return await self._run("get_audio_file_path", telemetry_id)
+
+
+class AsyncAlertService(AsyncServiceBase):
+    """Async service for managing alerts and notifications."""
+    
+    service_class = AlertService
+    
+    async def create_alert(self, alert_data: AlertCreate) -> AlertResponse:
+        """Create a new alert."""
+        return await self._run("create_alert", alert_data)
+    
+    async def get_alert(self, alert_id: str) -> Optional[AlertResponse]:
+        """Get alert by ID."""
+        return await self._run("get_alert", alert_id)
+    
+    async def update_alert(self, alert_id: str, alert_data: AlertUpdate) -> Optional[AlertResponse]:
+        """Update alert status."""
+        return await self._run("update_alert", alert_id, alert_data)
+    
+    async def list_alerts(
+        self,
+        device_id: Optional[str] = None,
+        alert_type: Optional[AlertType] = None,
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        page: int = 1,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> AlertListResponse:
+        """List alerts with filtering and pagination."""
+        return await self._run(
+            "list_alerts",
+            device_id=device_id,
+            alert_type=alert_type,
+            severity=severity,
+            status=status,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    
+    async def get_alert_summary(self, device_id: str, start_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Count a device's alerts by status, severity and type."""
+        return await self._run("get_alert_summary", device_id, start_time=start_time)
+    
+    async def get_active_alerts(self, device_id: Optional[str] = None) -> List[AlertResponse]:
+        """Get active alerts."""
+        return await self._run("get_active_alerts", device_id=device_id)
+    
+    async def get_critical_alerts(self) -> List[AlertResponse]:
+        """Get critical alerts."""
+        return await self._run("get_critical_alerts")
+    
+    async def acknowledge_alert(self, alert_id: str) -> bool:
+        """Acknowledge an alert."""
+        return await self._run("acknowledge_alert", alert_id)
+    
+    async def resolve_alert(self, alert_id: str) -> bool:
+        """Resolve an alert."""
+        return await self._run("resolve_alert", alert_id)
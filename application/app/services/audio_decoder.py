@@ -0,0 +1,244 @@
+"""Unified audio decoding from bytes, buffers, files and paths to float32 samples."""
+import io
+import logging
+import mmap
+import os
+import struct
+from functools import lru_cache
+from math import gcd
+from typing import Any, NamedTuple, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import firwin, resample_poly
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Leading bytes of containers soundfile decodes (WAV variants, FLAC, OGG,
+# AIFF, AU, CAF, ID3-tagged MP3)
+_CONTAINER_MAGIC = (b"RIFF", b"RIFX", b"RF64", b"fLaC", b"OggS", b"FORM", b".snd", b"caff", b"ID3")
+# Bytes handed to soundfile when a buffer's leading bytes are ambiguous
+_CONTAINER_PROBE_BYTES = 65536
+
+# (format tag, bits per sample) -> little-endian sample dtype
+_WAV_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.dtype(np.uint8),
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype("<f8"),
+}
+
+
+class WavLayout(NamedTuple):
+    """Where the samples of a WAV file live inside its buffer."""
+    dtype: np.dtype
+    channels: int
+    sample_rate: int
+    data_offset: int
+    frame_count: int
+
+
+def parse_wav_header(buffer: memoryview) -> Optional[WavLayout]:
+    """Locate the sample data of an uncompressed WAV file, or None if not one we can view."""
+    if len(buffer) < 12 or bytes(buffer[0:4]) != b"RIFF" or bytes(buffer[8:12]) != b"WAVE":
+        return None
+    
+    position = 12
+    fmt = None
+    while position + 8 <= len(buffer):
+        chunk_id = bytes(buffer[position:position + 4])
+        chunk_size = struct.unpack_from("<I", buffer, position + 4)[0]
+        body = position + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", buffer, body)
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                # Actual format is the first two bytes of the sub-format GUID
+                format_tag = struct.unpack_from("<H", buffer, body + 24)[0]
+            fmt = (format_tag, bits, channels, sample_rate)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            format_tag, bits, channels, sample_rate = fmt
+            dtype = _WAV_DTYPES.get((format_tag, bits))
+            if dtype is None or channels == 0:
+                return None
+            data_size = min(chunk_size, len(buffer) - body)
+            frame_count = data_size // (dtype.itemsize * channels)
+            return WavLayout(dtype, channels, sample_rate, body, frame_count)
+        position = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def wav_samples(buffer: memoryview, layout: WavLayout, offset: float = 0.0, duration: Optional[float] = None) -> np.ndarray:
+    """Get the raw interleaved samples of a WAV buffer as a view, shaped ``(frames, channels)``."""
+    start = min(int(offset * layout.sample_rate), layout.frame_count)
+    stop = layout.frame_count if duration is None else min(start + int(duration * layout.sample_rate), layout.frame_count)
+    return np.frombuffer(
+        buffer,
+        dtype=layout.dtype,
+        count=(stop - start) * layout.channels,
+        offset=layout.data_offset + start * layout.channels * layout.dtype.itemsize
+    ).reshape(-1, layout.channels)
+
+
+def to_float32_mono(frames: np.ndarray) -> np.ndarray:
+    """Convert ``(frames, channels)`` samples to mono float32 in [-1, 1].
+    
+    Mono float32 input is returned as the same (possibly read-only) view;
+    other inputs take exactly one new array.
+    """
+    if frames.shape[1] == 1:
+        samples = frames[:, 0]
+        if samples.dtype == np.float32:
+            return samples
+        converted = samples.astype(np.float32)
+    else:
+        converted = frames.mean(axis=1, dtype=np.float32)
+    
+    if frames.dtype == np.uint8:
+        converted -= 128.0
+        converted *= 1.0 / 128.0
+    elif frames.dtype.kind == "i":
+        converted *= 1.0 / float(2 ** (8 * frames.dtype.itemsize - 1))
+    return converted
+
+
+@lru_cache(maxsize=32)
+def _resample_kernel(up: int, down: int) -> np.ndarray:
+    """Design (once per rate pair) the anti-aliasing FIR filter used by ``resample_poly``."""
+    max_rate = max(up, down)
+    return firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Polyphase-resample float32 samples, reusing cached filter kernels."""
+    if orig_sr == target_sr or samples.size == 0:
+        return samples
+    divisor = gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+    return resample_poly(samples, up, down, window=_resample_kernel(up, down)).astype(np.float32, copy=False)
+
+
+def _buffer_of(source: Any) -> Tuple[Optional[memoryview], bool]:
+    """Get a memoryview over the source's bytes without copying, when possible.
+    
+    Paths and real files are memory-mapped; bytes-like objects and
+    ``BytesIO`` are viewed in place. Returns ``(buffer, borrowed)`` where
+    ``borrowed`` marks a view into a ``BytesIO`` that must be released
+    before the caller closes it, or ``(None, False)`` for file objects that
+    can only be read as a stream.
+    """
+    if isinstance(source, memoryview):
+        return (source.cast("B") if source.format != "B" else source), False
+    if isinstance(source, (bytes, bytearray)):
+        return memoryview(source), False
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b""), False
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)), False
+    
+    file = getattr(source, "_file", source)  # SpooledTemporaryFile wraps the real file
+    if isinstance(file, io.BytesIO):
+        return file.getbuffer(), True
+    try:
+        fileno = file.fileno()
+        if os.fstat(fileno).st_size > 0:
+            return memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)), False
+    except (AttributeError, OSError, ValueError):
+        pass
+    return None, False
+
+
+def decode_audio(
+    source: Any,
+    target_sr: Optional[int] = None,
+    duration: Optional[float] = None,
+    offset: float = 0.0,
+    raw_sample_rate: Optional[int] = None
+) -> Tuple[np.ndarray, int]:
+    """Decode audio to mono float32 samples, returning ``(samples, sample_rate)``.
+    
+    ``source`` may be bytes, a memoryview, a path or a file object.
+    Uncompressed WAV is read straight from the (memory-mapped) buffer and
+    only the requested ``offset``/``duration`` window is converted; mono
+    float32 WAV at the target rate comes back as a zero-copy, read-only
+    view. Other containers (FLAC, OGG, ...) go through soundfile, whether
+    or not ``raw_sample_rate`` is given; only buffers soundfile does not
+    recognise are taken as raw float32 PCM at ``raw_sample_rate``.
+    Samples are resampled to ``target_sr`` when set.
+    
+    Raises ValueError when the audio cannot be decoded.
+    """
+    buffer, borrowed = _buffer_of(source)
+    layout = parse_wav_header(buffer) if buffer is not None else None
+    
+    if layout is not None:
+        samples = to_float32_mono(wav_samples(buffer, layout, offset, duration))
+        sample_rate = layout.sample_rate
+    elif buffer is not None and raw_sample_rate is not None and not _is_soundfile_container(buffer):
+        sample_rate = raw_sample_rate
+        start = int(offset * sample_rate)
+        count = len(buffer) // 4 - start
+        if duration is not None:
+            count = min(count, int(duration * sample_rate))
+        samples = np.frombuffer(buffer, dtype=np.float32, count=max(count, 0), offset=4 * start)
+    else:
+        samples, sample_rate = _decode_with_soundfile(buffer, source, offset, duration)
+    
+    if borrowed:
+        # A BytesIO cannot be closed while views into it exist
+        if samples.base is not None and np.shares_memory(samples, np.frombuffer(buffer, dtype=np.uint8)):
+            samples = samples.copy()
+        buffer.release()
+    if samples.size == 0:
+        raise ValueError("Audio contains no samples")
+    if target_sr is not None and sample_rate != target_sr:
+        samples = resample(samples, sample_rate, target_sr)
+        sample_rate = target_sr
+    return samples, sample_rate
+
+
+def _is_soundfile_container(buffer: memoryview) -> bool:
+    """Check whether the buffer starts like an audio container soundfile can read.
+    
+    Only the leading bytes are inspected, so raw PCM is never copied. A bare
+    MPEG frame sync can also occur at the start of raw float32 samples, so
+    that case is confirmed by probing a bounded prefix.
+    """
+    head = bytes(buffer[:4])
+    if head.startswith(_CONTAINER_MAGIC):
+        return True
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        try:
+            sf.info(io.BytesIO(buffer[:_CONTAINER_PROBE_BYTES]))
+            return True
+        except (sf.LibsndfileError, RuntimeError, TypeError):
+            return False
+    return False
+
+
+def _decode_with_soundfile(
+    buffer: Optional[memoryview],
+    source: Any,
+    offset: float,
+    duration: Optional[float]
+) -> Tuple[np.ndarray, int]:
+    """Decode compressed or unusual formats through libsndfile."""
+    if buffer is not None:
+        source = source if isinstance(source, (str, os.PathLike)) else io.BytesIO(buffer)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+    try:
+        with sf.SoundFile(source) as f:
+            f.seek(min(int(offset * f.samplerate), f.frames))
+            frames = -1 if duration is None else int(duration * f.samplerate)
+            data = f.read(frames=frames, dtype="float32", always_2d=True)
+            return to_float32_mono(data), f.samplerate
+    except (sf.LibsndfileError, RuntimeError, TypeError) as e:
+        raise ValueError(f"Unsupported or corrupt audio: {e}") from e
@@ -0,0 +1,178 @@
+"""Shared spectral front end for audio feature extraction."""
+import numpy as np
+import librosa
+from typing import Dict
+
+# STFT parameters shared by every spectral feature (librosa defaults)
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Mel bands used by librosa for MFCCs and onset strength
+DEFAULT_N_MELS = 128
+
+
+class SpectralFrontEnd:
+    """Computes the magnitude STFT of a clip once and derives features from it.
+    
+    Each ``librosa.feature`` call on a raw signal runs its own STFT (and
+    MFCCs/onset strength their own mel spectrogram). Here the STFT, power
+    spectrogram and mel spectrograms are computed once per clip and passed to
+    librosa as ``S=``, which yields the same values as the per-feature calls.
+    """
+    
+    def __init__(self, audio_data: np.ndarray, sample_rate: int):
+        self.audio_data = audio_data
+        self.sample_rate = sample_rate
+        self.magnitude = np.abs(librosa.stft(y=audio_data, n_fft=N_FFT, hop_length=HOP_LENGTH))
+        self.power = self.magnitude ** 2
+        self._mel: Dict[int, np.ndarray] = {}
+        self._log_mel: Dict[int, np.ndarray] = {}
+    
+    def mel_spectrogram(self, n_mels: int = DEFAULT_N_MELS) -> np.ndarray:
+        """Get the power mel spectrogram with ``n_mels`` bands."""
+        if n_mels not in self._mel:
+            self._mel[n_mels] = librosa.feature.melspectrogram(
+                S=self.power, sr=self.sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=n_mels
+            )
+        return self._mel[n_mels]
+    
+    def log_mel_spectrogram(self, n_mels: int = DEFAULT_N_MELS) -> np.ndarray:
+        """Get the mel spectrogram in dB."""
+        if n_mels not in self._log_mel:
+            self._log_mel[n_mels] = librosa.power_to_db(self.mel_spectrogram(n_mels))
+        return self._log_mel[n_mels]
+    
+    def mfcc(self, n_mfcc: int) -> np.ndarray:
+        """Get MFCCs from the default 128-band log-mel spectrogram."""
+        return librosa.feature.mfcc(S=self.log_mel_spectrogram(), sr=self.sample_rate, n_mfcc=n_mfcc)
+    
+    def spectral_centroid(self) -> np.ndarray:
+        """Get the per-frame spectral centroid."""
+        return librosa.feature.spectral_centroid(
+            S=self.magnitude, sr=self.sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH
+        )[0]
+    
+    def spectral_rolloff(self) -> np.ndarray:
+        """Get the per-frame spectral rolloff."""
+        return librosa.feature.spectral_rolloff(
+            S=self.magnitude, sr=self.sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH
+        )[0]
+    
+    def spectral_contrast(self) -> np.ndarray:
+        """Get spectral contrast per octave band."""
+        return librosa.feature.spectral_contrast(
+            S=self.magnitude, sr=self.sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH
+        )
+    
+    def chroma(self) -> np.ndarray:
+        """Get the chromagram from the power spectrogram."""
+        return librosa.feature.chroma_stft(
+            S=self.power, sr=self.sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH
+        )
+    
+    def zero_crossing_rate(self) -> np.ndarray:
+        """Get the per-frame zero crossing rate (time domain)."""
+        return librosa.feature.zero_crossing_rate(self.audio_data)[0]
+    
+    def rms(self) -> np.ndarray:
+        """Get per-frame RMS energy (time domain, matching ``librosa.feature.rms(y=...)``)."""
+        return librosa.feature.rms(y=self.audio_data)[0]
+    
+    def beat_track(self):
+        """Get tempo and beat frames from the shared log-mel onset envelope."""
+        onset_envelope = librosa.onset.onset_strength(
+            S=self.log_mel_spectrogram(), sr=self.sample_rate, hop_length=HOP_LENGTH, aggregate=np.median
+        )
+        return librosa.beat.beat_track(onset_envelope=onset_envelope, sr=self.sample_rate, hop_length=HOP_LENGTH)
+    
+    def tonnetz(self) -> np.ndarray:
+        """Get tonal centroid features (constant-Q based, not STFT)."""
+        return librosa.feature.tonnetz(y=self.audio_data, sr=self.sample_rate)
+
+
+def extract_basic_features(front_end: SpectralFrontEnd, n_mfcc: int = 13) -> np.ndarray:
+    """Build the 54-element drone detection feature vector."""
+    features = []
+    
+    # MFCC features
+    mfccs = front_end.mfcc(n_mfcc)
+    features.extend(np.mean(mfccs, axis=1))
+    features.extend(np.std(mfccs, axis=1))
+    
+    # Spectral features
+    spectral_centroids = front_end.spectral_centroid()
+    features.append(np.mean(spectral_centroids))
+    features.append(np.std(spectral_centroids))
+    
+    # Zero crossing rate
+    zcr = front_end.zero_crossing_rate()
+    features.append(np.mean(zcr))
+    features.append(np.std(zcr))
+    
+    # Spectral rolloff
+    rolloff = front_end.spectral_rolloff()
+    features.append(np.mean(rolloff))
+    features.append(np.std(rolloff))
+    
+    # Chroma features
+    chroma = front_end.chroma()
+    features.extend(np.mean(chroma, axis=1))
+    
+    # Mel spectrogram
+    mel_spec = front_end.mel_spectrogram()
+    features.extend(np.mean(mel_spec, axis=1)[:10])  # First 10 mel features
+    
+    return np.array(features)
+
+
+def extract_enhanced_features(front_end: SpectralFrontEnd, n_mfcc: int, n_mels: int) -> np.ndarray:
+    """Build the enhanced use case feature vector."""
+    features = []
+    
+    # Basic spectral features
+    mfccs = front_end.mfcc(n_mfcc)
+    features.extend(np.mean(mfccs, axis=1))
+    features.extend(np.std(mfccs, axis=1))
+    
+    # Spectral features
+    spectral_centroids = front_end.spectral_centroid()
+    features.append(np.mean(spectral_centroids))
+    features.append(np.std(spectral_centroids))
+    
+    # Zero crossing rate
+    zcr = front_end.zero_crossing_rate()
+    features.append(np.mean(zcr))
+    features.append(np.std(zcr))
+    
+    # Spectral rolloff
+    rolloff = front_end.spectral_rolloff()
+    features.append(np.mean(rolloff))
+    features.append(np.std(rolloff))
+    
+    # Chroma features
+    chroma = front_end.chroma()
+    features.extend(np.mean(chroma, axis=1))
+    
+    # Mel spectrogram
+    mel_spec = front_end.mel_spectrogram(n_mels)
+    features.extend(np.mean(mel_spec, axis=1)[:20])  # First 20 mel features
+    
+    # Spectral contrast
+    contrast = front_end.spectral_contrast()
+    features.extend(np.mean(contrast, axis=1))
+    
+    # Tonnetz features
+    tonnetz = front_end.tonnetz()
+    features.extend(np.mean(tonnetz, axis=1))
+    
+    # Rhythm features
+    tempo, beats = front_end.beat_track()
+    features.append(float(np.atleast_1d(tempo)[0]))  # librosa >= 0.10 returns a 1-element array
+    features.append(len(beats))
+    
+    # Energy features
+    rms = front_end.rms()
+    features.append(np.mean(rms))
+    features.append(np.std(rms))
+    
+    return np.array(features)
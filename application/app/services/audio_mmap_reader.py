@@ -0,0 +1,110 @@
+"""Memory-mapped reader for audio clips kept in audio storage."""
+import logging
+import mmap
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.audio_decoder import WavLayout, parse_wav_header, resample, to_float32_mono, wav_samples
+
+logger = logging.getLogger(__name__)
+
+
+class StoredAudio:
+    """A stored PCM WAV clip mapped into memory.
+    
+    Sample arrays are numpy views over the mapping, so only the pages of
+    the requested window are read from disk. The mapping stays open while
+    any view is alive; ``close`` it early only when no views were kept.
+    """
+    
+    def __init__(self, path: str, mapping: mmap.mmap, layout: WavLayout):
+        self.path = path
+        self.layout = layout
+        self._mapping = mapping
+        self._buffer = memoryview(mapping)
+    
+    def __enter__(self) -> "StoredAudio":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Unmap the file."""
+        self._buffer.release()
+        self._mapping.close()
+    
+    @property
+    def sample_rate(self) -> int:
+        return self.layout.sample_rate
+    
+    @property
+    def channels(self) -> int:
+        return self.layout.channels
+    
+    @property
+    def frame_count(self) -> int:
+        return self.layout.frame_count
+    
+    @property
+    def duration(self) -> float:
+        return self.layout.frame_count / self.layout.sample_rate if self.layout.sample_rate else 0.0
+    
+    def frames(self, offset: float = 0.0, duration: Optional[float] = None) -> np.ndarray:
+        """Get stored samples as a read-only ``(frames, channels)`` view in their on-disk format."""
+        return wav_samples(self._buffer, self.layout, offset, duration)
+    
+    def samples(self, offset: float = 0.0, duration: Optional[float] = None, target_sr: Optional[int] = None) -> np.ndarray:
+        """Get mono float32 samples, resampled only when the stored rate differs from ``target_sr``.
+        
+        Mono float32 clips at the target rate are returned as views
+        without copying.
+        """
+        samples = to_float32_mono(self.frames(offset, duration))
+        if target_sr is not None and target_sr != self.sample_rate:
+            samples = resample(samples, self.sample_rate, target_sr)
+        return samples
+    
+    def describe(self) -> Dict[str, Any]:
+        """Get format details recorded in the telemetry payload."""
+        return {
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "sample_format": self.layout.dtype.str,
+            "frames": self.frame_count,
+            "resample_required": self.sample_rate != settings.audio_sample_rate
+        }
+
+
+class AudioStoreReader:
+    """Opens stored clips as memory-mapped ``StoredAudio``."""
+    
+    def open(self, path: str) -> StoredAudio:
+        """Map a stored clip. Raises ValueError for anything but uncompressed WAV."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Stored audio {path} is empty")
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        with memoryview(mapping) as header:
+            layout = parse_wav_header(header)
+        if layout is None:
+            mapping.close()
+            raise ValueError(f"Stored audio {path} is not uncompressed WAV")
+        return StoredAudio(path, mapping, layout)
+    
+    def probe(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get a clip's format details, or None when it cannot be memory-mapped."""
+        try:
+            with self.open(path) as clip:
+                return clip.describe()
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cannot map stored audio {path}: {e}")
+            return None
+
+
+# Global audio store reader instance
+audio_store_reader = AudioStoreReader()
@@ -0,0 +1,232 @@
+"""Content-addressed audio storage with hash-prefixed fan-out directories."""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, select, table, update
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed per read when importing existing files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Storage keys look like ``ab/cd/<sha256>.wav``
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[A-Za-z0-9]+$")
+
+
+@dataclass
+class StoredObject:
+    """A clip committed to storage."""
+    key: str
+    sha256: str
+    created: bool  # False when identical content was already stored
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_storage_key(reference: str) -> bool:
+    """Check whether an ``audio_file_path`` value is a storage key rather than a legacy path."""
+    return bool(_KEY_PATTERN.match(reference))
+
+
+class AudioStorage(ABC):
+    """Where audio clips live. Telemetry rows keep the key returned on commit."""
+    
+    @abstractmethod
+    def staging_path(self, extension: str = "wav") -> str:
+        """Get a fresh path to write an incoming clip to before it is committed."""
+    
+    @abstractmethod
+    def commit(self, staged_path: str, sha256: str, extension: str = "wav") -> StoredObject:
+        """Move a fully written staged file into storage under its content hash."""
+    
+    @abstractmethod
+    def path(self, key: str) -> str:
+        """Get the local filesystem path for a key."""
+    
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a stored clip."""
+    
+    def put_bytes(self, data: bytes, extension: str = "wav") -> StoredObject:
+        """Store an in-memory clip."""
+        staged_path = self.staging_path(extension)
+        try:
+            with open(staged_path, "wb") as f:
+                f.write(data)
+        except BaseException:
+            self.discard(staged_path)
+            raise
+        return self.commit(staged_path, hashlib.sha256(data).hexdigest(), extension)
+    
+    def resolve(self, reference: str) -> str:
+        """Get the filesystem path for an ``audio_file_path`` value, key or legacy path."""
+        return self.path(reference) if is_storage_key(reference) else reference
+    
+    @staticmethod
+    def discard(staged_path: str):
+        """Remove a staged file that will not be committed."""
+        try:
+            os.remove(staged_path)
+        except FileNotFoundError:
+            pass
+
+
+class ContentAddressedAudioStorage(AudioStorage):
+    """Stores each distinct clip once at ``<root>/ab/cd/<sha256>.<ext>``.
+    
+    Two levels of two hex characters keep every directory to at most 256
+    entries below the leaves, however many clips a device sends, and
+    retried uploads of the same bytes resolve to the existing file.
+    Staged files live in ``<root>/.staging`` so commits are atomic
+    renames on one filesystem.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self.staging_dir = os.path.join(root, ".staging")
+    
+    @staticmethod
+    def key_for(sha256: str, extension: str = "wav") -> str:
+        """Get the storage key for content with the given hash."""
+        return f"{sha256[0:2]}/{sha256[2:4]}/{sha256}.{extension}"
+    
+    def staging_path(self, extension: str = "wav") -> str:
+        os.makedirs(self.staging_dir, exist_ok=True)
+        return os.path.join(self.staging_dir, f"{uuid.uuid4()}.{extension}")
+    
+    def commit(self, staged_path: str, sha256: str, extension: str = "wav") -> StoredObject:
+        key = self.key_for(sha256, extension)
+        target = self.path(key)
+        if os.path.exists(target):
+            self.discard(staged_path)
+            return StoredObject(key=key, sha256=sha256, created=False)
+        
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Concurrent commits of the same content replace identical bytes
+        os.replace(staged_path, target)
+        return StoredObject(key=key, sha256=sha256, created=True)
+    
+    def path(self, key: str) -> str:
+        if not is_storage_key(key):
+            raise ValueError(f"Invalid audio storage key: {key}")
+        return os.path.join(self.root, *key.split("/"))
+    
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+    
+    def import_file(self, source_path: str) -> StoredObject:
+        """Copy an existing file into storage, leaving the source in place."""
+        extension = os.path.splitext(source_path)[1].lstrip(".").lower() or "wav"
+        staged_path = self.staging_path(extension)
+        try:
+            try:
+                # Hard link when on the same filesystem, copy otherwise
+                os.link(source_path, staged_path)
+            except OSError:
+                shutil.copyfile(source_path, staged_path)
+            sha256 = file_sha256(staged_path)
+        except BaseException:
+            self.discard(staged_path)
+            raise
+        return self.commit(staged_path, sha256, extension)
+
+
+class AudioStorageMigrator:
+    """Moves clips stored at legacy ``<device_id>/<uuid>.wav`` paths into content-addressed storage.
+    
+    Each file is imported and its row repointed in one transaction per
+    batch; the legacy file is removed only after that commit, so an
+    interrupted run can simply be started again.
+    """
+    
+    def __init__(self, engine: Engine, storage: ContentAddressedAudioStorage):
+        self.engine = engine
+        self.storage = storage
+        self.telemetry = table("telemetry_data", column("id"), column("audio_file_path"))
+    
+    def _legacy_rows(self, batch_size: int, after: Optional[str]) -> List[tuple]:
+        query = select(self.telemetry.c.id, self.telemetry.c.audio_file_path).where(
+            self.telemetry.c.audio_file_path.isnot(None)
+        ).order_by(self.telemetry.c.id).limit(batch_size)
+        if after is not None:
+            query = query.where(self.telemetry.c.id > after)
+        with self.engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(query)]
+    
+    def migrate(self, batch_size: int = 500, dry_run: bool = False) -> Dict[str, int]:
+        """Import every legacy file and repoint its rows; returns counts per outcome."""
+        counts = {"migrated": 0, "deduplicated": 0, "missing": 0, "already_migrated": 0}
+        after = None
+        while True:
+            rows = self._legacy_rows(batch_size, after)
+            if not rows:
+                break
+            after = rows[-1][0]
+            
+            updates = []
+            for row_id, reference in rows:
+                if is_storage_key(reference):
+                    counts["already_migrated"] += 1
+                elif not os.path.isfile(reference):
+                    counts["missing"] += 1
+                    logger.warning(f"Audio file {reference} for telemetry {row_id} is missing")
+                elif dry_run:
+                    counts["migrated"] += 1
+                else:
+                    stored = self.storage.import_file(reference)
+                    counts["migrated" if stored.created else "deduplicated"] += 1
+                    updates.append((row_id, reference, stored.key))
+            
+            if updates:
+                with self.engine.begin() as connection:
+                    for row_id, _, key in updates:
+                        connection.execute(
+                            update(self.telemetry).where(self.telemetry.c.id == row_id).values(audio_file_path=key)
+                        )
+                for _, legacy_path, _ in updates:
+                    self.storage.discard(legacy_path)
+                logger.info(f"Migrated {len(updates)} audio files to content-addressed storage")
+        return counts
+
+
+# Global audio storage instance
+audio_storage = ContentAddressedAudioStorage(settings.audio_storage_path)
+
+
+def main():
+    """Command line entry point: ``python -m app.services.audio_storage <command>``."""
+    from app.services.database import db_service
+    
+    parser = argparse.ArgumentParser(description="Manage content-addressed audio storage")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="count files without moving them")
+    args = parser.parse_args()
+    
+    migrator = AudioStorageMigrator(db_service.engine, audio_storage)
+    print(migrator.migrate(batch_size=args.batch_size, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Chunked audio upload handling with on-the-fly hashing and size limits."""
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import UploadFile
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upload per chunk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds ``max_audio_file_size_mb``."""
+
+
+@dataclass
+class StoredUpload:
+    """An upload written to storage."""
+    path: str
+    size: int
+    sha256: str
+
+
+def max_upload_bytes() -> int:
+    """Get the configured upload size limit in bytes."""
+    return settings.max_audio_file_size_mb * 1024 * 1024
+
+
+def check_upload_size(upload: UploadFile, max_bytes: Optional[int] = None):
+    """Reject an already received upload that is over the size limit, without reading it."""
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    size = upload.size
+    if size is None:
+        # Size unknown: measure the spooled file instead of reading it
+        upload.file.seek(0, os.SEEK_END)
+        size = upload.file.tell()
+    upload.file.seek(0)
+    if size > max_bytes:
+        raise UploadTooLargeError(f"Audio file exceeds {max_bytes // (1024 * 1024)} MB limit")
+
+
+async def stream_upload_to_file(
+    upload: UploadFile,
+    path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredUpload:
+    """Copy an upload to ``path`` chunk by chunk, hashing and size-checking as it goes.
+    
+    Only one chunk is held in memory at a time. The file is written under a
+    temporary name and moved into place once complete, so a failed or
+    oversized upload never leaves a partial file at ``path``.
+    """
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    
+    try:
+        with open(partial_path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Audio file exceeds {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        os.replace(partial_path, path)
+    except BaseException:
+        try:
+            os.remove(partial_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    return StoredUpload(path=path, size=size, sha256=digest.hexdigest())
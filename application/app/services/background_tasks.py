@@ -5,11 +5,18 @@ from typing import List
 from datetime import datetime, timedelta
 import threading
 import time
+import socket
+import os
 
+from app.config import settings
 from app.services.database import db_service
 from app.services.telemetry_service import TelemetryService
 from app.services.alert_service import AlertService
-from app.services.ml_service import ml_service
+from app.services.ml_executor import ml_executor
+from app.services.metrics_service import metrics_service
+from app.services.nfr_compliance_service import nfr_compliance_service
+from app.services.rollup_engine import rollup_engine
+from app.services.telemetry_partitions import TelemetryPartitionManager
 from app.schemas.alert import AlertCreate, AlertType, AlertSeverity
 
 logger = logging.getLogger(__name__)
@@ -22,6 +29,10 @@ class BackgroundTaskService:
         self.running = False
         self.tasks = []
         self.thread = None
+        self.audio_workers: List[threading.Thread] = []
+        self._audio_available = threading.Event()
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._last_cleanup = float("-inf")
     
     def start(self):
         """Start background task processing."""
@@ -29,28 +40,48 @@ class BackgroundTaskService:
             self.running = True
             self.thread = threading.Thread(target=self._run_tasks, daemon=True)
             self.thread.start()
-            logger.info("Background task service started")
+            
+            self.audio_workers = [
+                threading.Thread(
+                    target=self._run_audio_worker,
+                    args=(f"{self._worker_prefix}:{index}",),
+                    name=f"audio-worker-{index}",
+                    daemon=True
+                )
+                for index in range(settings.audio_worker_count)
+            ]
+            for worker in self.audio_workers:
+                worker.start()
+            logger.info(f"Background task service started with {len(self.audio_workers)} audio workers")
     
     def stop(self):
         """Stop background task processing."""
         self.running = False
+        self._audio_available.set()
         if self.thread:
             self.thread.join(timeout=5)
+        for worker in self.audio_workers:
+            worker.join(timeout=5)
+        self.audio_workers = []
         logger.info("Background task service stopped")
     
+    def notify_audio_available(self):
+        """Wake the audio workers after new audio data has been stored."""
+        self._audio_available.set()
+    
     def _run_tasks(self):
-        """Main task loop."""
+        """Main maintenance loop."""
         while self.running:
             try:
-                # Process audio data
-                self._process_audio_data()
-                
                 # Check for offline devices
                 self._check_offline_devices()
                 
                 # Cleanup old data
                 self._cleanup_old_data()
                 
+                # Evaluate NFR-01 latency percentiles for the last window
+                nfr_compliance_service.evaluate_latency_percentiles()
+                
                 # Sleep before next iteration
                 time.sleep(10)  # Run every 10 seconds
                 
@@ -58,16 +89,42 @@ class BackgroundTaskService:
                 logger.error(f"Error in background task loop: {e}")
                 time.sleep(5)  # Wait before retrying
     
-    def _process_audio_data(self):
-        """Process unprocessed audio data."""
+    def _run_audio_worker(self, worker_id: str):
+        """Audio worker loop: drain claimable audio, then wait for new uploads."""
+        while self.running:
+            try:
+                # Clear before claiming so an upload committed after the claim
+                # query still wakes this worker on the next wait
+                self._audio_available.clear()
+                if self._process_audio_data(worker_id) > 0:
+                    continue
+                
+                # Nothing to claim; wait for an upload or fall back to polling
+                # for work from other replicas and expired leases
+                self._audio_available.wait(timeout=settings.audio_queue_poll_interval_s)
+                
+            except Exception as e:
+                logger.error(f"Error in audio worker {worker_id}: {e}")
+                time.sleep(5)  # Wait before retrying
+    
+    def _process_audio_data(self, worker_id: str) -> int:
+        """Claim and process one batch of unprocessed audio data.
+        
+        Returns the number of rows claimed. Rows that fail to process keep
+        their lease and are retried by any worker once it expires.
+        """
         try:
             session = db_service.get_session()
             try:
                 telemetry_service = TelemetryService(session)
                 alert_service = AlertService(session)
                 
-                # Get unprocessed audio data
-                unprocessed_data = telemetry_service.get_unprocessed_audio_data(limit=5)
+                # Claim a batch no other worker or replica can receive
+                unprocessed_data = telemetry_service.claim_unprocessed_audio_data(
+                    worker_id,
+                    limit=settings.audio_claim_batch_size,
+                    lease_seconds=settings.audio_claim_lease_s
+                )
                 
                 for data in unprocessed_data:
                     try:
@@ -76,16 +133,25 @@ class BackgroundTaskService:
                         if not audio_path:
                             continue
                         
-                        # Process audio with ML service
-                        result = ml_service.process_audio_file(audio_path)
+                        # Process audio in the ML worker pool
+                        result = ml_executor.process_audio_file(audio_path)
                         
                         # Update telemetry data with results
                         telemetry_service.update_processing_result(data.id, result)
                         
+                        device_id = data.device_external_id
+                        metrics_service.record_audio_processing(device_id, result.processing_time)
+                        if result.is_drone_detected:
+                            metrics_service.record_drone_detection(device_id, result.confidence_score)
+                        rollup_engine.record_analysis(
+                            "drone_detection", device_id, result.processing_time * 1000,
+                            confidence=result.confidence_score, detected=result.is_drone_detected
+                        )
+                        
                         # Create alert if drone detected
                         if result.is_drone_detected and result.confidence_score > 0.7:
                             alert_data = AlertCreate(
-                                device_id=data.device_id,
+                                device_id=device_id,
                                 alert_type=AlertType.DRONE_DETECTED,
                                 severity=AlertSeverity.HIGH if result.confidence_score > 0.9 else AlertSeverity.MEDIUM,
                                 message=f"Drone detected with confidence {result.confidence_score:.2f}",
@@ -104,11 +170,14 @@ class BackgroundTaskService:
                         logger.error(f"Failed to process audio data {data.id}: {e}")
                         continue
                 
+                return len(unprocessed_data)
+                
             finally:
                 db_service.close_session(session)
                 
         except Exception as e:
             logger.error(f"Error in audio processing task: {e}")
+            return 0
     
     def _check_offline_devices(self):
         """Check for offline devices and create alerts."""
@@ -151,14 +220,29 @@ class BackgroundTaskService:
     
     def _cleanup_old_data(self):
         """Clean up old data to maintain database performance."""
+        now = time.monotonic()
+        if now - self._last_cleanup < settings.telemetry_partition_maintenance_interval_s:
+            return
+        self._last_cleanup = now
+        
         try:
+            # Partitioned telemetry is retired whole, by partition
+            partition_manager = TelemetryPartitionManager(db_service.engine)
+            partitioned = settings.telemetry_partitioning_enabled and partition_manager.is_partitioned()
+            if partitioned:
+                counts = partition_manager.run_maintenance()
+                if any(counts.values()):
+                    logger.info(f"Telemetry partition maintenance: {counts}")
+            
             session = db_service.get_session()
             try:
                 telemetry_service = TelemetryService(session)
                 alert_service = AlertService(session)
                 
-                # Clean up old telemetry data (older than 30 days)
-                telemetry_cleaned = telemetry_service.cleanup_old_data(days=30)
+                # Clean up old telemetry data past warm retention
+                telemetry_cleaned = 0
+                if not partitioned:
+                    telemetry_cleaned = telemetry_service.cleanup_old_data(days=settings.warm_storage_retention_days)
                 
                 # Clean up old resolved alerts (older than 7 days)
                 alerts_cleaned = alert_service.cleanup_resolved_alerts(days=7)
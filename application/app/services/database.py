@@ -1,19 +1,56 @@
 """Database service for managing connections and sessions."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from typing import Dict, Any, Optional
 from app.config import settings
+from app.services.metrics_service import metrics_service
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+class _PoolWaitTimingMixin:
+    """Records how long callers wait for a pooled connection."""
+    
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics_service.record_database_pool_timeout()
+            raise
+        metrics_service.record_database_pool_wait(time.perf_counter() - start_time)
+        return connection
+
+
+class InstrumentedQueuePool(_PoolWaitTimingMixin, QueuePool):
+    """Queue pool with checkout wait-time metrics."""
+
+
+class InstrumentedAsyncQueuePool(_PoolWaitTimingMixin, AsyncAdaptedQueuePool):
+    """Async-adapted queue pool with checkout wait-time metrics."""
+
+
+# Async drivers used when deriving the async URL from ``database_url``
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+
 class DatabaseService:
     """Database service for managing connections."""
     
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory = None
         self._setup_database()
     
     def _setup_database(self):
@@ -22,10 +59,11 @@ class DatabaseService:
             # Create engine with connection pooling
             self.engine = create_engine(
                 settings.database_url,
-                poolclass=StaticPool,
                 pool_pre_ping=True,
-                echo=settings.debug
+                echo=settings.debug,
+                **self._pool_options(settings.database_url)
             )
+            self._instrument_pool(self.engine)
             
             # Create session factory
             self.SessionLocal = sessionmaker(
@@ -35,25 +73,143 @@ class DatabaseService:
             )
             
             logger.info("Database connection established successfully")
-            
+        
         except Exception as e:
             logger.error(f"Failed to setup database: {e}")
             raise
     
+    def _pool_options(self, database_url: str, is_async: bool = False) -> Dict[str, Any]:
+        """Get pool arguments for the configured database."""
+        if database_url.startswith("sqlite"):
+            # SQLite (tests/local) keeps a single shared connection
+            options = {"poolclass": StaticPool}
+            if not is_async:
+                options["connect_args"] = {"check_same_thread": False}
+            return options
+        
+        return {
+            "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout_s,
+            "pool_recycle": settings.database_pool_recycle_s
+        }
+    
+    def _instrument_pool(self, engine):
+        """Attach pool event listeners that feed connection metrics."""
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checkout_time"] = time.perf_counter()
+            metrics_service.record_database_checkout(pool.checkedout(), max(pool.overflow(), 0))
+        
+        @event.listens_for(engine, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            checkout_time = connection_record.info.pop("checkout_time", None)
+            held = time.perf_counter() - checkout_time if checkout_time is not None else None
+            # The event fires before the connection is returned: it either
+            # goes back to the queue or, when the queue is full, is discarded
+            # and the overflow count drops.
+            overflow = max(pool.overflow(), 0)
+            if overflow and pool.checkedin() >= pool.size():
+                overflow -= 1
+            metrics_service.record_database_checkin(max(pool.checkedout() - 1, 0), overflow, held)
+    
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Get current connection pool status."""
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"pool_class": type(pool).__name__}
+        
+        return {
+            "pool_class": type(pool).__name__,
+            "pool_size": pool.size(),
+            "max_overflow": settings.database_max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "connections_max": pool.size() + settings.database_max_overflow
+        }
+    
+    def get_async_database_url(self) -> str:
+        """Get the async driver URL for the configured database."""
+        if settings.database_async_url:
+            return settings.database_async_url
+        
+        url = make_url(settings.database_url)
+        backend = url.get_backend_name()
+        if url.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+            return url.render_as_string(hide_password=False)
+        return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+    
+    def _setup_async_database(self):
+        """Setup async engine and session factory on first use."""
+        async_url = self.get_async_database_url()
+        self._async_engine = create_async_engine(
+            async_url,
+            pool_pre_ping=True,
+            echo=settings.debug,
+            **self._pool_options(async_url, is_async=True)
+        )
+        self._instrument_pool(self._async_engine.sync_engine)
+        
+        self._async_session_factory = async_sessionmaker(
+            self._async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        logger.info("Async database engine created")
+    
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Get the async engine, creating it if needed."""
+        if self._async_engine is None:
+            self._setup_async_database()
+        return self._async_engine
+    
     def get_session(self) -> Session:
         """Get database session."""
         return self.SessionLocal()
     
+    def get_async_session(self) -> AsyncSession:
+        """Get async database session."""
+        if self._async_session_factory is None:
+            self._setup_async_database()
+        return self._async_session_factory()
+    
     def close_session(self, session: Session):
         """Close database session."""
         session.close()
     
+    async def close_async_session(self, session: AsyncSession):
+        """Close async database session."""
+        await session.close()
+    
+    async def dispose_async_engine(self):
+        """Dispose the async engine and its pooled connections."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+    
     def create_tables(self):
         """Create all database tables."""
         from app.models.database import Base
         try:
             Base.metadata.create_all(bind=self.engine)
             logger.info("Database tables created successfully")
+            
+            from app.services.schema_indexes import SchemaIndexManager
+            SchemaIndexManager(self.engine).migrate()
+            
+            if settings.telemetry_partitioning_enabled:
+                from app.services.telemetry_partitions import TelemetryPartitionManager
+                manager = TelemetryPartitionManager(self.engine)
+                if manager.supported:
+                    manager.ensure_partitions()
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
             raise
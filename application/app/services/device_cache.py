@@ -0,0 +1,119 @@
+"""In-process cache mapping external device IDs to device primary keys."""
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceIdCache:
+    """Bounded LRU cache of ``Device.device_id`` -> ``Device.id`` with TTL.
+    
+    Only existing devices are cached; lookups for unknown devices always
+    fall through to the database so newly registered devices are seen at once.
+    """
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, device_id: str) -> Optional[str]:
+        """Get cached primary key for a device, or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is not None:
+                pk, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(device_id)
+                    self.hits += 1
+                    metrics_service.record_device_cache_hit()
+                    return pk
+                del self._entries[device_id]
+            self.misses += 1
+        metrics_service.record_device_cache_miss()
+        return None
+    
+    def set(self, device_id: str, pk: str):
+        """Cache the primary key for a device."""
+        with self._lock:
+            self._entries[device_id] = (pk, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(device_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, device_id: str):
+        """Drop a device from the cache."""
+        with self._lock:
+            self._entries.pop(device_id, None)
+    
+    def clear(self):
+        """Drop all cached entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def resolve(self, db: Session, device_id: str) -> Optional[str]:
+        """Resolve a device ID to its primary key, querying the database on miss."""
+        pk = self.get(device_id)
+        if pk is not None:
+            return pk
+        
+        from app.models.database import Device
+        row = db.query(Device.id).filter(Device.device_id == device_id).first()
+        if row is None:
+            return None
+        
+        self.set(device_id, row[0])
+        return row[0]
+    
+    def resolve_many(self, db: Session, device_ids: Iterable[str]) -> Dict[str, str]:
+        """Resolve several device IDs with at most one database query."""
+        resolved = {}
+        missing = []
+        for device_id in set(device_ids):
+            pk = self.get(device_id)
+            if pk is not None:
+                resolved[device_id] = pk
+            else:
+                missing.append(device_id)
+        
+        if missing:
+            from app.models.database import Device
+            rows = db.query(Device.device_id, Device.id).filter(Device.device_id.in_(missing)).all()
+            for device_id, pk in rows:
+                self.set(device_id, pk)
+                resolved[device_id] = pk
+        
+        return resolved
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global device ID cache instance
+device_id_cache = DeviceIdCache(
+    max_size=settings.device_cache_max_size,
+    ttl_seconds=settings.device_cache_ttl_s
+)
@@ -0,0 +1,189 @@
+"""Compact per-device metric table with bounded Prometheus export."""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from prometheus_client.core import GaugeMetricFamily
+
+# Counter columns kept per device
+COLUMNS = (
+    "telemetry_total",
+    "audio_processed_total",
+    "audio_processing_seconds_total",
+    "drone_detections_total",
+    "drone_detections_high_total",
+    "last_seen"
+)
+COLUMN_INDEX = {name: index for index, name in enumerate(COLUMNS)}
+
+# Label used once the group cap is reached
+OTHER_GROUP = "__other__"
+
+
+class DeviceMetricsTable:
+    """Per-device counters stored in one growable float64 array.
+    
+    Each device owns a row; the table grows by doubling up to ``max_devices``
+    and further devices are folded into a shared overflow row. Prometheus
+    only ever sees device groups (see ``group_of``) and the top-K devices,
+    while full per-device detail is served through ``page``.
+    """
+    
+    def __init__(
+        self,
+        max_devices: int = 10000,
+        group_mode: str = "prefix",
+        max_groups: int = 50,
+        initial_capacity: int = 256
+    ):
+        self.max_devices = max_devices
+        self.group_mode = group_mode
+        self.max_groups = max_groups
+        self._values = np.zeros((min(initial_capacity, max_devices) + 1, len(COLUMNS)), dtype=np.float64)
+        self._rows: Dict[str, int] = {}
+        self._device_ids: List[str] = []
+        self._groups: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def group_of(self, device_id: str) -> str:
+        """Get the bounded Prometheus group label for a device.
+        
+        ``fleet`` puts every device in one group, ``prefix`` groups by the
+        device ID up to the first ``-`` (``sensor-0042`` -> ``sensor``) and
+        ``device`` keeps per-device labels (only sensible for small fleets).
+        Groups beyond ``max_groups`` share one label.
+        """
+        group = self._groups.get(device_id)
+        if group is not None:
+            return group
+        
+        if self.group_mode == "fleet":
+            group = "fleet"
+        elif self.group_mode == "device":
+            group = device_id
+        else:
+            group = device_id.split("-", 1)[0] or device_id
+        
+        with self._lock:
+            known_groups = set(self._groups.values())
+            if group not in known_groups and len(known_groups) >= self.max_groups:
+                group = OTHER_GROUP
+            if len(self._groups) < self.max_devices:
+                self._groups[device_id] = group
+        return group
+    
+    def _row(self, device_id: str) -> int:
+        """Get (or allocate) the row for a device. Call with the lock held."""
+        row = self._rows.get(device_id)
+        if row is not None:
+            return row
+        if len(self._device_ids) >= self.max_devices:
+            return self._values.shape[0] - 1  # overflow row
+        
+        row = len(self._device_ids)
+        if row >= self._values.shape[0] - 1:
+            capacity = min(max(2 * row, 1), self.max_devices)
+            grown = np.zeros((capacity + 1, len(COLUMNS)), dtype=np.float64)
+            grown[:row] = self._values[:row]
+            grown[-1] = self._values[-1]
+            self._values = grown
+        self._rows[device_id] = row
+        self._device_ids.append(device_id)
+        return row
+    
+    def add(self, device_id: str, column: str, amount: float = 1.0):
+        """Add to a device counter and refresh its last-seen time."""
+        with self._lock:
+            row = self._row(device_id)
+            self._values[row, COLUMN_INDEX[column]] += amount
+            self._values[row, COLUMN_INDEX["last_seen"]] = time.time()
+    
+    def get(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Get counters for one device."""
+        with self._lock:
+            row = self._rows.get(device_id)
+            if row is None:
+                return None
+            return self._as_dict(device_id, self._values[row])
+    
+    def top_k(self, column: str, k: int) -> List[Tuple[str, float]]:
+        """Get the ``k`` devices with the highest value in a column."""
+        with self._lock:
+            count = len(self._device_ids)
+            if count == 0 or k <= 0:
+                return []
+            values = self._values[:count, COLUMN_INDEX[column]]
+            k = min(k, count)
+            indexes = np.argpartition(-values, k - 1)[:k]
+            indexes = indexes[np.argsort(-values[indexes], kind="stable")]
+            return [(self._device_ids[i], float(values[i])) for i in indexes if values[i] > 0]
+    
+    def page(self, offset: int = 0, limit: int = 100, sort_by: str = "telemetry_total") -> Tuple[List[Dict[str, Any]], int]:
+        """Get a page of per-device counters sorted descending by a column."""
+        with self._lock:
+            count = len(self._device_ids)
+            values = self._values[:count]
+            order = np.argsort(-values[:, COLUMN_INDEX[sort_by]], kind="stable")[offset:offset + limit]
+            items = [self._as_dict(self._device_ids[i], values[i]) for i in order]
+            return items, count
+    
+    def active_count(self, since: float) -> int:
+        """Count devices seen at or after ``since`` (epoch seconds)."""
+        with self._lock:
+            return int(np.count_nonzero(self._values[:len(self._device_ids), COLUMN_INDEX["last_seen"]] >= since))
+    
+    def overflow(self) -> Dict[str, float]:
+        """Get counters accumulated for devices beyond ``max_devices``."""
+        with self._lock:
+            return {name: float(self._values[-1, index]) for name, index in COLUMN_INDEX.items() if name != "last_seen"}
+    
+    def clear(self):
+        """Drop all devices."""
+        with self._lock:
+            self._values[:] = 0
+            self._rows.clear()
+            self._device_ids.clear()
+            self._groups.clear()
+    
+    def __len__(self) -> int:
+        return len(self._device_ids)
+    
+    @staticmethod
+    def _as_dict(device_id: str, row: np.ndarray) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"device_id": device_id}
+        for name, index in COLUMN_INDEX.items():
+            value = float(row[index])
+            if name == "last_seen":
+                item[name] = datetime.fromtimestamp(value, timezone.utc).isoformat() if value else None
+            elif name.endswith("seconds_total"):
+                item[name] = value
+            else:
+                item[name] = int(value)
+        return item
+
+
+class TopDevicesCollector:
+    """Exports only the top-K devices per counter, computed at scrape time."""
+    
+    def __init__(self, table: DeviceMetricsTable, k: int):
+        self.table = table
+        self.k = k
+    
+    def describe(self):
+        return []
+    
+    def collect(self):
+        for column, description in (
+            ("telemetry_total", "Telemetry messages for the busiest devices"),
+            ("drone_detections_total", "Drone detections for the most active devices")
+        ):
+            family = GaugeMetricFamily(f"device_top_{column}", description, labels=["device_id"])
+            for device_id, value in self.table.top_k(column, self.k):
+                family.add_metric([device_id], value)
+            yield family
+        
+        tracked = GaugeMetricFamily("device_metrics_tracked_devices", "Devices tracked in the per-device metrics table")
+        tracked.add_metric([], len(self.table))
+        yield tracked
@@ -6,8 +6,11 @@ from datetime import datetime
 import logging
 
 from app.models.database import Device
+from app.services.device_cache import device_id_cache
+from app.services.pagination import paginate
 from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceResponse, DeviceListResponse
 from app.schemas.device import DeviceType, DeviceStatus
+from app.schemas.pagination import TotalMode
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +44,7 @@ class DeviceService:
             self.db.add(device)
             self.db.commit()
             self.db.refresh(device)
+            device_id_cache.set(device.device_id, device.id)
             
             logger.info(f"Device {device_data.device_id} created successfully")
             return DeviceResponse.from_orm(device)
@@ -111,6 +115,7 @@ class DeviceService:
             
             self.db.delete(device)
             self.db.commit()
+            device_id_cache.invalidate(device_id)
             
             logger.info(f"Device {device_id} deleted successfully")
             return True
@@ -126,9 +131,15 @@ class DeviceService:
         page_size: int = 10,
         device_type: Optional[DeviceType] = None,
         status: Optional[DeviceStatus] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
     ) -> DeviceListResponse:
-        """List devices with pagination and filtering."""
+        """List devices with pagination and filtering, newest first.
+        
+        Pass the previous page's ``next_cursor`` to continue with keyset
+        pagination on ``(created_at, id)``.
+        """
         try:
             query = self.db.query(Device)
             
@@ -146,12 +157,15 @@ class DeviceService:
                     )
                 )
             
-            # Get total count
-            total = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * page_size
-            devices = query.offset(offset).limit(page_size).all()
+            devices, total, next_cursor = paginate(
+                query,
+                Device.created_at,
+                Device.id,
+                page_size,
+                cursor=cursor,
+                page=page,
+                total_mode=total_mode
+            )
             
             # Convert to response format
             device_responses = [DeviceResponse.from_orm(device) for device in devices]
@@ -160,7 +174,8 @@ class DeviceService:
                 devices=device_responses,
                 total=total,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -0,0 +1,180 @@
+"""Content-addressed cache for extracted audio features."""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when feature extraction code changes so stale vectors are not reused
+FEATURE_SCHEMA_VERSION = 1
+
+
+def feature_config_version() -> str:
+    """Get the feature configuration part of the cache key."""
+    return (
+        f"v{FEATURE_SCHEMA_VERSION}:mfcc={settings.mfcc_features_count}:"
+        f"mels={settings.mel_spectrogram_bins}:sr={settings.audio_sample_rate}"
+    )
+
+
+class FeatureCache:
+    """LRU cache of feature vectors keyed by a hash of the decoded audio.
+    
+    The key covers the samples, their sample rate, the feature kind and the
+    feature configuration, so retried uploads and the same clip analysed for
+    several use cases reuse one extraction. Memory use is bounded in bytes;
+    an optional disk tier keeps vectors across restarts and workers.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def key(self, audio_data: np.ndarray, sample_rate: int, kind: str) -> str:
+        """Build the cache key for a clip and feature kind."""
+        samples = np.ascontiguousarray(audio_data)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{feature_config_version()}:{kind}:{sample_rate}:{samples.dtype.str}:".encode())
+        digest.update(samples.view(np.uint8))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get cached features, checking memory then disk."""
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if features is not None:
+            metrics_service.record_feature_cache_hit("memory")
+            return features
+        
+        features = self._read_disk(key)
+        if features is not None:
+            with self._lock:
+                self.disk_hits += 1
+            metrics_service.record_feature_cache_hit("disk")
+            self._store(key, features)
+            return features
+        
+        with self._lock:
+            self.misses += 1
+        metrics_service.record_feature_cache_miss()
+        return None
+    
+    def set(self, key: str, features: np.ndarray):
+        """Cache features in memory and, if enabled, on disk."""
+        features = np.array(features)
+        features.setflags(write=False)
+        self._store(key, features)
+        self._write_disk(key, features)
+    
+    def get_or_compute(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        kind: str,
+        compute: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """Get cached features for a clip or compute and cache them."""
+        key = self.key(audio_data, sample_rate, kind)
+        features = self.get(key)
+        if features is None:
+            features = compute()
+            self.set(key, features)
+        return features
+    
+    def clear(self):
+        """Drop in-memory entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+        metrics_service.update_feature_cache_bytes(0)
+    
+    def _store(self, key: str, features: np.ndarray):
+        """Insert into the memory tier, evicting least recently used entries."""
+        if features.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            self._entries[key] = features
+            self._size += features.nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.nbytes
+            size = self._size
+        metrics_service.update_feature_cache_bytes(size)
+    
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, key[:2], f"{key}.npy")
+    
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if not self.disk_path:
+            return None
+        path = self._disk_file(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            features = np.load(path, allow_pickle=False)
+            features.setflags(write=False)
+            return features
+        except Exception as e:
+            logger.warning(f"Failed to read cached features {path}: {e}")
+            return None
+    
+    def _write_disk(self, key: str, features: np.ndarray):
+        if not self.disk_path:
+            return
+        path = self._disk_file(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, features, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cached features {path}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.disk_path),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "config_version": feature_config_version()
+            }
+
+
+# Global feature cache instance
+feature_cache = FeatureCache(
+    max_bytes=settings.feature_cache_max_bytes,
+    disk_path=os.path.join(settings.temp_storage_path, "feature_cache") if settings.feature_cache_disk_enabled else None
+)
@@ -0,0 +1,142 @@
+"""Micro-batching layer for model inference."""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBatcher:
+    """Batches single feature vectors into one ``predict_proba`` call per model.
+    
+    Callers from any thread submit one vector and block (or await) on a
+    future. A worker thread collects up to ``max_batch_size`` vectors or waits
+    at most ``max_wait_ms`` after the first one, scores the stacked matrix with
+    a single ``predict_proba`` and hands each caller its row. Labels are
+    derived from that same output, so ``predict`` is never called separately.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        model: Any,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.name = name
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future, float]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+    
+    def _ensure_worker(self):
+        """Start the batching thread on first use."""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"inference-batcher-{self.name}", daemon=True
+                    )
+                    self._thread.start()
+    
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue one feature vector; the future resolves to its probability row."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((np.asarray(features).ravel(), future, time.perf_counter()))
+        return future
+    
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Get class probabilities for one feature vector."""
+        return self.submit(features).result()
+    
+    async def predict_proba_async(self, features: np.ndarray) -> np.ndarray:
+        """Get class probabilities without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(features))
+    
+    def predict(self, features: np.ndarray) -> Tuple[Any, np.ndarray]:
+        """Get the predicted label and class probabilities for one feature vector."""
+        proba = self.predict_proba(features)
+        return self.label(proba), proba
+    
+    def label(self, proba: np.ndarray) -> Any:
+        """Map a probability row to a label (``classes_`` if the model has them, else the index)."""
+        index = int(np.argmax(proba))
+        classes = getattr(self.model, "classes_", None)
+        return classes[index] if classes is not None else index
+    
+    def _collect(self) -> List[Tuple[np.ndarray, Future, float]]:
+        """Block for the first item, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """Batching loop."""
+        while True:
+            batch = self._collect()
+            pending = [(features, future, queued_at) for features, future, queued_at in batch
+                       if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            
+            try:
+                started = time.perf_counter()
+                matrix = np.vstack([features for features, _, _ in pending])
+                proba = np.asarray(self.model.predict_proba(matrix))
+                
+                for row, (_, future, _) in zip(proba, pending):
+                    future.set_result(row)
+                
+                self.batches += 1
+                self.items += len(pending)
+                metrics_service.record_inference_batch(
+                    self.name, len(pending), started - min(queued_at for _, _, queued_at in pending)
+                )
+            except Exception as e:
+                logger.error(f"Batched inference failed for {self.name}: {e}")
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000
+        }
+
+
+def create_batcher(name: str, model: Any) -> InferenceBatcher:
+    """Create a batcher using the configured batch size and wait."""
+    return InferenceBatcher(
+        name,
+        model,
+        max_batch_size=settings.inference_batch_max_size,
+        max_wait_ms=settings.inference_batch_max_wait_ms
+    )
@@ -1,17 +1,32 @@
 """Metrics and monitoring service."""
 import time
 import logging
-from typing import Dict, Any, Optional
-from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, CONTENT_TYPE_LATEST
+from typing import Dict, Any, Optional, Tuple
+from prometheus_client import Counter, Histogram, Gauge, Info, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
 from fastapi import Response
 
+from app.config import settings
+from app.services.device_metrics import DeviceMetricsTable, TopDevicesCollector
+
 logger = logging.getLogger(__name__)
 
 
+def latency_buckets(target_ms: float) -> Tuple[float, ...]:
+    """Histogram buckets (seconds) concentrated around a latency target."""
+    target_s = target_ms / 1000
+    return tuple(round(target_s * factor, 6) for factor in (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 25.0))
+
+
 class MetricsService:
     """Service for collecting and exposing metrics."""
     
     def __init__(self):
+        # Per-device counters stay in process; Prometheus sees device groups and the top-K only
+        self.device_table = DeviceMetricsTable(
+            max_devices=settings.max_concurrent_devices,
+            group_mode=settings.device_metrics_group_mode,
+            max_groups=settings.device_metrics_max_groups
+        )
         self._setup_metrics()
     
     def _setup_metrics(self):
@@ -33,7 +48,8 @@ class MetricsService:
         self.request_duration = Histogram(
             'http_request_duration_seconds',
             'HTTP request duration in seconds',
-            ['method', 'endpoint']
+            ['method', 'endpoint'],
+            buckets=latency_buckets(settings.max_latency_ms)
         )
         
         # Device metrics
@@ -56,20 +72,20 @@ class MetricsService:
         self.telemetry_count = Counter(
             'telemetry_data_total',
             'Total telemetry data received',
-            ['device_id', 'data_type']
+            ['device_group', 'data_type']
         )
         
         self.audio_processing_duration = Histogram(
             'audio_processing_duration_seconds',
             'Audio processing duration in seconds',
-            ['device_id']
+            ['device_group']
         )
         
         # ML metrics
         self.drone_detections = Counter(
             'drone_detections_total',
             'Total drone detections',
-            ['device_id', 'confidence_level']
+            ['device_group', 'confidence_level']
         )
         
         self.ml_processing_errors = Counter(
@@ -104,6 +120,29 @@ class MetricsService:
             ['topic']
         )
         
+        self.mqtt_ingest_queue_depth = Gauge(
+            'mqtt_ingest_queue_depth',
+            'MQTT messages waiting in the ingest queue'
+        )
+        
+        self.mqtt_ingest_lag = Histogram(
+            'mqtt_ingest_lag_seconds',
+            'Time from MQTT message receipt until a worker picks it up',
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        )
+        
+        self.mqtt_ingest_batch_size = Histogram(
+            'mqtt_ingest_batch_size',
+            'MQTT messages handled per ingest batch',
+            buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)
+        )
+        
+        self.mqtt_ingest_dropped = Counter(
+            'mqtt_ingest_dropped_total',
+            'MQTT messages dropped by the ingest pipeline',
+            ['reason']
+        )
+        
         # Database metrics
         self.database_connections = Gauge(
             'database_connections_active',
@@ -116,6 +155,79 @@ class MetricsService:
             ['operation']
         )
         
+        self.database_pool_overflow = Gauge(
+            'database_pool_overflow_connections',
+            'Connections open beyond the base pool size'
+        )
+        
+        self.database_pool_overflow_checkouts = Counter(
+            'database_pool_overflow_checkouts_total',
+            'Connection checkouts served while the pool was in overflow'
+        )
+        
+        self.database_pool_timeouts = Counter(
+            'database_pool_timeouts_total',
+            'Connection checkouts that timed out waiting for the pool'
+        )
+        
+        self.database_pool_wait = Histogram(
+            'database_pool_wait_seconds',
+            'Time spent waiting to check out a pooled connection',
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+        )
+        
+        self.database_connection_hold = Histogram(
+            'database_connection_hold_seconds',
+            'Time a connection stays checked out of the pool',
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+        )
+        
+        # Device ID cache metrics
+        self.device_cache_hits = Counter(
+            'device_cache_hits_total',
+            'Device ID resolution cache hits'
+        )
+        
+        self.device_cache_misses = Counter(
+            'device_cache_misses_total',
+            'Device ID resolution cache misses'
+        )
+        
+        # Inference batching metrics
+        self.inference_batch_size = Histogram(
+            'inference_batch_size',
+            'Feature vectors scored per model call',
+            ['model'],
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+        )
+        
+        self.inference_queue_wait = Histogram(
+            'inference_queue_wait_seconds',
+            'Time a feature vector waits to be batched',
+            ['model'],
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+        )
+        
+        # Feature cache metrics
+        self.feature_cache_hits = Counter(
+            'feature_cache_hits_total',
+            'Feature cache hits',
+            ['tier']
+        )
+        
+        self.feature_cache_misses = Counter(
+            'feature_cache_misses_total',
+            'Feature cache misses'
+        )
+        
+        self.feature_cache_bytes = Gauge(
+            'feature_cache_memory_bytes',
+            'Bytes held by the in-memory feature cache'
+        )
+        
+        self.top_devices_collector = TopDevicesCollector(self.device_table, settings.device_metrics_top_k)
+        REGISTRY.register(self.top_devices_collector)
+        
         logger.info("Metrics service initialized")
     
     def record_request(self, method: str, endpoint: str, status_code: int, duration: float):
@@ -131,16 +243,36 @@ class MetricsService:
     
     def record_telemetry(self, device_id: str, data_type: str):
         """Record telemetry data metrics."""
-        self.telemetry_count.labels(device_id=device_id, data_type=data_type).inc()
+        self.device_table.add(device_id, "telemetry_total")
+        self.telemetry_count.labels(device_group=self.device_table.group_of(device_id), data_type=data_type).inc()
     
     def record_audio_processing(self, device_id: str, duration: float):
         """Record audio processing metrics."""
-        self.audio_processing_duration.labels(device_id=device_id).observe(duration)
+        self.device_table.add(device_id, "audio_processed_total")
+        self.device_table.add(device_id, "audio_processing_seconds_total", duration)
+        self.audio_processing_duration.labels(device_group=self.device_table.group_of(device_id)).observe(duration)
     
     def record_drone_detection(self, device_id: str, confidence: float):
         """Record drone detection metrics."""
         confidence_level = "high" if confidence > 0.9 else "medium" if confidence > 0.7 else "low"
-        self.drone_detections.labels(device_id=device_id, confidence_level=confidence_level).inc()
+        self.device_table.add(device_id, "drone_detections_total")
+        if confidence_level == "high":
+            self.device_table.add(device_id, "drone_detections_high_total")
+        self.drone_detections.labels(
+            device_group=self.device_table.group_of(device_id), confidence_level=confidence_level
+        ).inc()
+    
+    def get_device_metrics(self, offset: int = 0, limit: int = 100, sort_by: str = "telemetry_total") -> Dict[str, Any]:
+        """Get a page of per-device metrics."""
+        items, total = self.device_table.page(offset=offset, limit=limit, sort_by=sort_by)
+        return {
+            "items": items,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "sort_by": sort_by,
+            "overflow": self.device_table.overflow()
+        }
     
     def record_ml_error(self, error_type: str):
         """Record ML processing error."""
@@ -163,6 +295,19 @@ class MetricsService:
         """Record MQTT message received."""
         self.mqtt_messages_received.labels(topic=topic).inc()
     
+    def update_mqtt_ingest_queue_depth(self, depth: int):
+        """Update MQTT ingest queue depth."""
+        self.mqtt_ingest_queue_depth.set(depth)
+    
+    def record_mqtt_ingest_batch(self, batch_size: int, lag: float):
+        """Record an MQTT ingest batch and the wait of its oldest message."""
+        self.mqtt_ingest_batch_size.observe(batch_size)
+        self.mqtt_ingest_lag.observe(lag)
+    
+    def record_mqtt_ingest_dropped(self, reason: str):
+        """Record an MQTT message dropped by the ingest pipeline."""
+        self.mqtt_ingest_dropped.labels(reason=reason).inc()
+    
     def record_database_operation(self, operation: str, duration: float):
         """Record database operation metrics."""
         self.database_query_duration.labels(operation=operation).observe(duration)
@@ -171,6 +316,53 @@ class MetricsService:
         """Update database connections metric."""
         self.database_connections.set(count)
     
+    def record_database_pool_wait(self, duration: float):
+        """Record time spent waiting for a pooled connection."""
+        self.database_pool_wait.observe(duration)
+    
+    def record_database_pool_timeout(self):
+        """Record a pool checkout timeout."""
+        self.database_pool_timeouts.inc()
+    
+    def record_database_checkout(self, checked_out: int, overflow: int):
+        """Record a connection checkout from the pool."""
+        self.database_connections.set(checked_out)
+        self.database_pool_overflow.set(overflow)
+        if overflow > 0:
+            self.database_pool_overflow_checkouts.inc()
+    
+    def record_database_checkin(self, checked_out: int, overflow: int, held: Optional[float] = None):
+        """Record a connection returned to the pool."""
+        self.database_connections.set(checked_out)
+        self.database_pool_overflow.set(overflow)
+        if held is not None:
+            self.database_connection_hold.observe(held)
+    
+    def record_device_cache_hit(self):
+        """Record device ID cache hit."""
+        self.device_cache_hits.inc()
+    
+    def record_device_cache_miss(self):
+        """Record device ID cache miss."""
+        self.device_cache_misses.inc()
+    
+    def record_inference_batch(self, model: str, batch_size: int, max_wait: float):
+        """Record a batched model call."""
+        self.inference_batch_size.labels(model=model).observe(batch_size)
+        self.inference_queue_wait.labels(model=model).observe(max_wait)
+    
+    def record_feature_cache_hit(self, tier: str):
+        """Record feature cache hit."""
+        self.feature_cache_hits.labels(tier=tier).inc()
+    
+    def record_feature_cache_miss(self):
+        """Record feature cache miss."""
+        self.feature_cache_misses.inc()
+    
+    def update_feature_cache_bytes(self, size: int):
+        """Update feature cache memory usage."""
+        self.feature_cache_bytes.set(size)
+    
     def get_metrics(self) -> str:
         """Get metrics in Prometheus format."""
         return generate_latest()
@@ -0,0 +1,174 @@
+"""Process-pool executor for CPU-bound ML inference."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.schemas.telemetry import ProcessingResult
+from app.services.audio_decoder import decode_audio
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """Load the ML models once per worker process so they stay resident."""
+    from app.services.ml_service import ml_service
+    logger.info(f"ML worker {os.getpid()} ready: {ml_service.get_model_info()}")
+
+
+def _process_file_in_worker(file_path: str) -> ProcessingResult:
+    """Run drone detection on an audio file inside a worker process."""
+    from app.services.ml_service import ml_service
+    return ml_service.process_audio_file(file_path)
+
+
+def _process_shared_buffer_in_worker(shm_name: str, sample_count: int, sample_rate: int) -> ProcessingResult:
+    """Run drone detection on float32 samples held in shared memory."""
+    from app.services.ml_service import ml_service
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio_array = np.ndarray((sample_count,), dtype=np.float32, buffer=shm.buf)
+        try:
+            return ml_service.process_audio_array(audio_array, sample_rate)
+        finally:
+            # Drop the view before closing; open exports block close()
+            del audio_array
+    finally:
+        shm.close()
+
+
+class MLExecutor:
+    """Runs ML inference in a pool of worker processes.
+    
+    Each worker loads the models at startup and keeps them resident, so
+    feature extraction and prediction scale across cores without the GIL.
+    Audio is passed as a file path or through shared memory instead of being
+    pickled. When the pool is disabled or broken, work falls back to the
+    in-process ML service on a thread so the event loop is never blocked.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, enabled: bool = True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.enabled = enabled
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the worker processes."""
+        with self._lock:
+            if self.enabled and self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+                logger.info(f"ML executor started with {self.max_workers} worker processes")
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+            logger.info("ML executor stopped")
+    
+    @property
+    def running(self) -> bool:
+        """Whether inference is dispatched to worker processes."""
+        return self._pool is not None
+    
+    def _submit(self, fn: Callable[..., ProcessingResult], *args) -> Optional[Future]:
+        """Submit work to the pool, or return None when it is unavailable."""
+        pool = self._pool
+        if pool is None:
+            return None
+        try:
+            return pool.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.error(f"ML executor unavailable, restarting pool: {e}")
+            self._restart(pool)
+            return None
+    
+    def _restart(self, broken_pool: ProcessPoolExecutor):
+        """Replace a broken pool (e.g. a worker was killed)."""
+        with self._lock:
+            if self._pool is broken_pool:
+                self._pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        self.start()
+    
+    def _result(self, future: Future, fallback: Callable[[], ProcessingResult]) -> ProcessingResult:
+        """Wait for a pool result, falling back to in-process inference if a worker died."""
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            logger.error(f"ML worker died during inference, running in-process: {e}")
+            pool = self._pool
+            if pool is not None:
+                self._restart(pool)
+            return fallback()
+    
+    def process_audio_file(self, file_path: str) -> ProcessingResult:
+        """Process an audio file, blocking the calling thread until done."""
+        from app.services.ml_service import ml_service
+        fallback = lambda: ml_service.process_audio_file(file_path)
+        future = self._submit(_process_file_in_worker, file_path)
+        if future is None:
+            return fallback()
+        return self._result(future, fallback)
+    
+    async def process_audio_file_async(self, file_path: str) -> ProcessingResult:
+        """Process an audio file without blocking the event loop."""
+        return await asyncio.to_thread(self.process_audio_file, file_path)
+    
+    def process_audio_data(self, audio_data: bytes, sample_rate: int) -> ProcessingResult:
+        """Process encoded or raw float32 audio bytes, handing decoded samples to a worker via shared memory."""
+        from app.services.ml_service import ml_service
+        try:
+            samples, sample_rate = decode_audio(audio_data, raw_sample_rate=sample_rate)
+        except ValueError:
+            # Let the ML service report the undecodable input
+            return ml_service.process_audio_data(audio_data, sample_rate)
+        
+        fallback = lambda: ml_service.process_audio_array(samples, sample_rate)
+        if self._pool is None:
+            return fallback()
+        
+        nbytes = samples.size * np.dtype(np.float32).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        try:
+            np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+            future = self._submit(_process_shared_buffer_in_worker, shm.name, samples.size, sample_rate)
+            if future is None:
+                return fallback()
+            return self._result(future, fallback)
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    async def process_audio_data_async(self, audio_data: bytes, sample_rate: int) -> ProcessingResult:
+        """Process raw audio bytes without blocking the event loop."""
+        return await asyncio.to_thread(self.process_audio_data, audio_data, sample_rate)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get executor status."""
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "max_workers": self.max_workers
+        }
+
+
+# Global ML executor instance
+ml_executor = MLExecutor(
+    max_workers=settings.ml_worker_processes,
+    enabled=settings.ml_executor_enabled
+)
@@ -1,6 +1,5 @@
 """ML service for sound analytics and drone detection."""
 import numpy as np
-import librosa
 import soundfile as sf
 import logging
 import pickle
@@ -11,6 +10,11 @@ import joblib
 
 from app.config import settings
 from app.schemas.telemetry import ProcessingResult
+from app.services.audio_decoder import decode_audio, resample
+from app.services.audio_mmap_reader import audio_store_reader
+from app.services.audio_features import SpectralFrontEnd, extract_basic_features
+from app.services.inference_batcher import create_batcher
+from app.services.feature_cache import feature_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,8 @@ class MLService:
         self.sound_classifier = None
         self.feature_extractor = None
         self._load_models()
+        self.drone_detection_batcher = create_batcher("drone_detection", self.drone_detection_model)
+        self.sound_classifier_batcher = create_batcher("sound_classifier", self.sound_classifier)
     
     def _load_models(self):
         """Load ML models."""
@@ -74,6 +80,8 @@ class MLService:
     def _create_mock_classifier(self):
         """Create a mock sound classifier for POC."""
         class MockSoundClassifier:
+            classes_ = np.array(['drone', 'aircraft', 'vehicle', 'ambient', 'unknown'])
+            
             def predict(self, X):
                 # Mock classification - returns random classes
                 n_samples = X.shape[0]
@@ -92,37 +100,11 @@ class MLService:
     def extract_audio_features(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
         """Extract features from audio data."""
         try:
-            features = []
-            
-            # MFCC features
-            mfccs = librosa.feature.mfcc(y=audio_data, sr=sample_rate, n_mfcc=13)
-            features.extend(np.mean(mfccs, axis=1))
-            features.extend(np.std(mfccs, axis=1))
-            
-            # Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sample_rate)[0]
-            features.append(np.mean(spectral_centroids))
-            features.append(np.std(spectral_centroids))
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
-            features.append(np.mean(zcr))
-            features.append(np.std(zcr))
-            
-            # Spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sample_rate)[0]
-            features.append(np.mean(rolloff))
-            features.append(np.std(rolloff))
-            
-            # Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio_data, sr=sample_rate)
-            features.extend(np.mean(chroma, axis=1))
-            
-            # Mel-frequency cepstral coefficients
-            mel_spec = librosa.feature.melspectrogram(y=audio_data, sr=sample_rate)
-            features.extend(np.mean(mel_spec, axis=1)[:10])  # First 10 mel features
-            
-            return np.array(features)
+            # One STFT shared by all spectral features
+            compute = lambda: extract_basic_features(SpectralFrontEnd(audio_data, sample_rate), n_mfcc=13)
+            if not settings.feature_cache_enabled:
+                return compute()
+            return feature_cache.get_or_compute(audio_data, sample_rate, "basic", compute)
             
         except Exception as e:
             logger.error(f"Failed to extract audio features: {e}")
@@ -134,21 +116,52 @@ class MLService:
         try:
             start_time = datetime.now()
             
-            # Load audio file
-            audio_data, sample_rate = librosa.load(file_path, sr=settings.audio_sample_rate)
+            try:
+                clip = audio_store_reader.open(file_path)
+            except ValueError:
+                audio_data, sample_rate = decode_audio(file_path, target_sr=settings.audio_sample_rate)
+                return self._analyze_audio(audio_data, sample_rate, start_time)
+            
+            # Stored PCM WAV is viewed through a memory map and only resampled
+            # when the device did not record at the configured rate (the same
+            # header check the upload's stored_format was probed from). The
+            # whole job runs while the clip is mapped so native-rate float32
+            # clips are never copied; the samples are not bound here, so the
+            # view is gone before the mapping closes.
+            with clip:
+                return self._analyze_audio(
+                    clip.samples(target_sr=settings.audio_sample_rate), settings.audio_sample_rate, start_time
+                )
             
+        except Exception as e:
+            logger.error(f"Failed to process audio file {file_path}: {e}")
+            # Return error result
+            return ProcessingResult(
+                is_drone_detected=False,
+                confidence_score=0.0,
+                classification="error",
+                features={},
+                processing_time=0.0
+            )
+    
+    def _analyze_audio(self, audio_data: np.ndarray, sample_rate: int, start_time: datetime) -> ProcessingResult:
+        """Extract features and run both models on decoded samples.
+        
+        Errors are handled here rather than raised, so a traceback never
+        keeps memory-mapped samples alive while their clip is closed.
+        """
+        try:
             # Extract features
             features = self.extract_audio_features(audio_data, sample_rate)
             features = features.reshape(1, -1)  # Reshape for model input
             
-            # Drone detection
-            drone_prob = self.drone_detection_model.predict_proba(features)[0]
+            # Drone detection (batched with concurrent requests)
+            drone_prob = self.drone_detection_batcher.predict_proba(features)
             is_drone_detected = drone_prob[1] > 0.5
             confidence_score = float(drone_prob[1])
             
-            # Sound classification
-            classification = self.sound_classifier.predict(features)[0]
-            classification_proba = self.sound_classifier.predict_proba(features)[0]
+            # Sound classification, label taken from the same probabilities
+            classification, classification_proba = self.sound_classifier_batcher.predict(features)
             
             # Calculate processing time
             processing_time = (datetime.now() - start_time).total_seconds()
@@ -179,8 +192,7 @@ class MLService:
             return result
             
         except Exception as e:
-            logger.error(f"Failed to process audio file {file_path}: {e}")
-            # Return error result
+            logger.error(f"Failed to analyze audio: {e}")
             return ProcessingResult(
                 is_drone_detected=False,
                 confidence_score=0.0,
@@ -190,30 +202,37 @@ class MLService:
             )
     
     def process_audio_data(self, audio_data: bytes, sample_rate: int) -> ProcessingResult:
-        """Process raw audio data for drone detection."""
+        """Process encoded audio, or headerless float32 samples at ``sample_rate``, for drone detection."""
+        try:
+            audio_array, sample_rate = decode_audio(audio_data, raw_sample_rate=sample_rate)
+        except ValueError as e:
+            logger.error(f"Failed to decode audio data: {e}")
+            return ProcessingResult(
+                is_drone_detected=False,
+                confidence_score=0.0,
+                classification="error",
+                features={},
+                processing_time=0.0
+            )
+        return self.process_audio_array(audio_array, sample_rate)
+    
+    def process_audio_array(self, audio_array: np.ndarray, sample_rate: int) -> ProcessingResult:
+        """Process float32 audio samples for drone detection."""
         try:
-            # Convert bytes to numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.float32)
-            
             # Resample if necessary
-            if sample_rate != settings.audio_sample_rate:
-                audio_array = librosa.resample(
-                    audio_array, 
-                    orig_sr=sample_rate, 
-                    target_sr=settings.audio_sample_rate
-                )
+            audio_array = resample(audio_array, sample_rate, settings.audio_sample_rate)
             
             # Extract features
             features = self.extract_audio_features(audio_array, settings.audio_sample_rate)
             features = features.reshape(1, -1)
             
-            # Drone detection
-            drone_prob = self.drone_detection_model.predict_proba(features)[0]
+            # Drone detection (batched with concurrent requests)
+            drone_prob = self.drone_detection_batcher.predict_proba(features)
             is_drone_detected = drone_prob[1] > 0.5
             confidence_score = float(drone_prob[1])
             
-            # Sound classification
-            classification = self.sound_classifier.predict(features)[0]
+            # Sound classification, label taken from the same probabilities
+            classification, _ = self.sound_classifier_batcher.predict(features)
             
             # Calculate processing time
             processing_time = 0.1  # Mock processing time
@@ -267,7 +286,12 @@ class MLService:
             "feature_extractor": {
                 "loaded": True,
                 "type": "librosa_based"
-            }
+            },
+            "inference_batching": {
+                "drone_detection": self.drone_detection_batcher.get_stats(),
+                "sound_classifier": self.sound_classifier_batcher.get_stats()
+            },
+            "feature_cache": feature_cache.get_stats()
         }
 
 
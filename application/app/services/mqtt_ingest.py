@@ -0,0 +1,239 @@
+"""Bounded ingest pipeline between the MQTT network thread and message handlers."""
+import json
+import logging
+import queue
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from app.config import settings
+from app.schemas.telemetry import DataType
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Topic devices publish telemetry readings on
+TELEMETRY_TOPIC_FILTER = "devices/+/telemetry"
+
+# Top-level fields of a flat telemetry message that are not part of its payload
+_READING_FIELDS = ("device_id", "data_type", "timestamp")
+
+
+class OverflowPolicy(str, Enum):
+    """What the network thread does when the ingest queue is full."""
+    BLOCK = "block"  # wait for room (up to a timeout), pushing back on the broker
+    DROP_NEWEST = "drop_newest"  # reject the incoming message
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued message to make room
+
+
+class InboundMessage(NamedTuple):
+    """A raw message as received on the network thread."""
+    topic: str
+    payload: bytes
+    received_at: float  # time.monotonic()
+
+
+class DecodedMessage(NamedTuple):
+    """A message with its JSON payload parsed."""
+    topic: str
+    data: Dict[str, Any]
+    received_at: float
+
+
+class MQTTIngestPipeline:
+    """Decouples paho's network thread from message handling.
+    
+    ``offer`` only enqueues the raw message into a bounded queue. A pool of
+    worker threads drains the queue in batches of up to ``batch_size``
+    messages (waiting at most ``batch_wait_ms`` after the first), decodes
+    them and hands each batch to ``dispatch``. A slow handler therefore
+    only grows the queue; when it is full the ``overflow_policy`` decides
+    between backpressure and dropping.
+    """
+    
+    def __init__(
+        self,
+        dispatch: Callable[[List[DecodedMessage]], None],
+        queue_size: int = 10000,
+        worker_count: int = 4,
+        batch_size: int = 100,
+        batch_wait_ms: float = 50.0,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        block_timeout_s: float = 5.0
+    ):
+        self.dispatch = dispatch
+        self.worker_count = max(1, worker_count)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait_s = max(0.0, batch_wait_ms) / 1000
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.block_timeout_s = block_timeout_s
+        self._queue: "queue.Queue[InboundMessage]" = queue.Queue(maxsize=max(1, queue_size))
+        self._workers: List[threading.Thread] = []
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.accepted = 0
+        self.dropped = 0
+        self.processed = 0
+    
+    def start(self):
+        """Start the worker pool (no-op if already running)."""
+        with self._lock:
+            if self._running.is_set():
+                return
+            self._running.set()
+            self._workers = [
+                threading.Thread(target=self._run, name=f"mqtt-ingest-{i}", daemon=True)
+                for i in range(self.worker_count)
+            ]
+            for worker in self._workers:
+                worker.start()
+        logger.info(f"MQTT ingest pipeline started with {self.worker_count} workers")
+    
+    def stop(self, timeout: float = 10.0):
+        """Stop the workers once they have drained the queue."""
+        with self._lock:
+            if not self._running.is_set():
+                return
+            self._running.clear()
+            workers, self._workers = self._workers, []
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        logger.info(f"MQTT ingest pipeline stopped ({self.depth()} messages left queued)")
+    
+    def depth(self) -> int:
+        """Get the number of queued messages."""
+        return self._queue.qsize()
+    
+    def offer(self, topic: str, payload: bytes) -> bool:
+        """Enqueue a raw message from the network thread; returns False if it was dropped."""
+        message = InboundMessage(topic, payload, time.monotonic())
+        try:
+            if self.overflow_policy == OverflowPolicy.BLOCK:
+                self._queue.put(message, timeout=self.block_timeout_s)
+            else:
+                self._queue.put_nowait(message)
+        except queue.Full:
+            if self.overflow_policy != OverflowPolicy.DROP_OLDEST or not self._evict_oldest_and_put(message):
+                self._record_drop("queue_full")
+                return False
+        
+        with self._stats_lock:
+            self.accepted += 1
+        metrics_service.update_mqtt_ingest_queue_depth(self._queue.qsize())
+        return True
+    
+    def _evict_oldest_and_put(self, message: InboundMessage) -> bool:
+        """Make room by dropping the oldest queued message."""
+        try:
+            self._queue.get_nowait()
+            self._record_drop("evicted")
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+    
+    def _record_drop(self, reason: str):
+        with self._stats_lock:
+            self.dropped += 1
+        metrics_service.record_mqtt_ingest_dropped(reason)
+    
+    def _next_batch(self) -> List[InboundMessage]:
+        """Collect up to ``batch_size`` messages, waiting at most ``batch_wait_s`` after the first."""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def decode(self, batch: List[InboundMessage]) -> List[DecodedMessage]:
+        """Parse JSON payloads, dropping messages that are not JSON objects."""
+        decoded = []
+        for message in batch:
+            try:
+                data = json.loads(message.payload)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                data = None
+            if not isinstance(data, dict):
+                logger.error(f"Failed to parse JSON payload from topic {message.topic}")
+                self._record_drop("invalid_payload")
+                continue
+            decoded.append(DecodedMessage(message.topic, data, message.received_at))
+        return decoded
+    
+    def _run(self):
+        """Worker loop: runs until stopped and the queue is empty."""
+        while self._running.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            
+            metrics_service.update_mqtt_ingest_queue_depth(self._queue.qsize())
+            metrics_service.record_mqtt_ingest_batch(len(batch), time.monotonic() - batch[0].received_at)
+            decoded = self.decode(batch)
+            if decoded:
+                try:
+                    self.dispatch(decoded)
+                except Exception as e:
+                    logger.error(f"MQTT ingest dispatch failed for {len(decoded)} messages: {e}")
+            with self._stats_lock:
+                self.processed += len(batch)
+
+
+def store_telemetry_batch(messages: List[DecodedMessage]):
+    """Batch handler writing ``devices/<device_id>/telemetry`` messages to the telemetry store.
+    
+    Messages either carry a full reading (``{"data_type", "payload", ...}``)
+    or are flat, in which case everything except the reading fields is the
+    payload. The device ID comes from the topic; the data type defaults to
+    ``sensor``. Each batch is written with one multi-row INSERT.
+    """
+    from app.services.database import db_service
+    from app.services.telemetry_service import TelemetryService
+    
+    readings = []
+    for message in messages:
+        data = message.data
+        reading = dict(data) if "payload" in data else {
+            **{field: data[field] for field in _READING_FIELDS if field in data},
+            "payload": {key: value for key, value in data.items() if key not in _READING_FIELDS}
+        }
+        levels = message.topic.split("/")
+        if len(levels) >= 3 and levels[0] == "devices":
+            reading["device_id"] = levels[1]
+        reading.setdefault("data_type", DataType.SENSOR.value)
+        readings.append(reading)
+    
+    db = db_service.get_session()
+    try:
+        result = TelemetryService(db).create_telemetry_batch(readings)
+        if result.failed:
+            logger.warning(f"MQTT telemetry batch rejected {result.failed} of {result.total} readings")
+    finally:
+        db_service.close_session(db)
+
+
+def create_ingest_pipeline(dispatch: Callable[[List[DecodedMessage]], None]) -> MQTTIngestPipeline:
+    """Build a pipeline from the ``mqtt_ingest_*`` settings."""
+    return MQTTIngestPipeline(
+        dispatch,
+        queue_size=settings.mqtt_ingest_queue_size,
+        worker_count=settings.mqtt_ingest_workers,
+        batch_size=settings.mqtt_ingest_batch_size,
+        batch_wait_ms=settings.mqtt_ingest_batch_wait_ms,
+        overflow_policy=settings.mqtt_ingest_overflow_policy,
+        block_timeout_s=settings.mqtt_ingest_block_timeout_s
+    )
@@ -3,10 +3,12 @@ import paho.mqtt.client as mqtt
 import json
 import logging
 import threading
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List
 from datetime import datetime
 
 from app.config import settings
+from app.services.mqtt_ingest import DecodedMessage, create_ingest_pipeline
+from app.services.mqtt_topics import TopicTrie, validate_topic_filter
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +20,10 @@ class MQTTService:
         self.client = None
         self.connected = False
         self.subscriptions = {}
-        self.message_handlers = {}
+        self.message_handlers = {}  # topic filter -> handler
+        self.batch_handlers = set()  # topic filters whose handler takes a list of DecodedMessage
+        self.topic_trie = TopicTrie(max_cache_size=settings.mqtt_topic_cache_size)
+        self.ingest = create_ingest_pipeline(self._dispatch)
         self._setup_client()
     
     def _setup_client(self):
@@ -46,6 +51,7 @@ class MQTTService:
         """Connect to MQTT broker."""
         try:
             if not self.connected:
+                self.ingest.start()
                 self.client.connect(settings.mqtt_broker, settings.mqtt_port, 60)
                 self.client.loop_start()
                 
@@ -76,6 +82,8 @@ class MQTTService:
                 self.client.disconnect()
                 self.connected = False
                 logger.info("Disconnected from MQTT broker")
+            # Let workers finish what was already received
+            self.ingest.stop()
         except Exception as e:
             logger.error(f"Failed to disconnect from MQTT broker: {e}")
     
@@ -101,34 +109,56 @@ class MQTTService:
             logger.info("MQTT disconnected")
     
     def _on_message(self, client, userdata, msg):
-        """MQTT message callback."""
-        try:
-            topic = msg.topic
-            payload = msg.payload.decode('utf-8')
-            
-            logger.debug(f"Received MQTT message on topic {topic}: {payload}")
-            
-            # Call registered handler for this topic
-            if topic in self.message_handlers:
+        """MQTT message callback.
+        
+        Runs on paho's network thread, so it only hands the raw message to
+        the ingest pipeline; decoding and handlers run on its workers.
+        """
+        self.ingest.offer(msg.topic, msg.payload)
+    
+    def _dispatch(self, messages: List[DecodedMessage]):
+        """Call the handlers of every filter matching each message (ingest worker thread)."""
+        batches: Dict[Callable, List[DecodedMessage]] = {}
+        for message in messages:
+            # A batch handler behind several matching filters takes the message once
+            batched = set()
+            for topic_filter in self.topic_trie.match(message.topic):
+                handler = self.message_handlers.get(topic_filter)
+                if handler is None:
+                    continue
+                if topic_filter in self.batch_handlers:
+                    # Compared by equality, as each lookup of a bound method is a new object
+                    if handler not in batched:
+                        batched.add(handler)
+                        batches.setdefault(handler, []).append(message)
+                    continue
                 try:
-                    data = json.loads(payload)
-                    self.message_handlers[topic](topic, data)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse JSON payload from topic {topic}")
+                    handler(message.topic, message.data)
                 except Exception as e:
-                    logger.error(f"Error in message handler for topic {topic}: {e}")
-            
-        except Exception as e:
-            logger.error(f"Error processing MQTT message: {e}")
+                    logger.error(f"Error in message handler for topic {message.topic}: {e}")
+        
+        for handler, batch in batches.items():
+            try:
+                handler(batch)
+            except Exception as e:
+                logger.error(f"Error in batch message handler for {len(batch)} messages: {e}")
     
     def _on_log(self, client, userdata, level, buf):
         """MQTT log callback."""
         if settings.debug:
             logger.debug(f"MQTT: {buf}")
     
-    def subscribe(self, topic: str, handler: Callable[[str, Dict[str, Any]], None]):
-        """Subscribe to MQTT topic with message handler."""
+    def subscribe(self, topic: str, handler: Callable, batch: bool = False):
+        """Subscribe to MQTT topic with message handler.
+        
+        ``topic`` may use ``+`` and ``#`` wildcards, so one subscription such
+        as ``devices/+/telemetry`` serves every device. Handlers are called
+        as ``handler(topic, data)``, or with ``batch`` as ``handler(messages)``
+        with every matching ``DecodedMessage`` in an ingest batch (e.g.
+        ``mqtt_ingest.store_telemetry_batch``).
+        """
         try:
+            validate_topic_filter(topic)
             if not self.connected:
                 logger.error("Cannot subscribe: MQTT client not connected")
                 return False
@@ -137,7 +167,7 @@ class MQTTService:
             result = self.client.subscribe(topic)
             if result[0] == mqtt.MQTT_ERR_SUCCESS:
                 self.subscriptions[topic] = True
-                self.message_handlers[topic] = handler
+                self.add_handler(topic, handler, batch)
                 logger.info(f"Subscribed to MQTT topic: {topic}")
                 return True
             else:
@@ -148,14 +178,28 @@ class MQTTService:
             logger.error(f"Failed to subscribe to topic {topic}: {e}")
             return False
     
+    def add_handler(self, topic_filter: str, handler: Callable, batch: bool = False):
+        """Route messages matching a topic filter to a handler, without subscribing at the broker."""
+        self.message_handlers[topic_filter] = handler
+        if batch:
+            self.batch_handlers.add(topic_filter)
+        else:
+            self.batch_handlers.discard(topic_filter)
+        self.topic_trie.add(topic_filter)
+    
+    def remove_handler(self, topic_filter: str):
+        """Stop routing messages for a topic filter."""
+        self.message_handlers.pop(topic_filter, None)
+        self.batch_handlers.discard(topic_filter)
+        self.topic_trie.remove(topic_filter)
+    
     def unsubscribe(self, topic: str):
         """Unsubscribe from MQTT topic."""
         try:
             if topic in self.subscriptions:
                 self.client.unsubscribe(topic)
                 del self.subscriptions[topic]
-                if topic in self.message_handlers:
-                    del self.message_handlers[topic]
+                self.remove_handler(topic)
                 logger.info(f"Unsubscribed from MQTT topic: {topic}")
                 return True
             return False
@@ -0,0 +1,138 @@
+"""MQTT topic filter matching with ``+``/``#`` wildcards."""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SINGLE_LEVEL = "+"
+MULTI_LEVEL = "#"
+
+
+def validate_topic_filter(topic_filter: str):
+    """Raise ValueError unless ``topic_filter`` is a valid MQTT subscription filter."""
+    if not topic_filter:
+        raise ValueError("Topic filter must not be empty")
+    levels = topic_filter.split("/")
+    for position, level in enumerate(levels):
+        if MULTI_LEVEL in level and (level != MULTI_LEVEL or position != len(levels) - 1):
+            raise ValueError(f"'#' must be a whole last level in topic filter {topic_filter}")
+        if SINGLE_LEVEL in level and level != SINGLE_LEVEL:
+            raise ValueError(f"'+' must be a whole level in topic filter {topic_filter}")
+
+
+class _Node:
+    """One topic level; wildcard children are stored under ``+`` and ``#``."""
+    __slots__ = ("children", "topic_filter")
+    
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.topic_filter: Optional[str] = None  # set when a filter ends here
+
+
+class TopicTrie:
+    """Subscription filters indexed by level, with a per-topic match cache.
+    
+    ``match`` walks only the literal, ``+`` and ``#`` branches that can
+    apply to a topic, so its cost depends on topic depth rather than on the
+    number of filters. Results are kept in an LRU cache keyed by topic,
+    which is cleared whenever the filter set changes; steady-state
+    dispatch is a single dictionary lookup.
+    """
+    
+    def __init__(self, max_cache_size: int = 65536):
+        self._root = _Node()
+        self._count = 0
+        self._cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._max_cache_size = max_cache_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def add(self, topic_filter: str) -> bool:
+        """Add a filter; returns False if it was already present."""
+        validate_topic_filter(topic_filter)
+        with self._lock:
+            node = self._root
+            for level in topic_filter.split("/"):
+                node = node.children.setdefault(level, _Node())
+            if node.topic_filter is not None:
+                return False
+            node.topic_filter = topic_filter
+            self._count += 1
+            self._cache.clear()
+            return True
+    
+    def remove(self, topic_filter: str) -> bool:
+        """Remove a filter, pruning empty branches; returns False if it was not present."""
+        with self._lock:
+            path = [self._root]
+            for level in topic_filter.split("/"):
+                node = path[-1].children.get(level)
+                if node is None:
+                    return False
+                path.append(node)
+            if path[-1].topic_filter is None:
+                return False
+            
+            path[-1].topic_filter = None
+            levels = topic_filter.split("/")
+            for depth in range(len(levels), 0, -1):
+                node = path[depth]
+                if node.children or node.topic_filter is not None:
+                    break
+                del path[depth - 1].children[levels[depth - 1]]
+            self._count -= 1
+            self._cache.clear()
+            return True
+    
+    def match(self, topic: str) -> Tuple[str, ...]:
+        """Get the filters matching a published topic name."""
+        with self._lock:
+            matched = self._cache.get(topic)
+            if matched is not None:
+                self.hits += 1
+                self._cache.move_to_end(topic)
+                return matched
+            
+            self.misses += 1
+            matched = tuple(self._walk(topic.split("/")))
+            self._cache[topic] = matched
+            if len(self._cache) > self._max_cache_size:
+                self._cache.popitem(last=False)
+            return matched
+    
+    def _walk(self, levels: List[str]) -> List[str]:
+        matched = []
+        # Wildcards never match topics starting with "$" at the first level (MQTT 4.7.2)
+        system_topic = levels[0].startswith("$")
+        frontier = [self._root]
+        for depth, level in enumerate(levels):
+            next_frontier = []
+            for node in frontier:
+                if not (depth == 0 and system_topic):
+                    multi = node.children.get(MULTI_LEVEL)
+                    if multi is not None and multi.topic_filter is not None:
+                        matched.append(multi.topic_filter)
+                    single = node.children.get(SINGLE_LEVEL)
+                    if single is not None:
+                        next_frontier.append(single)
+                child = node.children.get(level)
+                if child is not None:
+                    next_frontier.append(child)
+            if not next_frontier:
+                return matched
+            frontier = next_frontier
+        
+        for node in frontier:
+            if node.topic_filter is not None:
+                matched.append(node.topic_filter)
+            # "a/#" also matches "a" itself
+            multi = node.children.get(MULTI_LEVEL)
+            if multi is not None and multi.topic_filter is not None:
+                matched.append(multi.topic_filter)
+        return matched
@@ -3,13 +3,13 @@ import time
 import logging
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
-import statistics
 
 from app.config import settings
 from app.services.metrics_service import metrics_service
+from app.services.streaming_metrics import MetricRingBuffer, QuantileSketch
 
 logger = logging.getLogger(__name__)
 
@@ -38,10 +38,13 @@ class NFRMetric:
 class NFRComplianceService:
     """Service for monitoring and validating NFR compliance."""
     
-    def __init__(self):
-        self.metrics_history = {}
+    def __init__(self, history_size: int = 1000):
+        self.history_size = history_size
+        self.metrics_history: Dict[str, Dict[str, MetricRingBuffer]] = {}
         self.alerts = []
         self.compliance_status = {}
+        # Raw request latencies (ms) since the last NFR-01 evaluation
+        self.latency_sketch = QuantileSketch()
         self._initialize_nfr_targets()
     
     def _initialize_nfr_targets(self):
@@ -49,9 +52,9 @@ class NFRComplianceService:
         self.nfr_targets = {
             "NFR-01": {  # Performance
                 "metrics": {
-                    "p95_latency_ms": {"target": 100, "warning": 80, "critical": 120},
+                    "p95_latency_ms": {"target": 100, "warning": 110, "critical": 120},
                     "throughput_rps": {"target": 100, "warning": 80, "critical": 50},
-                    "cold_start_ms": {"target": 200, "warning": 150, "critical": 300}
+                    "cold_start_ms": {"target": 200, "warning": 250, "critical": 300}
                 }
             },
             "NFR-02": {  # Scalability
@@ -122,23 +125,15 @@ class NFRComplianceService:
     def record_metric(self, nfr_id: str, metric_name: str, value: float, unit: str = ""):
         """Record a metric value for NFR compliance monitoring."""
         try:
-            timestamp = datetime.utcnow()
+            epoch = time.time()
+            timestamp = datetime.utcfromtimestamp(epoch)
             
-            # Store metric in history
-            if nfr_id not in self.metrics_history:
-                self.metrics_history[nfr_id] = {}
-            if metric_name not in self.metrics_history[nfr_id]:
-                self.metrics_history[nfr_id][metric_name] = []
-            
-            self.metrics_history[nfr_id][metric_name].append({
-                "value": value,
-                "timestamp": timestamp,
-                "unit": unit
-            })
-            
-            # Keep only last 1000 records per metric
-            if len(self.metrics_history[nfr_id][metric_name]) > 1000:
-                self.metrics_history[nfr_id][metric_name] = self.metrics_history[nfr_id][metric_name][-1000:]
+            # Store metric in its ring buffer (oldest samples are overwritten)
+            nfr_history = self.metrics_history.setdefault(nfr_id, {})
+            history = nfr_history.get(metric_name)
+            if history is None:
+                history = nfr_history[metric_name] = MetricRingBuffer(self.history_size, unit)
+            history.append(value, epoch)
             
             # Evaluate compliance
             self._evaluate_compliance(nfr_id, metric_name, value, timestamp)
@@ -162,13 +157,18 @@ class NFRComplianceService:
             warning_threshold = targets["warning"]
             critical_threshold = targets["critical"]
             
+            # Lower is better when the critical threshold lies above the target
+            # (latency, error rates, cost); higher is better otherwise (uptime,
+            # coverage). The warning threshold lies between target and critical.
+            direction = 1 if critical_threshold > target_value else -1
+            
             # Determine status based on thresholds
-            if value <= critical_threshold:
+            if direction * value <= direction * target_value:
+                status = NFRStatus.COMPLIANT
+            elif direction * value > direction * critical_threshold:
                 status = NFRStatus.CRITICAL
-            elif value <= warning_threshold:
+            elif direction * value <= direction * warning_threshold:
                 status = NFRStatus.WARNING
-            elif value <= target_value:
-                status = NFRStatus.COMPLIANT
             else:
                 status = NFRStatus.VIOLATION
             
@@ -210,17 +210,11 @@ class NFRComplianceService:
                 return "stable"
             
             # Get last 10 values
-            recent_values = [h["value"] for h in history[-10:]]
-            
-            if len(recent_values) < 2:
-                return "stable"
+            recent_values = history.last(10)
             
             # Calculate simple trend
-            first_half = recent_values[:len(recent_values)//2]
-            second_half = recent_values[len(recent_values)//2:]
-            
-            first_avg = statistics.mean(first_half)
-            second_avg = statistics.mean(second_half)
+            first_avg = float(recent_values[:len(recent_values)//2].mean())
+            second_avg = float(recent_values[len(recent_values)//2:].mean())
             
             change_percent = (second_avg - first_avg) / first_avg if first_avg != 0 else 0
             
@@ -364,25 +358,50 @@ class NFRComplianceService:
             if nfr_id not in self.metrics_history or metric_name not in self.metrics_history[nfr_id]:
                 return []
             
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
             history = self.metrics_history[nfr_id][metric_name]
+            timestamps, values = history.since(time.time() - hours * 3600)
             
-            filtered_history = [
+            # Ring buffer order is already chronological
+            return [
                 {
-                    "value": h["value"],
-                    "timestamp": h["timestamp"].isoformat(),
-                    "unit": h["unit"]
+                    "value": float(value),
+                    "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+                    "unit": history.unit
                 }
-                for h in history
-                if h["timestamp"] >= cutoff_time
+                for timestamp, value in zip(timestamps.tolist(), values.tolist())
             ]
             
-            return sorted(filtered_history, key=lambda x: x["timestamp"])
-            
         except Exception as e:
             logger.error(f"Failed to get metric history for {nfr_id}.{metric_name}: {e}")
             return []
     
+    def record_latency_sample(self, latency_ms: float):
+        """Record one raw request latency for NFR-01 percentile estimation."""
+        self.latency_sketch.add(latency_ms)
+    
+    def get_latency_percentiles(self) -> Dict[str, Any]:
+        """Get streaming p50/p95/p99 latency (ms) over samples since the last evaluation."""
+        percentiles = self.latency_sketch.percentiles()
+        percentiles["samples"] = self.latency_sketch.count
+        return percentiles
+    
+    def evaluate_latency_percentiles(self) -> Dict[str, Any]:
+        """Record the current latency percentiles against NFR-01 and start a new window."""
+        try:
+            percentiles = self.get_latency_percentiles()
+            if not percentiles["samples"]:
+                return percentiles
+            
+            self.record_metric("NFR-01", "p50_latency_ms", percentiles["p50"], "ms")
+            self.record_metric("NFR-01", "p95_latency_ms", percentiles["p95"], "ms")
+            self.record_metric("NFR-01", "p99_latency_ms", percentiles["p99"], "ms")
+            self.latency_sketch.reset()
+            return percentiles
+            
+        except Exception as e:
+            logger.error(f"Failed to evaluate latency percentiles: {e}")
+            return {}
+    
     def validate_nfr_compliance(self) -> Dict[str, Any]:
         """Validate overall NFR compliance."""
         try:
@@ -0,0 +1,106 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import desc, func, tuple_
+from sqlalchemy.orm import Query
+
+from app.schemas.pagination import TotalMode
+
+logger = logging.getLogger(__name__)
+
+# Sort value used for rows whose sort column is NULL, so they page last
+NULL_SORT_VALUE = datetime.min
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Build an opaque continuation token from the last row's sort key."""
+    payload = json.dumps({"t": sort_value.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Parse a continuation token; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), str(payload["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def count_rows(query: Query, total_mode: TotalMode) -> Optional[int]:
+    """Count the rows matching a query according to ``total_mode``."""
+    if total_mode == TotalMode.NONE:
+        return None
+    if total_mode == TotalMode.ESTIMATED:
+        estimate = estimate_rows(query)
+        if estimate is not None:
+            return estimate
+    return query.order_by(None).count()
+
+
+def estimate_rows(query: Query) -> Optional[int]:
+    """Get the planner's row estimate for a query (PostgreSQL only)."""
+    session = query.session
+    dialect = session.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    try:
+        compiled = query.order_by(None).statement.compile(dialect=dialect)
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        result = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        plan = json.loads(result) if isinstance(result, str) else result
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Failed to estimate row count: {e}")
+        return None
+
+
+def paginate(
+    query: Query,
+    sort_column: Any,
+    id_column: Any,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    total_mode: TotalMode = TotalMode.EXACT
+) -> Tuple[List[Any], Optional[int], Optional[str]]:
+    """Get one page of a query ordered by ``(sort_column, id_column)`` descending.
+    
+    With a cursor, the page starts after the cursor's row using a row-value
+    comparison that an index on the same columns can seek to, so deep pages
+    cost the same as the first. Without one, ``page`` falls back to OFFSET.
+    Returns the rows, the total (per ``total_mode``) and the next cursor,
+    which is None on the last page. Rows with a NULL sort value come last,
+    ordered as if they held ``NULL_SORT_VALUE``.
+    """
+    total = count_rows(query, total_mode)
+    
+    # The same expression in ORDER BY and the cursor predicate, so NULL rows
+    # neither break the cursor nor drop out of the row-value comparison
+    sort_key = func.coalesce(sort_column, NULL_SORT_VALUE)
+    ordered = query.order_by(desc(sort_key), desc(id_column))
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        ordered = ordered.filter(tuple_(sort_key, id_column) < tuple_(sort_value, row_id))
+    elif page > 1:
+        ordered = ordered.offset((page - 1) * page_size)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = ordered.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        sort_value = getattr(last, sort_column.key)
+        next_cursor = encode_cursor(
+            NULL_SORT_VALUE if sort_value is None else sort_value, getattr(last, id_column.key)
+        )
+    
+    return rows, total, next_cursor
@@ -0,0 +1,224 @@
+"""Incremental minute/hour rollups backing the dashboards."""
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Columns of a rollup bucket
+COUNT, TOTAL, MAX, MIN, CONFIDENCE_SUM, CONFIDENCE_COUNT, FLAGGED, ERRORS = range(8)
+FIELD_COUNT = 8
+
+MINUTE = 60
+HOUR = 3600
+
+# Streams folded by the engine
+REQUESTS = "requests"  # value = latency ms, flagged = 4xx, errors = 5xx
+ANALYSIS = "analysis"  # value = processing ms, flagged = detection, errors = failed analysis
+ALERTS = "alerts"      # flagged = high/critical severity
+
+# Key used for fleet-wide totals
+ALL = "all"
+
+
+class RollupRing:
+    """Fixed number of time buckets of one width, reused round-robin."""
+    
+    def __init__(self, width: int, slots: int):
+        self.width = width
+        self.slots = slots
+        self.stamps = np.full(slots, -1, dtype=np.int64)
+        self.values = np.zeros((slots, FIELD_COUNT), dtype=np.float64)
+    
+    def add(self, epoch: float, value: float, confidence: Optional[float], flagged: bool, error: bool):
+        """Fold one event into its bucket, recycling the slot if it holds an older bucket."""
+        index = int(epoch // self.width)
+        slot = index % self.slots
+        row = self.values[slot]
+        if self.stamps[slot] != index:
+            self.stamps[slot] = index
+            row[:] = 0
+            row[MIN] = math.inf
+        row[COUNT] += 1
+        row[TOTAL] += value
+        row[MAX] = max(row[MAX], value)
+        row[MIN] = min(row[MIN], value)
+        if confidence is not None:
+            row[CONFIDENCE_SUM] += confidence
+            row[CONFIDENCE_COUNT] += 1
+        row[FLAGGED] += flagged
+        row[ERRORS] += error
+    
+    def mask(self, start: float, end: float) -> np.ndarray:
+        """Get the slots whose buckets fall in ``[start, end)``."""
+        first = int(start // self.width)
+        last = int(math.ceil(end / self.width)) - 1
+        return (self.stamps >= first) & (self.stamps <= last)
+    
+    def covers(self, seconds: float) -> bool:
+        return seconds <= self.width * self.slots
+
+
+class RollupSeries:
+    """Minute and hour buckets for one stream and key."""
+    
+    def __init__(self, minute_slots: int, hour_slots: int):
+        self.minutes = RollupRing(MINUTE, minute_slots)
+        self.hours = RollupRing(HOUR, hour_slots)
+    
+    def add(self, epoch: float, value: float, confidence: Optional[float], flagged: bool, error: bool):
+        self.minutes.add(epoch, value, confidence, flagged, error)
+        self.hours.add(epoch, value, confidence, flagged, error)
+    
+    def ring_for(self, seconds: float) -> RollupRing:
+        """Use minute buckets while they cover the window, hour buckets beyond."""
+        return self.minutes if self.minutes.covers(seconds) else self.hours
+
+
+class RollupEngine:
+    """Folds events into per-stream, per-key minute/hour buckets as they happen.
+    
+    Keys are use cases and device groups (see ``DeviceMetricsTable.group_of``)
+    plus the fleet-wide ``all`` key, so the number of series is bounded.
+    Each series is a fixed set of buckets, so recording is O(1) and a window
+    query reads at most the configured number of buckets, independent of how
+    many events were recorded.
+    """
+    
+    def __init__(self, minute_slots: int = 180, hour_slots: int = 168):
+        self.minute_slots = minute_slots
+        self.hour_slots = hour_slots
+        self._series: Dict[Tuple[str, str], RollupSeries] = {}
+        self._lock = threading.Lock()
+    
+    def record(
+        self,
+        stream: str,
+        keys: Tuple[str, ...],
+        value: float = 0.0,
+        confidence: Optional[float] = None,
+        flagged: bool = False,
+        error: bool = False,
+        timestamp: Optional[float] = None
+    ):
+        """Fold one event into the buckets of each key."""
+        epoch = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for key in keys:
+                series = self._series.get((stream, key))
+                if series is None:
+                    series = self._series[(stream, key)] = RollupSeries(self.minute_slots, self.hour_slots)
+                series.add(epoch, value, confidence, flagged, error)
+    
+    def record_request(self, latency_ms: float, status_code: int, timestamp: Optional[float] = None):
+        """Record an HTTP request."""
+        self.record(
+            REQUESTS, (ALL,), latency_ms,
+            flagged=400 <= status_code < 500, error=status_code >= 500, timestamp=timestamp
+        )
+    
+    def record_analysis(
+        self,
+        use_case: str,
+        device_id: str,
+        processing_time_ms: float,
+        confidence: Optional[float] = None,
+        detected: bool = False,
+        error: bool = False,
+        timestamp: Optional[float] = None
+    ):
+        """Record an ML analysis result for its use case and device group."""
+        self.record(
+            ANALYSIS, (ALL, f"use_case:{use_case}", f"group:{metrics_service.device_table.group_of(device_id)}"),
+            processing_time_ms, confidence=confidence, flagged=detected, error=error, timestamp=timestamp
+        )
+    
+    def record_alert(self, device_id: str, severity: Optional[str] = None, timestamp: Optional[float] = None):
+        """Record a generated alert."""
+        self.record(
+            ALERTS, (ALL, f"group:{metrics_service.device_table.group_of(device_id)}"),
+            flagged=severity in ("high", "critical"), timestamp=timestamp
+        )
+    
+    def window(self, stream: str, key: str = ALL, seconds: float = HOUR, end: Optional[float] = None) -> Dict[str, Any]:
+        """Summarise the buckets of a series over the ``seconds`` before ``end``."""
+        end = time.time() if end is None else end
+        with self._lock:
+            series = self._series.get((stream, key))
+            if series is None:
+                values = np.zeros((0, FIELD_COUNT))
+            else:
+                ring = series.ring_for(seconds)
+                values = ring.values[ring.mask(end - seconds, end)]
+        
+        count = int(values[:, COUNT].sum())
+        confidence_count = values[:, CONFIDENCE_COUNT].sum()
+        return {
+            "count": count,
+            "avg": float(values[:, TOTAL].sum() / count) if count else 0.0,
+            "max": float(values[:, MAX].max()) if count else 0.0,
+            "min": float(values[:, MIN].min()) if count else 0.0,
+            "avg_confidence": float(values[:, CONFIDENCE_SUM].sum() / confidence_count) if confidence_count else 0.0,
+            "flagged": int(values[:, FLAGGED].sum()),
+            "errors": int(values[:, ERRORS].sum()),
+            "rate_per_s": count / seconds if seconds else 0.0
+        }
+    
+    def peak_rate(self, stream: str, key: str = ALL, seconds: float = HOUR, end: Optional[float] = None) -> float:
+        """Get the busiest minute's event rate (per second) within the window."""
+        end = time.time() if end is None else end
+        with self._lock:
+            series = self._series.get((stream, key))
+            if series is None:
+                return 0.0
+            ring = series.minutes
+            counts = ring.values[ring.mask(end - min(seconds, MINUTE * ring.slots), end), COUNT]
+        return float(counts.max()) / MINUTE if counts.size else 0.0
+    
+    def use_case_summary(self, seconds: float = 86400, end: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Summarise analysis results per use case over a window."""
+        prefix = "use_case:"
+        return {
+            key[len(prefix):]: self.window(ANALYSIS, key, seconds, end)
+            for key in self.keys(ANALYSIS, prefix)
+        }
+    
+    def keys(self, stream: str, prefix: str = "") -> List[str]:
+        """Get the keys recorded for a stream."""
+        with self._lock:
+            return sorted(key for series_stream, key in self._series if series_stream == stream and key.startswith(prefix))
+    
+    def clear(self):
+        """Drop all series."""
+        with self._lock:
+            self._series.clear()
+
+
+def seconds_since_midnight(now: Optional[float] = None) -> float:
+    """Get the seconds elapsed in the current UTC day."""
+    now = time.time() if now is None else now
+    return now % 86400 or 1.0
+
+
+def trend(current: float, previous: float, higher_is_worse: bool = True) -> str:
+    """Compare two windows the way NFR trends are reported."""
+    if previous == 0:
+        return "stable"
+    change = (current - previous) / previous
+    if abs(change) <= 0.05:
+        return "stable"
+    return "degrading" if (change > 0) == higher_is_worse else "improving"
+
+
+# Global rollup engine instance
+rollup_engine = RollupEngine(
+    minute_slots=settings.rollup_minute_buckets,
+    hour_slots=settings.rollup_hour_buckets
+)
@@ -0,0 +1,180 @@
+"""Managed composite and partial indexes matched to the hot query shapes."""
+import argparse
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Boolean, String, and_, column, inspect, text
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.sql.elements import ColumnElement
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec(NamedTuple):
+    """One managed index: ``columns`` are SQL fragments, e.g. ``"timestamp DESC"``."""
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    where: Optional[ColumnElement] = None  # partial index predicate
+    include: Tuple[str, ...] = ()  # covering columns, PostgreSQL only
+    query: str = ""  # the query shape the index serves
+
+
+MANAGED_INDEXES: Tuple[IndexSpec, ...] = (
+    IndexSpec(
+        "ix_telemetry_data_device_id_timestamp", "telemetry_data",
+        ("device_id", "timestamp DESC"),
+        query="device telemetry listing, newest first"
+    ),
+    IndexSpec(
+        "ix_telemetry_data_unprocessed_audio", "telemetry_data",
+        ("timestamp",),
+        # Rendered per dialect so it matches the ORM's own rendering of
+        # ``processed == False``, which planners require for partial indexes
+        where=and_(column("processed", Boolean) == False, column("data_type", String) == "audio"),
+        include=("claimed_until",),
+        query="audio worker claim scan, oldest first"
+    ),
+    IndexSpec(
+        "ix_alerts_status_severity_created_at", "alerts",
+        ("status", "severity", "created_at"),
+        query="active/critical alert listings"
+    ),
+    IndexSpec(
+        "ix_alerts_device_id_created_at", "alerts",
+        ("device_id", "created_at"),
+        query="per-device alert listing and summaries"
+    ),
+    IndexSpec(
+        "ix_devices_last_seen_status", "devices",
+        ("last_seen", "status"),
+        query="offline device checks"
+    ),
+    IndexSpec(
+        "ix_devices_swarm_type_status", "devices",
+        ("swarm_type", "status"),
+        query="swarm status counts and agent listings by status"
+    ),
+    IndexSpec(
+        "ix_devices_swarm_type_location", "devices",
+        ("swarm_type", "location"),
+        query="swarm agent listings by location"
+    ),
+)
+
+# Columns added to existing tables after their first release: (table, column, type)
+ADDED_COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ("telemetry_data", "claimed_by", "VARCHAR"),
+    ("telemetry_data", "claimed_until", "TIMESTAMP"),
+    ("devices", "swarm_type", "VARCHAR"),
+    ("devices", "tags", "JSON"),
+)
+
+
+def index_ddl(spec: IndexSpec, dialect: Dialect, concurrently: bool = False) -> str:
+    """Build the ``CREATE INDEX`` statement for a spec on a dialect."""
+    postgresql = dialect.name == "postgresql"
+    concurrent = " CONCURRENTLY" if concurrently and postgresql else ""
+    ddl = f"CREATE INDEX{concurrent} IF NOT EXISTS {spec.name} ON {spec.table} ({', '.join(spec.columns)})"
+    if spec.include and postgresql:
+        ddl += f" INCLUDE ({', '.join(spec.include)})"
+    if spec.where is not None:
+        ddl += f" WHERE {spec.where.compile(dialect=dialect, compile_kwargs={'literal_binds': True})}"
+    return ddl
+
+
+class SchemaIndexManager:
+    """Brings an existing database up to the managed column and index set.
+    
+    ``create_all`` only creates missing tables, so columns and indexes
+    introduced later are applied here. Every step is idempotent and safe to
+    run at each startup.
+    """
+    
+    def __init__(self, engine: Engine):
+        self.engine = engine
+    
+    def add_missing_columns(self) -> List[str]:
+        """Add columns the models define but older tables lack."""
+        inspector = inspect(self.engine)
+        tables = set(inspector.get_table_names())
+        added = []
+        for table, column_name, column_type in ADDED_COLUMNS:
+            if table not in tables:
+                continue
+            if column_name in {c["name"] for c in inspector.get_columns(table)}:
+                continue
+            with self.engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}"))
+            added.append(f"{table}.{column_name}")
+            logger.info(f"Added column {table}.{column_name}")
+        return added
+    
+    def missing_indexes(self) -> List[IndexSpec]:
+        """Get managed indexes that do not exist yet."""
+        inspector = inspect(self.engine)
+        tables = set(inspector.get_table_names())
+        missing = []
+        for spec in MANAGED_INDEXES:
+            if spec.table not in tables:
+                continue
+            if spec.name not in {index["name"] for index in inspector.get_indexes(spec.table)}:
+                missing.append(spec)
+        return missing
+    
+    def _is_partitioned(self, table: str) -> bool:
+        from app.services.telemetry_partitions import PARENT_TABLE, TelemetryPartitionManager
+        return table == PARENT_TABLE and TelemetryPartitionManager(self.engine).is_partitioned()
+    
+    def ensure_indexes(self, concurrently: bool = False) -> List[str]:
+        """Create missing managed indexes and return their names.
+        
+        With ``concurrently`` on PostgreSQL, indexes are built without
+        blocking writes (outside a transaction). Partitioned tables cannot be
+        indexed concurrently; their index is created on the parent and
+        cascades to every partition.
+        """
+        created = []
+        for spec in self.missing_indexes():
+            use_concurrently = concurrently and self.engine.dialect.name == "postgresql" and not self._is_partitioned(spec.table)
+            try:
+                if use_concurrently:
+                    with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                        connection.execute(text(index_ddl(spec, self.engine.dialect, concurrently=True)))
+                else:
+                    with self.engine.begin() as connection:
+                        connection.execute(text(index_ddl(spec, self.engine.dialect)))
+                created.append(spec.name)
+                logger.info(f"Created index {spec.name} ({spec.query})")
+            except Exception as e:
+                logger.error(f"Failed to create index {spec.name}: {e}")
+        return created
+    
+    def migrate(self, concurrently: bool = False) -> Dict[str, List[str]]:
+        """Add missing columns, then missing indexes."""
+        return {
+            "columns": self.add_missing_columns(),
+            "indexes": self.ensure_indexes(concurrently=concurrently)
+        }
+
+
+def main():
+    """Command line entry point: ``python -m app.services.schema_indexes <command>``."""
+    from app.services.database import db_service
+    
+    parser = argparse.ArgumentParser(description="Manage composite and partial indexes")
+    parser.add_argument("command", choices=["migrate", "list"])
+    parser.add_argument("--concurrently", action="store_true", help="build indexes without blocking writes (PostgreSQL)")
+    args = parser.parse_args()
+    
+    manager = SchemaIndexManager(db_service.engine)
+    if args.command == "migrate":
+        print(manager.migrate(concurrently=args.concurrently))
+    else:
+        missing = {spec.name for spec in manager.missing_indexes()}
+        for spec in MANAGED_INDEXES:
+            print(f"{spec.name}\t{'missing' if spec.name in missing else 'present'}\t{spec.query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Fixed-memory metric storage: ring buffers and streaming quantile sketches."""
+import math
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+class MetricRingBuffer:
+    """Fixed-size ring buffer of metric values and their epoch timestamps.
+    
+    Appends overwrite the oldest sample once ``capacity`` is reached, so
+    recording never copies the history.
+    """
+    
+    def __init__(self, capacity: int = 1000, unit: str = ""):
+        self.capacity = capacity
+        self.unit = unit
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def append(self, value: float, timestamp: Optional[float] = None):
+        """Add a sample, overwriting the oldest one when full."""
+        with self._lock:
+            self._values[self._next] = value
+            self._timestamps[self._next] = time.time() if timestamp is None else timestamp
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+    
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        """Get samples oldest first. Call with the lock held."""
+        if self._count < self.capacity:
+            return array[:self._count].copy()
+        return np.concatenate((array[self._next:], array[:self._next]))
+    
+    def last(self, n: int) -> np.ndarray:
+        """Get the most recent ``n`` values, oldest first."""
+        with self._lock:
+            n = min(n, self._count)
+            indexes = (self._next - n + np.arange(n)) % self.capacity
+            return self._values[indexes]
+    
+    def since(self, cutoff: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get timestamps and values recorded at or after ``cutoff`` (epoch seconds), oldest first."""
+        with self._lock:
+            timestamps = self._ordered(self._timestamps)
+            values = self._ordered(self._values)
+        mask = timestamps >= cutoff
+        return timestamps[mask], values[mask]
+    
+    def __len__(self) -> int:
+        return self._count
+
+
+class QuantileSketch:
+    """HDR-style log-bucketed histogram for streaming quantiles.
+    
+    Positive values fall into buckets whose bounds grow geometrically, so
+    every quantile is returned with at most ``relative_accuracy`` relative
+    error. Memory is a fixed array of counts regardless of how many samples
+    are recorded; values outside ``[min_value, max_value]`` are clamped.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3, max_value: float = 1e7):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        size = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self._counts = np.zeros(size, dtype=np.int64)
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def _index(self, value: float) -> int:
+        value = min(value, self.max_value)
+        return math.ceil(math.log(value) / self._log_gamma) - self._offset
+    
+    def add(self, value: float):
+        """Record one sample."""
+        with self._lock:
+            if value < self.min_value:
+                self._zero_count += 1
+            else:
+                self._counts[self._index(value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+    
+    def add_many(self, values: Iterable[float]):
+        """Record many samples at once."""
+        samples = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=np.float64)
+        if samples.size == 0:
+            return
+        small = samples < self.min_value
+        clamped = np.minimum(samples[~small], self.max_value)
+        indexes = np.ceil(np.log(clamped) / self._log_gamma).astype(np.int64) - self._offset
+        with self._lock:
+            np.add.at(self._counts, indexes, 1)
+            self._zero_count += int(small.sum())
+            self.count += int(samples.size)
+            self.sum += float(samples.sum())
+            self.max = max(self.max, float(samples.max()))
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Get the estimated ``q`` quantile (0..1), or None if no samples."""
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q * (self.count - 1)
+            if rank < self._zero_count:
+                return 0.0
+            cumulative = np.cumsum(self._counts)
+            index = int(np.searchsorted(cumulative, rank - self._zero_count, side="right"))
+            # Midpoint of the bucket in relative terms
+            upper = self._gamma ** (index + self._offset)
+            return min(2 * upper / (self._gamma + 1), self.max)
+    
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """Get p50, p95 and p99."""
+        return {
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+    
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._counts[:] = 0
+            self._zero_count = 0
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
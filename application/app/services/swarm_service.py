@@ -7,21 +7,27 @@ import json
 import logging
 import subprocess
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc
 
+from ..config import settings
 from ..models.database import Device, TelemetryData, Alert
+from .device_cache import device_id_cache
 from ..schemas.swarm import (
     SwarmAgentCreate, SwarmAgentUpdate, SwarmAgentResponse,
     SwarmStatus, SwarmHealthMetrics, SwarmConfiguration,
     SwarmDeploymentRequest, SwarmDeploymentResponse,
-    SwarmAgentStatus, SwarmHealthStatus, SwarmDeploymentStatus
+    SwarmAgentStatus, SwarmAgentType, SwarmHealthStatus, SwarmDeploymentStatus
 )
 
 logger = logging.getLogger(__name__)
 
+# Devices with this swarm_type make up the swarm
+SWARM_AGENT_TYPE = SwarmAgentType.SOUND_AGENT.value
+
 class SwarmService:
     """Сервис управления роем IoT агентов"""
     
@@ -29,45 +35,34 @@ class SwarmService:
         self.swarm_id = "sound-analytics-swarm"
         self.agent_version = "2.0.0"
         self.deployment_timeout = 300  # 5 minutes
+        # device.id -> (raw configuration JSON, parsed configuration)
+        self._config_cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._config_cache_size = settings.max_concurrent_devices
+    
+    def _agents_query(self, db: Session):
+        """Query swarm agents through the indexed swarm_type column"""
+        return db.query(Device).filter(Device.swarm_type == SWARM_AGENT_TYPE)
     
     async def get_swarm_status(self, db: Session) -> SwarmStatus:
         """Получить статус роя агентов"""
         try:
-            # Подсчет агентов по статусам
-            total_agents = db.query(Device).filter(
-                Device.tags.contains({"swarmType": "sound-agent"})
-            ).count()
-            
-            active_agents = db.query(Device).filter(
-                and_(
-                    Device.tags.contains({"swarmType": "sound-agent"}),
-                    Device.status == "active"
-                )
-            ).count()
-            
-            inactive_agents = db.query(Device).filter(
-                and_(
-                    Device.tags.contains({"swarmType": "sound-agent"}),
-                    Device.status == "inactive"
-                )
-            ).count()
-            
-            error_agents = db.query(Device).filter(
-                and_(
-                    Device.tags.contains({"swarmType": "sound-agent"}),
-                    Device.status == "error"
-                )
-            ).count()
-            
-            offline_agents = db.query(Device).filter(
-                and_(
-                    Device.tags.contains({"swarmType": "sound-agent"}),
-                    or_(
-                        Device.last_seen < datetime.utcnow() - timedelta(minutes=5),
-                        Device.status == "offline"
-                    )
-                )
-            ).count()
+            # Подсчет агентов по статусам одним агрегирующим запросом
+            offline_cutoff = datetime.utcnow() - timedelta(minutes=5)
+            counts = db.query(
+                func.count().label("total"),
+                func.count().filter(Device.status == "active").label("active"),
+                func.count().filter(Device.status == "inactive").label("inactive"),
+                func.count().filter(Device.status == "error").label("error"),
+                func.count().filter(
+                    or_(Device.last_seen < offline_cutoff, Device.status == "offline")
+                ).label("offline")
+            ).filter(Device.swarm_type == SWARM_AGENT_TYPE).one()
+            
+            total_agents = counts.total
+            active_agents = counts.active
+            inactive_agents = counts.inactive
+            error_agents = counts.error
+            offline_agents = counts.offline
             
             # Расчет показателя здоровья
             health_score = self._calculate_health_score(active_agents, total_agents, error_agents)
@@ -96,17 +91,15 @@ class SwarmService:
     ) -> List[SwarmAgentResponse]:
         """Получить список агентов роя"""
         try:
-            query = db.query(Device).filter(
-                Device.tags.contains({"swarmType": "sound-agent"})
-            )
+            query = self._agents_query(db)
             
             if status:
                 query = query.filter(Device.status == status)
             
             if location:
-                query = query.filter(Device.tags.contains({"location": location}))
+                query = query.filter(Device.location == location)
             
-            devices = query.offset(offset).limit(limit).all()
+            devices = query.order_by(Device.created_at, Device.id).offset(offset).limit(limit).all()
             
             agents = []
             for device in devices:
@@ -127,6 +120,8 @@ class SwarmService:
                 name=f"Swarm Agent {agent_data.agent_id}",
                 device_type="sound-agent",
                 status="inactive",
+                swarm_type=agent_data.agent_type.value,
+                location=agent_data.location,
                 tags={
                     "swarmType": agent_data.agent_type.value,
                     "swarmId": agent_data.swarm_id,
@@ -178,12 +173,7 @@ class SwarmService:
     async def get_agent(self, db: Session, agent_id: str) -> Optional[SwarmAgentResponse]:
         """Получить информацию об агенте"""
         try:
-            device = db.query(Device).filter(
-                and_(
-                    Device.device_id == agent_id,
-                    Device.tags.contains({"swarmType": "sound-agent"})
-                )
-            ).first()
+            device = self._agents_query(db).filter(Device.device_id == agent_id).first()
             
             if not device:
                 return None
@@ -201,18 +191,14 @@ class SwarmService:
     ) -> Optional[SwarmAgentResponse]:
         """Обновить конфигурацию агента"""
         try:
-            device = db.query(Device).filter(
-                and_(
-                    Device.device_id == agent_id,
-                    Device.tags.contains({"swarmType": "sound-agent"})
-                )
-            ).first()
+            device = self._agents_query(db).filter(Device.device_id == agent_id).first()
             
             if not device:
                 return None
             
             # Обновить поля
             if agent_data.location:
+                device.location = agent_data.location
                 device.tags["location"] = agent_data.location
             
             if agent_data.description:
@@ -240,12 +226,7 @@ class SwarmService:
     async def delete_agent(self, db: Session, agent_id: str) -> bool:
         """Удалить агента из роя"""
         try:
-            device = db.query(Device).filter(
-                and_(
-                    Device.device_id == agent_id,
-                    Device.tags.contains({"swarmType": "sound-agent"})
-                )
-            ).first()
+            device = self._agents_query(db).filter(Device.device_id == agent_id).first()
             
             if not device:
                 return False
@@ -257,6 +238,8 @@ class SwarmService:
             # Удалить устройство
             db.delete(device)
             db.commit()
+            device_id_cache.invalidate(agent_id)
+            self._config_cache.pop(device.id, None)
             
             return True
         except Exception as e:
@@ -480,10 +463,7 @@ class SwarmService:
     async def _device_to_agent_response(self, device: Device) -> SwarmAgentResponse:
         """Преобразовать устройство в ответ агента"""
         try:
-            # Извлечь конфигурацию из тегов
-            configuration = {}
-            if "configuration" in device.tags:
-                configuration = json.loads(device.tags["configuration"])
+            configuration = self._agent_configuration(device)
             
             # Определить статус здоровья
             health_status = SwarmHealthStatus.UNKNOWN
@@ -516,6 +496,23 @@ class SwarmService:
             logger.error(f"Failed to convert device to agent response: {e}")
             raise
     
+    def _agent_configuration(self, device: Device) -> Dict[str, Any]:
+        """Получить разобранную конфигурацию агента, разбирая JSON только при его изменении"""
+        raw = (device.tags or {}).get("configuration")
+        if not raw:
+            return {}
+        
+        cached = self._config_cache.get(device.id)
+        if cached is not None and cached[0] == raw:
+            self._config_cache.move_to_end(device.id)
+            return cached[1]
+        
+        configuration = json.loads(raw)
+        self._config_cache[device.id] = (raw, configuration)
+        while len(self._config_cache) > self._config_cache_size:
+            self._config_cache.popitem(last=False)
+        return configuration
+    
     def _calculate_health_score(
         self, 
         active_agents: int, 
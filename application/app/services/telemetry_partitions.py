@@ -0,0 +1,309 @@
+"""Day partitioning and partition-based retention for telemetry data."""
+import argparse
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "telemetry_data"
+PARTITION_PREFIX = "telemetry_data_p"
+DEFAULT_PARTITION = "telemetry_data_default"
+
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+# Retention actions, in the order a partition goes through them
+MOVE_TO_WARM = "move_to_warm"
+DETACH = "detach"
+DROP = "drop"
+
+
+def partition_name(day: date) -> str:
+    """Get the partition table name for a day."""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """Get the day a partition covers from its name, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def legacy_index_name(index_name: str, legacy_name: str) -> str:
+    """Get the name an index keeps on the legacy table once the parent reuses its name."""
+    if PARENT_TABLE in index_name:
+        renamed = index_name.replace(PARENT_TABLE, legacy_name, 1)
+    else:
+        renamed = f"{legacy_name}_{index_name}"
+    # PostgreSQL identifiers are limited to 63 bytes
+    return renamed[:63]
+
+
+def plan_retention(
+    partitions: List[Tuple[str, bool, Optional[str]]],
+    today: date,
+    hot_days: int,
+    warm_days: int,
+    cold_days: int,
+    warm_tablespace: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """Decide what to do with each day partition.
+
+    ``partitions`` holds ``(name, attached, tablespace)``. A partition is
+    acted on once its whole day is older than a tier: past ``hot_days`` it
+    moves to ``warm_tablespace`` (when configured), past ``warm_days`` it is
+    detached from ``telemetry_data`` and kept as a standalone archive table,
+    and past ``cold_days`` it is dropped.
+    """
+    actions = []
+    for name, attached, tablespace in partitions:
+        day = partition_day(name)
+        if day is None:
+            continue
+        # Days fully elapsed since the end of the partition's day
+        age = (today - day).days - 1
+        if age >= cold_days:
+            actions.append((name, DROP))
+        elif attached and age >= warm_days:
+            actions.append((name, DETACH))
+        elif attached and age >= hot_days and warm_tablespace and tablespace != warm_tablespace:
+            actions.append((name, MOVE_TO_WARM))
+    return actions
+
+
+class TelemetryPartitionManager:
+    """Creates and retires day partitions of ``telemetry_data`` (PostgreSQL only).
+
+    ``telemetry_data`` is range partitioned on ``created_at``, one partition
+    per UTC day plus a default partition, so inserts never fail when a day
+    partition is missing. Retention detaches or drops whole partitions
+    instead of deleting rows.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    @property
+    def supported(self) -> bool:
+        """Check the database can partition tables."""
+        return self.engine.dialect.name == "postgresql"
+
+    def is_partitioned(self) -> bool:
+        """Check whether telemetry_data is a partitioned table."""
+        if not self.supported:
+            return False
+        with self.engine.connect() as connection:
+            return bool(connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+            ), {"table": PARENT_TABLE}).scalar())
+
+    def list_partitions(self) -> List[Tuple[str, bool, Optional[str]]]:
+        """List day partitions as ``(name, attached, tablespace)``, including detached archives."""
+        with self.engine.connect() as connection:
+            attached = set(connection.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+            ), {"table": PARENT_TABLE}).scalars())
+            tables = connection.execute(text(
+                "SELECT tablename, tablespace FROM pg_tables "
+                "WHERE schemaname = current_schema() AND tablename LIKE :prefix"
+            ), {"prefix": f"{PARTITION_PREFIX}%"}).all()
+
+        return sorted(
+            (name, name in attached, tablespace)
+            for name, tablespace in tables
+            if partition_day(name) is not None
+        )
+
+    def ensure_partitions(self, days_ahead: Optional[int] = None, today: Optional[date] = None) -> int:
+        """Create the default partition and day partitions from yesterday to ``days_ahead`` days out.
+
+        Each partition is created in its own transaction, so one failure does
+        not roll back the others. Returns the number of partitions created.
+        """
+        if not self.is_partitioned():
+            logger.warning(f"{PARENT_TABLE} is not partitioned; run the partition migration to enable it")
+            return 0
+
+        days_ahead = settings.telemetry_partition_premake_days if days_ahead is None else days_ahead
+        today = today or datetime.utcnow().date()
+        existing = {name for name, _, _ in self.list_partitions()}
+        created = 0
+
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+            ))
+
+        for offset in range(-1, days_ahead + 1):
+            day = today + timedelta(days=offset)
+            name = partition_name(day)
+            if name in existing:
+                continue
+            try:
+                self._create_day_partition(name, day)
+                created += 1
+            except Exception as e:
+                logger.error(f"Failed to create partition {name}: {e}")
+
+        if created:
+            logger.info(f"Created {created} {PARENT_TABLE} partitions")
+        return created
+
+    def _create_day_partition(self, name: str, day: date):
+        """Create one day partition, first moving that day's rows out of the default partition.
+
+        PostgreSQL refuses to add a partition whose range already has rows
+        in the default partition, so such rows are moved into a new table
+        which is then attached, all in one transaction.
+        """
+        bounds = {"start": day, "end": day + timedelta(days=1)}
+        with self.engine.begin() as connection:
+            stranded = connection.execute(text(
+                f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"
+            ), bounds).scalar()
+            if not stranded:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+                ))
+                return
+
+            logger.warning(f"Moving {stranded} rows for {day} from {DEFAULT_PARTITION} into {name}")
+            connection.execute(text(
+                f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            connection.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ), bounds)
+            connection.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+            ))
+
+    def enforce_retention(self, today: Optional[date] = None) -> Dict[str, int]:
+        """Apply the hot/warm/cold retention settings to day partitions."""
+        today = today or datetime.utcnow().date()
+        actions = plan_retention(
+            self.list_partitions(),
+            today,
+            hot_days=settings.hot_storage_retention_days,
+            warm_days=settings.warm_storage_retention_days,
+            cold_days=settings.cold_storage_retention_days,
+            warm_tablespace=settings.telemetry_warm_tablespace
+        )
+
+        counts = {MOVE_TO_WARM: 0, DETACH: 0, DROP: 0}
+        for name, action in actions:
+            try:
+                with self.engine.begin() as connection:
+                    if action == MOVE_TO_WARM:
+                        connection.execute(text(f"ALTER TABLE {name} SET TABLESPACE {settings.telemetry_warm_tablespace}"))
+                    elif action == DETACH:
+                        connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                    else:
+                        connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                counts[action] += 1
+                logger.info(f"Telemetry retention: {action} {name}")
+            except Exception as e:
+                logger.error(f"Failed to {action} partition {name}: {e}")
+        return counts
+
+    def run_maintenance(self) -> Dict[str, int]:
+        """Create upcoming partitions and enforce retention."""
+        if not self.is_partitioned():
+            return {}
+        counts = self.enforce_retention()
+        counts["created"] = self.ensure_partitions()
+        return counts
+
+    def migrate_to_partitioned(self, today: Optional[date] = None):
+        """Convert an existing unpartitioned telemetry_data table in place.
+
+        The old table is renamed and attached as the partition for everything
+        before today, so no rows are copied; it ages out through the normal
+        retention once its upper bound passes the warm/cold cutoffs. Its
+        secondary indexes are renamed and recreated on the parent under their
+        original names, so new partitions are indexed the same way. Requires
+        ``created_at`` to be non-null on existing rows.
+        """
+        if not self.supported:
+            raise RuntimeError("Telemetry partitioning requires PostgreSQL")
+        if self.is_partitioned():
+            logger.info(f"{PARENT_TABLE} is already partitioned")
+            return
+
+        today = today or datetime.utcnow().date()
+        legacy_name = partition_name(today - timedelta(days=1))
+
+        with self.engine.begin() as connection:
+            # Secondary indexes (ORM and managed) move with the renamed table;
+            # their definitions are recreated on the parent below
+            indexes = connection.execute(text(
+                "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "WHERE t.relname = :table AND pg_table_is_visible(t.oid) AND NOT x.indisprimary"
+            ), {"table": PARENT_TABLE}).all()
+            connection.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {legacy_name}"))
+            for index_name, _ in indexes:
+                connection.execute(text(f"ALTER INDEX {index_name} RENAME TO {legacy_index_name(index_name, legacy_name)}"))
+            connection.execute(text(f"ALTER TABLE {legacy_name} ALTER COLUMN created_at SET NOT NULL"))
+            connection.execute(text(f"ALTER TABLE {legacy_name} DROP CONSTRAINT IF EXISTS {PARENT_TABLE}_pkey"))
+            connection.execute(text(f"ALTER TABLE {legacy_name} ADD PRIMARY KEY (id, created_at)"))
+            connection.execute(text(
+                f"CREATE TABLE {PARENT_TABLE} (LIKE {legacy_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (created_at)"
+            ))
+            connection.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, created_at)"))
+            connection.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (device_id) REFERENCES devices (id)"
+            ))
+            # The parent has no partitions yet, so these are instant; attaching
+            # the legacy table adopts its matching indexes instead of rebuilding
+            # them, and every later partition inherits them
+            for _, definition in indexes:
+                connection.execute(text(definition))
+            # Old rows stay where they are, attached as the partition for everything before today
+            connection.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {legacy_name} "
+                f"FOR VALUES FROM (MINVALUE) TO ('{today.isoformat()}')"
+            ))
+
+        logger.info(f"Converted {PARENT_TABLE} to a partitioned table; existing rows are in {legacy_name}")
+        self.ensure_partitions(today=today)
+
+
+def main():
+    """Command line entry point: ``python -m app.services.telemetry_partitions <command>``."""
+    from app.services.database import db_service
+
+    parser = argparse.ArgumentParser(description="Manage telemetry_data day partitions")
+    parser.add_argument("command", choices=["migrate", "maintain", "list"])
+    args = parser.parse_args()
+
+    manager = TelemetryPartitionManager(db_service.engine)
+    if args.command == "migrate":
+        manager.migrate_to_partitioned()
+    elif args.command == "maintain":
+        print(manager.run_maintenance())
+    else:
+        for name, attached, tablespace in manager.list_partitions():
+            print(f"{name}\t{'attached' if attached else 'detached'}\t{tablespace or 'default'}")
+
+
+if __name__ == "__main__":
+    main()
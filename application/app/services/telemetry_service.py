@@ -1,7 +1,8 @@
 """Telemetry data management service."""
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional, Tuple
+from sqlalchemy import String, and_, cast, or_, func, insert
+from pydantic import ValidationError
+from typing import List, Optional, Tuple, Dict, Any
 from datetime import datetime, timedelta
 import logging
 import os
@@ -9,9 +10,17 @@ import uuid
 import json
 
 from app.models.database import TelemetryData, Device
+from app.services.device_cache import device_id_cache
+from app.services.metrics_service import metrics_service
+from app.services.audio_storage import audio_storage
+from app.services.audio_mmap_reader import audio_store_reader
+from app.services.pagination import paginate
 from app.schemas.telemetry import (
-    TelemetryDataCreate, TelemetryDataResponse, AudioDataCreate, ProcessingResult
+    TelemetryDataCreate, TelemetryDataResponse, AudioDataCreate, ProcessingResult,
+    TelemetryBatchResponse, TelemetryBatchItemResult, BatchItemStatus, TelemetryDataListResponse,
+    StoredAudioCreate, ClaimedAudioData
 )
+from app.schemas.pagination import TotalMode
 from app.schemas.telemetry import DataType
 
 logger = logging.getLogger(__name__)
@@ -23,17 +32,21 @@ class TelemetryService:
     def __init__(self, db_session: Session):
         self.db = db_session
     
+    def device_exists(self, device_id: str) -> bool:
+        """Check a device is registered, using the device ID cache."""
+        return device_id_cache.resolve(self.db, device_id) is not None
+    
     def create_telemetry_data(self, data: TelemetryDataCreate) -> TelemetryDataResponse:
         """Create new telemetry data entry."""
         try:
-            # Verify device exists
-            device = self.db.query(Device).filter(Device.device_id == data.device_id).first()
-            if not device:
+            # Resolve device primary key
+            device_pk = device_id_cache.resolve(self.db, data.device_id)
+            if not device_pk:
                 raise ValueError(f"Device {data.device_id} not found")
             
             # Create telemetry data
             telemetry = TelemetryData(
-                device_id=device.id,
+                device_id=device_pk,
                 data_type=data.data_type.value,
                 payload=data.payload,
                 timestamp=data.timestamp or datetime.utcnow()
@@ -43,6 +56,7 @@ class TelemetryService:
             self.db.commit()
             self.db.refresh(telemetry)
             
+            metrics_service.record_telemetry(data.device_id, data.data_type.value)
             logger.info(f"Telemetry data created for device {data.device_id}")
             return TelemetryDataResponse.from_orm(telemetry)
             
@@ -51,59 +65,176 @@ class TelemetryService:
             logger.error(f"Failed to create telemetry data: {e}")
             raise
     
+    def create_telemetry_batch(self, readings: List[Dict[str, Any]]) -> TelemetryBatchResponse:
+        """Create telemetry data for many readings in a single transaction.
+        
+        Device IDs are resolved with at most one query and all valid readings are
+        written with one multi-row INSERT. Invalid readings and readings for
+        unknown devices are reported per item instead of failing the batch.
+        """
+        results: List[TelemetryBatchItemResult] = []
+        valid: List[Tuple[int, TelemetryDataCreate]] = []
+        
+        # Validate each reading independently
+        for index, reading in enumerate(readings):
+            try:
+                valid.append((index, TelemetryDataCreate(**reading)))
+            except (ValidationError, TypeError) as e:
+                results.append(TelemetryBatchItemResult(
+                    index=index,
+                    status=BatchItemStatus.INVALID,
+                    device_id=reading.get("device_id") if isinstance(reading, dict) else None,
+                    error=str(e)
+                ))
+        
+        rows = []
+        pending: List[TelemetryBatchItemResult] = []
+        try:
+            # Resolve all device IDs with at most one query
+            device_map = device_id_cache.resolve_many(self.db, (data.device_id for _, data in valid))
+            
+            now = datetime.utcnow()
+            for index, data in valid:
+                db_device_id = device_map.get(data.device_id)
+                if not db_device_id:
+                    results.append(TelemetryBatchItemResult(
+                        index=index,
+                        status=BatchItemStatus.DEVICE_NOT_FOUND,
+                        device_id=data.device_id,
+                        error=f"Device {data.device_id} not found"
+                    ))
+                    continue
+                
+                telemetry_id = str(uuid.uuid4())
+                rows.append({
+                    "id": telemetry_id,
+                    "device_id": db_device_id,
+                    "data_type": data.data_type.value,
+                    "payload": data.payload,
+                    "timestamp": data.timestamp or now,
+                    "processed": False,
+                    "created_at": now
+                })
+                pending.append(TelemetryBatchItemResult(
+                    index=index,
+                    status=BatchItemStatus.CREATED,
+                    id=telemetry_id,
+                    device_id=data.device_id
+                ))
+            
+            # Write all rows with one multi-row INSERT
+            if rows:
+                self.db.execute(insert(TelemetryData).values(rows))
+                self.db.commit()
+            
+            results.extend(pending)
+            for _, data in valid:
+                if device_map.get(data.device_id):
+                    metrics_service.record_telemetry(data.device_id, data.data_type.value)
+            logger.info(f"Telemetry batch stored {len(rows)} of {len(readings)} readings")
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to create telemetry batch: {e}")
+            reported = {r.index for r in results}
+            results.extend(
+                TelemetryBatchItemResult(
+                    index=index,
+                    status=BatchItemStatus.FAILED,
+                    device_id=data.device_id,
+                    error="Failed to store telemetry data"
+                )
+                for index, data in valid
+                if index not in reported
+            )
+        
+        results.sort(key=lambda r: r.index)
+        created = sum(1 for r in results if r.status == BatchItemStatus.CREATED)
+        return TelemetryBatchResponse(
+            total=len(readings),
+            created=created,
+            failed=len(readings) - created,
+            results=results
+        )
+    
     def create_audio_data(self, data: AudioDataCreate) -> TelemetryDataResponse:
         """Create audio telemetry data with file storage."""
         try:
-            # Verify device exists
-            device = self.db.query(Device).filter(Device.device_id == data.device_id).first()
-            if not device:
+            # Resolve device primary key
+            device_pk = device_id_cache.resolve(self.db, data.device_id)
+            if not device_pk:
                 raise ValueError(f"Device {data.device_id} not found")
             
-            # Generate unique filename
-            file_id = str(uuid.uuid4())
-            file_extension = "wav"  # Default to WAV format
-            filename = f"{file_id}.{file_extension}"
-            
-            # Create storage directory if it doesn't exist
-            from app.config import settings
-            storage_dir = os.path.join(settings.audio_storage_path, data.device_id)
-            os.makedirs(storage_dir, exist_ok=True)
+            # Save audio file under its content hash
+            stored = audio_storage.put_bytes(data.audio_data)
             
-            # Save audio file
-            file_path = os.path.join(storage_dir, filename)
-            with open(file_path, "wb") as f:
-                f.write(data.audio_data)
-            
-            # Create payload with audio metadata
-            payload = {
-                "audio_file": filename,
+            return self._create_audio_row(device_pk, data.device_id, stored.key, {
+                "audio_file": os.path.basename(stored.key),
                 "sample_rate": data.sample_rate,
                 "duration": data.duration,
                 "file_size": len(data.audio_data),
+                "sha256": stored.sha256,
                 "metadata": data.metadata or {}
-            }
-            
-            # Create telemetry data
-            telemetry = TelemetryData(
-                device_id=device.id,
-                data_type=DataType.AUDIO.value,
-                payload=payload,
-                audio_file_path=file_path,
-                timestamp=datetime.utcnow()
-            )
+            })
             
-            self.db.add(telemetry)
-            self.db.commit()
-            self.db.refresh(telemetry)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to create audio data: {e}")
+            raise
+    
+    def register_audio_file(self, data: StoredAudioCreate) -> TelemetryDataResponse:
+        """Create audio telemetry data for a file already streamed to storage."""
+        try:
+            device_pk = device_id_cache.resolve(self.db, data.device_id)
+            if not device_pk:
+                raise ValueError(f"Device {data.device_id} not found")
             
-            logger.info(f"Audio data created for device {data.device_id}")
-            return TelemetryDataResponse.from_orm(telemetry)
+            return self._create_audio_row(device_pk, data.device_id, data.audio_file_path, {
+                "audio_file": os.path.basename(data.audio_file_path),
+                "sample_rate": data.sample_rate,
+                "duration": data.duration,
+                "file_size": data.file_size,
+                "sha256": data.sha256,
+                "metadata": data.metadata or {}
+            })
             
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Failed to create audio data: {e}")
+            logger.error(f"Failed to register audio file: {e}")
             raise
     
+    def _create_audio_row(
+        self,
+        device_pk: str,
+        device_id: str,
+        storage_key: str,
+        payload: Dict[str, Any]
+    ) -> TelemetryDataResponse:
+        """Insert the telemetry row for a stored audio file.
+        
+        The stored format is recorded so processing and batch jobs know,
+        without opening the file, whether it needs resampling.
+        """
+        stored_format = audio_store_reader.probe(audio_storage.resolve(storage_key))
+        if stored_format is not None:
+            payload["stored_format"] = stored_format
+        
+        telemetry = TelemetryData(
+            device_id=device_pk,
+            data_type=DataType.AUDIO.value,
+            payload=payload,
+            audio_file_path=storage_key,
+            timestamp=datetime.utcnow()
+        )
+        
+        self.db.add(telemetry)
+        self.db.commit()
+        self.db.refresh(telemetry)
+        
+        metrics_service.record_telemetry(device_id, DataType.AUDIO.value)
+        logger.info(f"Audio data created for device {device_id}")
+        return TelemetryDataResponse.from_orm(telemetry)
+    
     def get_telemetry_data(
         self, 
         device_id: str,
@@ -114,14 +245,40 @@ class TelemetryService:
         page_size: int = 100
     ) -> Tuple[List[TelemetryDataResponse], int]:
         """Get telemetry data for a device with filtering."""
+        result = self.list_telemetry_data(
+            device_id,
+            start_time=start_time,
+            end_time=end_time,
+            data_type=data_type,
+            page=page,
+            page_size=page_size
+        )
+        return result.data, result.total
+    
+    def list_telemetry_data(
+        self,
+        device_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        data_type: Optional[DataType] = None,
+        page: int = 1,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> TelemetryDataListResponse:
+        """Get a page of telemetry data for a device, newest first.
+        
+        Pass the previous page's ``next_cursor`` to continue with keyset
+        pagination on ``(timestamp, id)``.
+        """
         try:
-            # Get device
-            device = self.db.query(Device).filter(Device.device_id == device_id).first()
-            if not device:
+            # Resolve device primary key
+            device_pk = device_id_cache.resolve(self.db, device_id)
+            if not device_pk:
                 raise ValueError(f"Device {device_id} not found")
             
             # Build query
-            query = self.db.query(TelemetryData).filter(TelemetryData.device_id == device.id)
+            query = self.db.query(TelemetryData).filter(TelemetryData.device_id == device_pk)
             
             # Apply filters
             if start_time:
@@ -131,20 +288,104 @@ class TelemetryService:
             if data_type:
                 query = query.filter(TelemetryData.data_type == data_type.value)
             
-            # Get total count
-            total = query.count()
+            telemetry_data, total, next_cursor = paginate(
+                query,
+                TelemetryData.timestamp,
+                TelemetryData.id,
+                page_size,
+                cursor=cursor,
+                page=page,
+                total_mode=total_mode
+            )
             
-            # Apply pagination and ordering
-            offset = (page - 1) * page_size
-            telemetry_data = query.order_by(desc(TelemetryData.timestamp)).offset(offset).limit(page_size).all()
+            return TelemetryDataListResponse(
+                data=[TelemetryDataResponse.from_orm(data) for data in telemetry_data],
+                total=total,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor
+            )
             
-            # Convert to response format
-            responses = [TelemetryDataResponse.from_orm(data) for data in telemetry_data]
+        except Exception as e:
+            logger.error(f"Failed to get telemetry data: {e}")
+            raise
+    
+    def get_telemetry_stats(
+        self,
+        device_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Count a device's telemetry by data type and processing state in one aggregate query."""
+        try:
+            device_pk = device_id_cache.resolve(self.db, device_id)
+            if not device_pk:
+                raise ValueError(f"Device {device_id} not found")
+            
+            query = self.db.query(
+                func.count().label("total"),
+                *(
+                    func.count().filter(TelemetryData.data_type == data_type.value).label(data_type.value)
+                    for data_type in DataType
+                ),
+                func.count().filter(TelemetryData.processed == True).label("processed")
+            ).filter(TelemetryData.device_id == device_pk)
+            if start_time:
+                query = query.filter(TelemetryData.timestamp >= start_time)
+            if end_time:
+                query = query.filter(TelemetryData.timestamp <= end_time)
             
-            return responses, total
+            return query.one()._asdict()
             
         except Exception as e:
-            logger.error(f"Failed to get telemetry data: {e}")
+            logger.error(f"Failed to get telemetry stats: {e}")
+            raise
+    
+    def get_detection_stats(self, start_time: datetime, end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Aggregate drone detection results of processed audio across all devices.
+        
+        Counts and the average confidence come from one aggregate query and
+        the classification breakdown from one ``GROUP BY``, reading the
+        fields out of ``processing_result`` in the database.
+        """
+        try:
+            result = TelemetryData.processing_result
+            detected = result["is_drone_detected"].as_boolean() == True
+            confidence = result["confidence_score"].as_float()
+            classification = result["classification"].as_string()
+            
+            conditions = [
+                TelemetryData.data_type == DataType.AUDIO.value,
+                TelemetryData.processed == True,
+                # JSON columns store None as the JSON literal null, not SQL NULL
+                result.isnot(None),
+                cast(result, String).notin_(["null", "{}"]),
+                TelemetryData.timestamp >= start_time
+            ]
+            if end_time:
+                conditions.append(TelemetryData.timestamp <= end_time)
+            
+            totals = self.db.query(
+                func.count().label("total_processed"),
+                func.count().filter(detected).label("drone_detections"),
+                func.count().filter(and_(detected, confidence > 0.9)).label("high_confidence_detections"),
+                func.avg(confidence).filter(detected).label("avg_confidence")
+            ).filter(*conditions).one()
+            
+            classifications = self.db.query(classification, func.count()).filter(
+                *conditions, classification.isnot(None)
+            ).group_by(classification).all()
+            
+            return {
+                "total_processed": totals.total_processed,
+                "drone_detections": totals.drone_detections,
+                "high_confidence_detections": totals.high_confidence_detections,
+                "avg_confidence": float(totals.avg_confidence or 0),
+                "classifications": {name: count for name, count in classifications}
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get detection stats: {e}")
             raise
     
     def get_unprocessed_audio_data(self, limit: int = 10) -> List[TelemetryDataResponse]:
@@ -165,6 +406,100 @@ class TelemetryService:
             logger.error(f"Failed to get unprocessed audio data: {e}")
             raise
     
+    def claim_unprocessed_audio_data(
+        self,
+        worker_id: str,
+        limit: int = 5,
+        lease_seconds: int = 300,
+        device_id: Optional[str] = None
+    ) -> List[ClaimedAudioData]:
+        """Claim a batch of unprocessed audio data for one worker.
+        
+        Rows are locked with ``FOR UPDATE SKIP LOCKED`` where the database
+        supports it and leased to ``worker_id`` until the lease expires, so
+        concurrent workers and replicas always receive disjoint batches.
+        Rows whose lease has expired (e.g. a crashed worker) are claimable again.
+        Each row carries the device's external ID for metrics and alerts.
+        With ``device_id``, only that device's rows are claimed.
+        """
+        try:
+            now = datetime.utcnow()
+            claimable = and_(
+                TelemetryData.data_type == DataType.AUDIO.value,
+                TelemetryData.processed == False,
+                TelemetryData.audio_file_path.isnot(None),
+                or_(TelemetryData.claimed_until.is_(None), TelemetryData.claimed_until < now)
+            )
+            if device_id:
+                device_pk = device_id_cache.resolve(self.db, device_id)
+                if not device_pk:
+                    return []
+                claimable = and_(claimable, TelemetryData.device_id == device_pk)
+            
+            candidate_ids = [
+                row[0] for row in self.db.query(TelemetryData.id)
+                .filter(claimable)
+                .order_by(TelemetryData.timestamp)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            ]
+            if not candidate_ids:
+                self.db.rollback()
+                return []
+            
+            # Re-check the claim condition so databases without SKIP LOCKED
+            # still never hand the same row to two workers
+            claimed_until = now + timedelta(seconds=lease_seconds)
+            self.db.query(TelemetryData).filter(
+                TelemetryData.id.in_(candidate_ids), claimable
+            ).update(
+                {TelemetryData.claimed_by: worker_id, TelemetryData.claimed_until: claimed_until},
+                synchronize_session=False
+            )
+            self.db.commit()
+            
+            claimed = self.db.query(TelemetryData, Device.device_id).join(
+                Device, TelemetryData.device_id == Device.id
+            ).filter(
+                and_(
+                    TelemetryData.id.in_(candidate_ids),
+                    TelemetryData.claimed_by == worker_id,
+                    TelemetryData.claimed_until == claimed_until
+                )
+            ).order_by(TelemetryData.timestamp).all()
+            return [
+                ClaimedAudioData(**TelemetryDataResponse.from_orm(d).dict(), device_external_id=device_id)
+                for d, device_id in claimed
+            ]
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to claim unprocessed audio data: {e}")
+            raise
+    
+    def release_claims(self, telemetry_ids: List[str], worker_id: str) -> int:
+        """Release claims held by a worker so other workers can pick the rows up."""
+        if not telemetry_ids:
+            return 0
+        try:
+            released = self.db.query(TelemetryData).filter(
+                and_(
+                    TelemetryData.id.in_(telemetry_ids),
+                    TelemetryData.claimed_by == worker_id,
+                    TelemetryData.processed == False
+                )
+            ).update(
+                {TelemetryData.claimed_by: None, TelemetryData.claimed_until: None},
+                synchronize_session=False
+            )
+            self.db.commit()
+            return released
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to release audio claims: {e}")
+            raise
+    
     def update_processing_result(
         self, 
         telemetry_id: str, 
@@ -178,6 +513,8 @@ class TelemetryService:
             
             telemetry.processed = True
             telemetry.processing_result = result.dict()
+            telemetry.claimed_by = None
+            telemetry.claimed_until = None
             
             self.db.commit()
             
@@ -190,30 +527,29 @@ class TelemetryService:
             raise
     
     def get_audio_file_path(self, telemetry_id: str) -> Optional[str]:
-        """Get audio file path for telemetry data."""
+        """Get the local path of the audio file for telemetry data."""
         try:
             telemetry = self.db.query(TelemetryData).filter(TelemetryData.id == telemetry_id).first()
             if telemetry and telemetry.audio_file_path:
-                return telemetry.audio_file_path
+                return audio_storage.resolve(telemetry.audio_file_path)
             return None
         except Exception as e:
             logger.error(f"Failed to get audio file path: {e}")
             raise
     
     def cleanup_old_data(self, days: int = 30) -> int:
-        """Clean up old telemetry data."""
+        """Delete old telemetry rows.
+        
+        Only used where telemetry_data is not partitioned; partitioned tables
+        are retired whole by TelemetryPartitionManager.
+        """
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
-            # Count records to be deleted
+            # Single DELETE; the affected row count replaces a separate COUNT scan
             count = self.db.query(TelemetryData).filter(
                 TelemetryData.created_at < cutoff_date
-            ).count()
-            
-            # Delete old records
-            self.db.query(TelemetryData).filter(
-                TelemetryData.created_at < cutoff_date
-            ).delete()
+            ).delete(synchronize_session=False)
             
             self.db.commit()
             
@@ -10,8 +10,14 @@ from datetime import datetime
 import joblib
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import threading
 
 from app.config import settings, UseCaseType
+from app.services.audio_decoder import decode_audio
+from app.services.audio_features import SpectralFrontEnd, extract_enhanced_features
+from app.services.inference_batcher import create_batcher
+from app.services.feature_cache import feature_cache
+from app.services.rollup_engine import rollup_engine
 from app.schemas.use_cases import (
     TrafficAnalysisRequest, TrafficAnalysisResult, TrafficEventType,
     SirenDetectionRequest, SirenDetectionResult, SirenType,
@@ -23,6 +29,43 @@ from app.schemas.use_cases import (
 
 logger = logging.getLogger(__name__)
 
+# Use cases whose models run on the enhanced feature vector
+FEATURE_USE_CASES = {
+    UseCaseType.TRAFFIC_MONITORING,
+    UseCaseType.SIREN_DETECTION,
+    UseCaseType.INDUSTRIAL_MONITORING,
+    UseCaseType.WILDLIFE_MONITORING
+}
+
+
+class DecodedClip:
+    """Audio decoded once and shared by several analyses.
+    
+    The enhanced feature vector is computed on first use from the first
+    ``settings.audio_duration`` seconds and reused by every model.
+    """
+    
+    def __init__(self, audio_data: np.ndarray, sample_rate: int, feature_extractor):
+        self.audio_data = audio_data
+        self.sample_rate = sample_rate
+        self._feature_extractor = feature_extractor
+        self._features: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+    
+    def samples(self, duration: float) -> np.ndarray:
+        """Get the first ``duration`` seconds of audio."""
+        return self.audio_data[:int(duration * self.sample_rate)]
+    
+    @property
+    def features(self) -> np.ndarray:
+        """Get the enhanced feature vector, extracting it once."""
+        with self._lock:
+            if self._features is None:
+                self._features = self._feature_extractor(
+                    self.samples(settings.audio_duration), self.sample_rate
+                )
+            return self._features
+
 
 class UseCaseMLService:
     """Enhanced ML service for specific use cases."""
@@ -31,6 +74,10 @@ class UseCaseMLService:
         self.models = {}
         self.feature_extractors = {}
         self._load_models()
+        self.batchers = {
+            use_case: create_batcher(use_case.value, model)
+            for use_case, model in self.models.items()
+        }
         self.executor = ThreadPoolExecutor(max_workers=4)
     
     def _load_models(self):
@@ -171,58 +218,28 @@ class UseCaseMLService:
         
         return MockWildlifeModel()
     
+    @staticmethod
+    def _audio_source(request) -> Any:
+        """Get the audio to decode: the uploaded file when given, else the raw bytes."""
+        return request.audio_source if request.audio_source is not None else request.audio_data
+    
+    def decode_audio(self, audio_data: Any, duration: float) -> DecodedClip:
+        """Decode encoded audio (bytes, memoryview, file object or path) at the configured sample rate."""
+        samples, sample_rate = decode_audio(audio_data, target_sr=settings.audio_sample_rate, duration=duration)
+        return DecodedClip(samples, sample_rate, self.extract_enhanced_features)
+    
     def extract_enhanced_features(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
         """Extract enhanced features for all use cases."""
         try:
-            features = []
-            
-            # Basic spectral features
-            mfccs = librosa.feature.mfcc(y=audio_data, sr=sample_rate, n_mfcc=settings.mfcc_features_count)
-            features.extend(np.mean(mfccs, axis=1))
-            features.extend(np.std(mfccs, axis=1))
-            
-            # Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sample_rate)[0]
-            features.append(np.mean(spectral_centroids))
-            features.append(np.std(spectral_centroids))
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
-            features.append(np.mean(zcr))
-            features.append(np.std(zcr))
-            
-            # Spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sample_rate)[0]
-            features.append(np.mean(rolloff))
-            features.append(np.std(rolloff))
-            
-            # Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio_data, sr=sample_rate)
-            features.extend(np.mean(chroma, axis=1))
-            
-            # Mel spectrogram
-            mel_spec = librosa.feature.melspectrogram(y=audio_data, sr=sample_rate, n_mels=settings.mel_spectrogram_bins)
-            features.extend(np.mean(mel_spec, axis=1)[:20])  # First 20 mel features
-            
-            # Spectral contrast
-            contrast = librosa.feature.spectral_contrast(y=audio_data, sr=sample_rate)
-            features.extend(np.mean(contrast, axis=1))
-            
-            # Tonnetz features
-            tonnetz = librosa.feature.tonnetz(y=audio_data, sr=sample_rate)
-            features.extend(np.mean(tonnetz, axis=1))
-            
-            # Rhythm features
-            tempo, beats = librosa.beat.beat_track(y=audio_data, sr=sample_rate)
-            features.append(tempo)
-            features.append(len(beats))
-            
-            # Energy features
-            rms = librosa.feature.rms(y=audio_data)[0]
-            features.append(np.mean(rms))
-            features.append(np.std(rms))
-            
-            return np.array(features)
+            # One STFT shared by all spectral features
+            compute = lambda: extract_enhanced_features(
+                SpectralFrontEnd(audio_data, sample_rate),
+                n_mfcc=settings.mfcc_features_count,
+                n_mels=settings.mel_spectrogram_bins
+            )
+            if not settings.feature_cache_enabled:
+                return compute()
+            return feature_cache.get_or_compute(audio_data, sample_rate, "enhanced", compute)
             
         except Exception as e:
             logger.error(f"Failed to extract enhanced features: {e}")
@@ -230,24 +247,27 @@ class UseCaseMLService:
     
     async def analyze_traffic(self, request: TrafficAnalysisRequest) -> TrafficAnalysisResult:
         """Analyze traffic patterns from audio data."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._analyze_traffic, request)
+        self._record_result(UseCaseType.TRAFFIC_MONITORING, result)
+        return result
+    
+    def _analyze_traffic(self, request: TrafficAnalysisRequest, clip: Optional[DecodedClip] = None) -> TrafficAnalysisResult:
+        """Run traffic analysis, reusing a shared decoded clip when given."""
         try:
             start_time = datetime.now()
             
-            # Load and preprocess audio
-            audio_data, sample_rate = librosa.load(
-                request.audio_data, 
-                sr=settings.audio_sample_rate,
-                duration=settings.audio_duration
-            )
+            # Decode audio unless a shared clip was provided
+            if clip is None:
+                clip = self.decode_audio(self._audio_source(request), settings.audio_duration)
+            audio_data = clip.samples(settings.audio_duration)
             
-            # Extract features
-            features = self.extract_enhanced_features(audio_data, sample_rate)
-            features = features.reshape(1, -1)
+            # Extract features (once per clip)
+            features = clip.features.reshape(1, -1)
             
-            # Get model predictions
-            model = self.models[UseCaseType.TRAFFIC_MONITORING]
-            proba = model.predict_proba(features)[0]
-            prediction = model.predict(features)[0]
+            # Get model predictions (batched with concurrent requests)
+            proba = self.batchers[UseCaseType.TRAFFIC_MONITORING].predict_proba(features)
+            prediction = int(np.argmax(proba))
             
             # Map prediction to event type
             event_types = list(TrafficEventType)
@@ -300,24 +320,26 @@ class UseCaseMLService:
     
     async def detect_siren(self, request: SirenDetectionRequest) -> SirenDetectionResult:
         """Detect emergency sirens in audio data."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._detect_siren, request)
+        self._record_result(UseCaseType.SIREN_DETECTION, result)
+        return result
+    
+    def _detect_siren(self, request: SirenDetectionRequest, clip: Optional[DecodedClip] = None) -> SirenDetectionResult:
+        """Run siren analysis, reusing a shared decoded clip when given."""
         try:
             start_time = datetime.now()
             
-            # Load and preprocess audio
-            audio_data, sample_rate = librosa.load(
-                request.audio_data, 
-                sr=settings.audio_sample_rate,
-                duration=settings.audio_duration
-            )
+            # Decode audio unless a shared clip was provided
+            if clip is None:
+                clip = self.decode_audio(self._audio_source(request), settings.audio_duration)
             
-            # Extract features
-            features = self.extract_enhanced_features(audio_data, sample_rate)
-            features = features.reshape(1, -1)
+            # Extract features (once per clip)
+            features = clip.features.reshape(1, -1)
             
-            # Get model predictions
-            model = self.models[UseCaseType.SIREN_DETECTION]
-            proba = model.predict_proba(features)[0]
-            prediction = model.predict(features)[0]
+            # Get model predictions (batched with concurrent requests)
+            proba = self.batchers[UseCaseType.SIREN_DETECTION].predict_proba(features)
+            prediction = int(np.argmax(proba))
             
             # Map prediction to siren type
             siren_types = list(SirenType)
@@ -383,15 +405,21 @@ class UseCaseMLService:
     
     async def analyze_noise_mapping(self, request: NoiseMappingRequest) -> NoiseMappingResult:
         """Analyze noise levels for urban mapping."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._analyze_noise_mapping, request)
+        self._record_result(UseCaseType.NOISE_MAPPING, result)
+        return result
+    
+    def _analyze_noise_mapping(self, request: NoiseMappingRequest, clip: Optional[DecodedClip] = None) -> NoiseMappingResult:
+        """Run noise mapping analysis, reusing a shared decoded clip when given."""
         try:
             start_time = datetime.now()
             
-            # Load and preprocess audio
-            audio_data, sample_rate = librosa.load(
-                request.audio_data, 
-                sr=settings.audio_sample_rate,
-                duration=request.measurement_duration_s
-            )
+            # Decode audio unless a shared clip was provided
+            if clip is None:
+                clip = self.decode_audio(self._audio_source(request), request.measurement_duration_s)
+            audio_data = clip.samples(request.measurement_duration_s)
+            sample_rate = clip.sample_rate
             
             # Calculate sound pressure level (SPL)
             rms = np.sqrt(np.mean(audio_data**2))
@@ -475,24 +503,27 @@ class UseCaseMLService:
     
     async def analyze_industrial_monitoring(self, request: IndustrialMonitoringRequest) -> IndustrialMonitoringResult:
         """Analyze industrial machinery for anomalies."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._analyze_industrial_monitoring, request)
+        self._record_result(UseCaseType.INDUSTRIAL_MONITORING, result)
+        return result
+    
+    def _analyze_industrial_monitoring(self, request: IndustrialMonitoringRequest, clip: Optional[DecodedClip] = None) -> IndustrialMonitoringResult:
+        """Run industrial monitoring analysis, reusing a shared decoded clip when given."""
         try:
             start_time = datetime.now()
             
-            # Load and preprocess audio
-            audio_data, sample_rate = librosa.load(
-                request.audio_data, 
-                sr=settings.audio_sample_rate,
-                duration=settings.audio_duration
-            )
+            # Decode audio unless a shared clip was provided
+            if clip is None:
+                clip = self.decode_audio(self._audio_source(request), settings.audio_duration)
+            audio_data = clip.samples(settings.audio_duration)
             
-            # Extract features
-            features = self.extract_enhanced_features(audio_data, sample_rate)
-            features = features.reshape(1, -1)
+            # Extract features (once per clip)
+            features = clip.features.reshape(1, -1)
             
-            # Get model predictions
-            model = self.models[UseCaseType.INDUSTRIAL_MONITORING]
-            proba = model.predict_proba(features)[0]
-            prediction = model.predict(features)[0]
+            # Get model predictions (batched with concurrent requests)
+            proba = self.batchers[UseCaseType.INDUSTRIAL_MONITORING].predict_proba(features)
+            prediction = int(np.argmax(proba))
             
             # Map prediction to anomaly type
             anomaly_types = list(IndustrialAnomalyType)
@@ -567,24 +598,27 @@ class UseCaseMLService:
     
     async def analyze_wildlife_monitoring(self, request: WildlifeMonitoringRequest) -> WildlifeMonitoringResult:
         """Analyze wildlife sounds for species identification."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._analyze_wildlife_monitoring, request)
+        self._record_result(UseCaseType.WILDLIFE_MONITORING, result)
+        return result
+    
+    def _analyze_wildlife_monitoring(self, request: WildlifeMonitoringRequest, clip: Optional[DecodedClip] = None) -> WildlifeMonitoringResult:
+        """Run wildlife monitoring analysis, reusing a shared decoded clip when given."""
         try:
             start_time = datetime.now()
             
-            # Load and preprocess audio
-            audio_data, sample_rate = librosa.load(
-                request.audio_data, 
-                sr=settings.audio_sample_rate,
-                duration=settings.audio_duration
-            )
+            # Decode audio unless a shared clip was provided
+            if clip is None:
+                clip = self.decode_audio(self._audio_source(request), settings.audio_duration)
+            audio_data = clip.samples(settings.audio_duration)
             
-            # Extract features
-            features = self.extract_enhanced_features(audio_data, sample_rate)
-            features = features.reshape(1, -1)
+            # Extract features (once per clip)
+            features = clip.features.reshape(1, -1)
             
-            # Get model predictions
-            model = self.models[UseCaseType.WILDLIFE_MONITORING]
-            proba = model.predict_proba(features)[0]
-            prediction = model.predict(features)[0]
+            # Get model predictions (batched with concurrent requests)
+            proba = self.batchers[UseCaseType.WILDLIFE_MONITORING].predict_proba(features)
+            prediction = int(np.argmax(proba))
             
             # Map prediction to species
             species_types = list(WildlifeSpecies)
@@ -641,6 +675,52 @@ class UseCaseMLService:
                 features={}
             )
     
+    def _record_result(self, use_case: UseCaseType, result: Any):
+        """Fold an analysis result into the dashboard rollups."""
+        try:
+            if use_case == UseCaseType.TRAFFIC_MONITORING:
+                detected = result.congestion_level > settings.congestion_threshold
+            elif use_case == UseCaseType.SIREN_DETECTION:
+                detected = result.siren_detected
+            elif use_case == UseCaseType.NOISE_MAPPING:
+                detected = result.noise_level in [NoiseLevel.VERY_LOUD, NoiseLevel.EXTREME]
+            elif use_case == UseCaseType.INDUSTRIAL_MONITORING:
+                detected = result.anomaly_detected
+            else:
+                detected = bool(result.species_detected)
+            
+            confidence = getattr(result, "confidence_score", None)
+            if use_case == UseCaseType.WILDLIFE_MONITORING and result.species_confidence:
+                confidence = max(result.species_confidence.values())
+            
+            rollup_engine.record_analysis(
+                use_case.value,
+                result.device_id,
+                result.processing_time_ms,
+                confidence=confidence,
+                detected=detected,
+                error=not result.features  # failed analyses return empty features
+            )
+        except Exception as e:
+            logger.error(f"Failed to record {use_case.value} rollup: {e}")
+    
+    def _prepare_unified_clip(self, request: UnifiedAnalysisRequest, use_case_requests: Dict[UseCaseType, Any]) -> Optional[DecodedClip]:
+        """Decode the clip once for the longest analysis window and extract shared features."""
+        durations = [settings.audio_duration]
+        noise_request = use_case_requests.get(UseCaseType.NOISE_MAPPING)
+        if noise_request is not None:
+            durations.append(noise_request.measurement_duration_s)
+        
+        try:
+            clip = self.decode_audio(self._audio_source(request), max(durations))
+            if FEATURE_USE_CASES.intersection(use_case_requests):
+                clip.features
+            return clip
+        except Exception as e:
+            # Each analysis falls back to its own decode and error result
+            logger.error(f"Failed to decode audio for unified analysis: {e}")
+            return None
+    
     async def analyze_unified(self, request: UnifiedAnalysisRequest) -> UnifiedAnalysisResult:
         """Perform unified analysis across multiple use cases."""
         try:
@@ -649,80 +729,95 @@ class UseCaseMLService:
             alerts_generated = []
             recommendations = []
             
-            # Process each use case
+            # Build one request per use case
+            use_case_requests = {}
             for use_case in request.use_cases:
                 if use_case == UseCaseType.TRAFFIC_MONITORING:
-                    traffic_request = TrafficAnalysisRequest(
+                    use_case_requests[use_case] = TrafficAnalysisRequest(
                         device_id=request.device_id,
                         location=request.location,
                         audio_data=request.audio_data,
                         timestamp=request.timestamp,
                         metadata=request.metadata
                     )
-                    result = await self.analyze_traffic(traffic_request)
-                    results[use_case] = result.dict()
-                    
-                    if result.congestion_level > settings.congestion_threshold:
-                        alerts_generated.append(f"Traffic congestion detected at {request.location}")
-                        recommendations.append("Consider traffic rerouting")
-                
                 elif use_case == UseCaseType.SIREN_DETECTION:
-                    siren_request = SirenDetectionRequest(
+                    use_case_requests[use_case] = SirenDetectionRequest(
                         device_id=request.device_id,
                         location=request.location,
                         audio_data=request.audio_data,
                         timestamp=request.timestamp,
                         metadata=request.metadata
                     )
-                    result = await self.detect_siren(siren_request)
-                    results[use_case] = result.dict()
-                    
-                    if result.siren_detected:
-                        alerts_generated.append(f"Emergency siren detected: {result.siren_type}")
-                        recommendations.append("Alert emergency services")
-                
                 elif use_case == UseCaseType.NOISE_MAPPING:
-                    noise_request = NoiseMappingRequest(
+                    use_case_requests[use_case] = NoiseMappingRequest(
                         device_id=request.device_id,
                         location=request.location,
                         audio_data=request.audio_data,
                         timestamp=request.timestamp,
                         metadata=request.metadata
                     )
-                    result = await self.analyze_noise_mapping(noise_request)
-                    results[use_case] = result.dict()
-                    
-                    if result.noise_level in [NoiseLevel.VERY_LOUD, NoiseLevel.EXTREME]:
-                        alerts_generated.append(f"Noise violation detected: {result.spl_db:.1f} dB")
-                        recommendations.append("Investigate noise source")
-                
                 elif use_case == UseCaseType.INDUSTRIAL_MONITORING:
-                    industrial_request = IndustrialMonitoringRequest(
+                    use_case_requests[use_case] = IndustrialMonitoringRequest(
                         device_id=request.device_id,
                         machinery_id=request.metadata.get("machinery_id", "unknown") if request.metadata else "unknown",
+                        machinery_type=request.metadata.get("machinery_type", "unknown") if request.metadata else "unknown",
                         location=request.location,
                         audio_data=request.audio_data,
                         timestamp=request.timestamp,
                         metadata=request.metadata
                     )
-                    result = await self.analyze_industrial_monitoring(industrial_request)
-                    results[use_case] = result.dict()
-                    
-                    if result.anomaly_detected:
-                        alerts_generated.append(f"Machinery anomaly detected: {result.anomaly_type}")
-                        recommendations.append(result.maintenance_recommendation or "Schedule maintenance")
-                
                 elif use_case == UseCaseType.WILDLIFE_MONITORING:
-                    wildlife_request = WildlifeMonitoringRequest(
+                    use_case_requests[use_case] = WildlifeMonitoringRequest(
                         device_id=request.device_id,
                         location=request.location,
+                        habitat_type=request.metadata.get("habitat_type", "unknown") if request.metadata else "unknown",
                         audio_data=request.audio_data,
                         timestamp=request.timestamp,
                         metadata=request.metadata
                     )
-                    result = await self.analyze_wildlife_monitoring(wildlife_request)
-                    results[use_case] = result.dict()
-                    
+            
+            # Decode (and featurise) the clip once for all use cases
+            loop = asyncio.get_running_loop()
+            clip = await loop.run_in_executor(self.executor, self._prepare_unified_clip, request, use_case_requests)
+            
+            # Run the per-use-case models concurrently on the shared clip
+            analyzers = {
+                UseCaseType.TRAFFIC_MONITORING: self._analyze_traffic,
+                UseCaseType.SIREN_DETECTION: self._detect_siren,
+                UseCaseType.NOISE_MAPPING: self._analyze_noise_mapping,
+                UseCaseType.INDUSTRIAL_MONITORING: self._analyze_industrial_monitoring,
+                UseCaseType.WILDLIFE_MONITORING: self._analyze_wildlife_monitoring
+            }
+            use_case_results = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, analyzers[use_case], use_case_request, clip)
+                for use_case, use_case_request in use_case_requests.items()
+            ))
+            
+            for use_case, result in zip(use_case_requests, use_case_results):
+                results[use_case] = result.dict()
+                self._record_result(use_case, result)
+                
+                if use_case == UseCaseType.TRAFFIC_MONITORING:
+                    if result.congestion_level > settings.congestion_threshold:
+                        alerts_generated.append(f"Traffic congestion detected at {request.location}")
+                        recommendations.append("Consider traffic rerouting")
+                
+                elif use_case == UseCaseType.SIREN_DETECTION:
+                    if result.siren_detected:
+                        alerts_generated.append(f"Emergency siren detected: {result.siren_type}")
+                        recommendations.append("Alert emergency services")
+                
+                elif use_case == UseCaseType.NOISE_MAPPING:
+                    if result.noise_level in [NoiseLevel.VERY_LOUD, NoiseLevel.EXTREME]:
+                        alerts_generated.append(f"Noise violation detected: {result.spl_db:.1f} dB")
+                        recommendations.append("Investigate noise source")
+                
+                elif use_case == UseCaseType.INDUSTRIAL_MONITORING:
+                    if result.anomaly_detected:
+                        alerts_generated.append(f"Machinery anomaly detected: {result.anomaly_type}")
+                        recommendations.append(result.maintenance_recommendation or "Schedule maintenance")
+                
+                elif use_case == UseCaseType.WILDLIFE_MONITORING:
                     if result.migration_indicator:
                         alerts_generated.append("Wildlife migration pattern detected")
                         recommendations.append("Update conservation monitoring")
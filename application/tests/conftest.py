@@ -0,0 +1,36 @@
+"""Shared fixtures for tests that run services against SQLite."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, Device
+from app.services.device_cache import device_id_cache
+
+
+@pytest.fixture
+def db_session():
+    """Session on a fresh in-memory database with the application schema."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    device_id_cache.clear()
+    yield session
+    session.close()
+    device_id_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def make_device(db_session):
+    """Create a device with the given external ID and return it."""
+    def make(device_id: str) -> Device:
+        device = Device(device_id=device_id, device_type="sensor", name=device_id)
+        db_session.add(device)
+        db_session.commit()
+        return device
+    return make
@@ -0,0 +1,168 @@
+"""Aggregate stats queries compared with counting rows in Python."""
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import null
+
+from app.models.database import Alert, TelemetryData
+from app.schemas.alert import AlertSeverity, AlertStatus, AlertType
+from app.schemas.telemetry import DataType
+from app.services.alert_service import AlertService
+from app.services.telemetry_service import TelemetryService
+
+NOW = datetime(2024, 6, 30, 12, 0)
+
+# processing_result values as the audio worker and older code paths stored them
+PROCESSING_RESULTS = [
+    {"is_drone_detected": True, "confidence_score": 0.95, "classification": "drone"},
+    {"is_drone_detected": True, "confidence_score": 0.75, "classification": "drone"},
+    {"is_drone_detected": False, "confidence_score": 0.2, "classification": "background"},
+    {"is_drone_detected": False, "confidence_score": 0.1},
+    {},
+    None,  # stored as JSON null
+    null()  # stored as SQL NULL
+]
+
+
+def python_detection_stats(rows, start_time):
+    """The counts the detection-stats endpoint computed in Python before aggregation."""
+    processed = [
+        row.processing_result for row in rows
+        if row.data_type == DataType.AUDIO.value and row.processed and row.processing_result
+        and row.timestamp >= start_time
+    ]
+    detected = [result for result in processed if result.get("is_drone_detected", False)]
+    return {
+        "total_processed": len(processed),
+        "drone_detections": len(detected),
+        "high_confidence_detections": sum(1 for result in detected if result.get("confidence_score", 0) > 0.9),
+        "avg_confidence": pytest.approx(
+            sum(result.get("confidence_score", 0) for result in detected) / len(detected) if detected else 0
+        ),
+        "classifications": dict(Counter(result["classification"] for result in processed if "classification" in result))
+    }
+
+
+@pytest.fixture
+def telemetry_rows(db_session, make_device):
+    devices = [make_device("sensor-001"), make_device("sensor-002")]
+    rows = []
+    for i, result in enumerate(PROCESSING_RESULTS * 2):
+        rows.append(TelemetryData(
+            device_id=devices[i % 2].id,
+            data_type=DataType.AUDIO.value,
+            payload={},
+            processed=True,
+            processing_result=result,
+            timestamp=NOW - timedelta(hours=i * 3)
+        ))
+    for i, data_type in enumerate([DataType.SENSOR, DataType.STATUS, DataType.AUDIO, DataType.SENSOR]):
+        rows.append(TelemetryData(
+            device_id=devices[0].id,
+            data_type=data_type.value,
+            payload={},
+            processed=False,
+            timestamp=NOW - timedelta(hours=i * 10)
+        ))
+    db_session.add_all(rows)
+    db_session.commit()
+    return devices, db_session.query(TelemetryData).all()
+
+
+class TestTelemetryStats:
+    """Test per-device counts by type and processing state."""
+    
+    @pytest.mark.parametrize("hours", [None, 24])
+    def test_matches_python_count(self, db_session, telemetry_rows, hours):
+        devices, rows = telemetry_rows
+        start_time = NOW - timedelta(hours=hours) if hours else None
+        
+        stats = TelemetryService(db_session).get_telemetry_stats("sensor-001", start_time=start_time, end_time=NOW)
+        
+        selected = [
+            row for row in rows
+            if row.device_id == devices[0].id and (start_time is None or row.timestamp >= start_time)
+            and row.timestamp <= NOW
+        ]
+        types = Counter(row.data_type for row in selected)
+        assert stats == {
+            "total": len(selected),
+            **{data_type.value: types[data_type.value] for data_type in DataType},
+            "processed": sum(1 for row in selected if row.processed)
+        }
+    
+    def test_unknown_device(self, db_session):
+        with pytest.raises(ValueError):
+            TelemetryService(db_session).get_telemetry_stats("unknown-device")
+
+
+class TestDetectionStats:
+    """Test detection aggregates across devices."""
+    
+    @pytest.mark.parametrize("hours", [12, 24, 100])
+    def test_matches_python_count(self, db_session, telemetry_rows, hours):
+        _, rows = telemetry_rows
+        start_time = NOW - timedelta(hours=hours)
+        
+        stats = TelemetryService(db_session).get_detection_stats(start_time)
+        
+        assert stats == python_detection_stats(rows, start_time)
+    
+    def test_json_null_results_not_counted(self, db_session, telemetry_rows):
+        """Test rows whose result is JSON null or empty are not counted as processed."""
+        stats = TelemetryService(db_session).get_detection_stats(NOW - timedelta(days=30))
+        
+        # Four of the seven stored results carry a detection outcome, twice over
+        assert stats["total_processed"] == 8
+        assert stats["classifications"] == {"drone": 4, "background": 2}
+
+
+class TestAlertSummary:
+    """Test per-device alert counts by status, severity and type."""
+    
+    def test_matches_python_count(self, db_session, make_device):
+        device = make_device("sensor-001")
+        other = make_device("sensor-002")
+        combinations = [
+            (status, severity, alert_type)
+            for status in AlertStatus
+            for severity in AlertSeverity
+            for alert_type in (AlertType.DRONE_DETECTED, AlertType.DEVICE_OFFLINE)
+        ]
+        alerts = [
+            Alert(
+                device_id=device.id if i % 3 else other.id,
+                alert_type=alert_type.value,
+                severity=severity.value,
+                status=status.value,
+                message="test",
+                created_at=NOW - timedelta(hours=i)
+            )
+            for i, (status, severity, alert_type) in enumerate(combinations)
+        ]
+        db_session.add_all(alerts)
+        db_session.commit()
+        start_time = NOW - timedelta(hours=12)
+        
+        summary = AlertService(db_session).get_alert_summary("sensor-001", start_time=start_time)
+        
+        selected = [alert for alert in alerts if alert.device_id == device.id and alert.created_at >= start_time]
+        statuses = Counter(alert.status for alert in selected)
+        severities = Counter(alert.severity for alert in selected)
+        types = Counter(alert.alert_type for alert in selected)
+        assert summary == {
+            "device_id": "sensor-001",
+            "total_alerts": len(selected),
+            "active_alerts": statuses[AlertStatus.ACTIVE.value],
+            "acknowledged_alerts": statuses[AlertStatus.ACKNOWLEDGED.value],
+            "resolved_alerts": statuses[AlertStatus.RESOLVED.value],
+            "severity_breakdown": {severity.value: severities[severity.value] for severity in AlertSeverity},
+            "type_breakdown": {alert_type.value: types[alert_type.value] for alert_type in AlertType}
+        }
+    
+    def test_unknown_device_is_empty(self, db_session):
+        summary = AlertService(db_session).get_alert_summary("unknown-device")
+        
+        assert summary["total_alerts"] == 0
+        assert set(summary["severity_breakdown"].values()) == {0}
@@ -0,0 +1,196 @@
+"""Lease-based audio claim queue tests."""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies import get_alert_service, get_ml_executor, get_telemetry_service
+from app.api.routers import analytics as analytics_router
+from app.models.database import Alert, TelemetryData
+from app.schemas.telemetry import ProcessingResult
+from app.services.alert_service import AlertService
+from app.services.schema_indexes import SchemaIndexManager
+from app.services.telemetry_service import TelemetryService
+
+# telemetry_data and devices as released before processing leases existed
+PRE_LEASE_SCHEMA = (
+    "CREATE TABLE devices (id VARCHAR PRIMARY KEY, device_id VARCHAR UNIQUE NOT NULL, device_type VARCHAR NOT NULL, "
+    "name VARCHAR NOT NULL, location VARCHAR, status VARCHAR, last_seen DATETIME, created_at DATETIME, "
+    "updated_at DATETIME, metadata JSON)",
+    "CREATE TABLE telemetry_data (id VARCHAR PRIMARY KEY, device_id VARCHAR NOT NULL REFERENCES devices (id), "
+    "timestamp DATETIME, data_type VARCHAR NOT NULL, payload JSON NOT NULL, audio_file_path VARCHAR, "
+    "processed BOOLEAN, processing_result JSON, created_at DATETIME NOT NULL)",
+)
+
+
+@pytest.fixture
+def add_audio(db_session, make_device):
+    device = make_device("sensor-001")
+    start = datetime.utcnow() - timedelta(minutes=10)
+    
+    def add(count: int, processed: bool = False):
+        rows = [
+            TelemetryData(
+                device_id=device.id,
+                data_type="audio",
+                payload={},
+                audio_file_path=f"clip-{i}.wav",
+                processed=processed,
+                timestamp=start + timedelta(seconds=i)
+            )
+            for i in range(count)
+        ]
+        db_session.add_all(rows)
+        db_session.commit()
+        return [row.id for row in rows]
+    return add
+
+
+def processing_result() -> ProcessingResult:
+    return ProcessingResult(is_drone_detected=False, confidence_score=0.1, processing_time=0.01)
+
+
+class TestClaimUnprocessedAudio:
+    """Test workers receive disjoint batches and leases expire."""
+    
+    def test_workers_receive_disjoint_batches_oldest_first(self, db_session, add_audio):
+        ids = add_audio(5)
+        add_audio(2, processed=True)
+        service = TelemetryService(db_session)
+        
+        first = service.claim_unprocessed_audio_data("worker-a", limit=3)
+        second = service.claim_unprocessed_audio_data("worker-b", limit=3)
+        
+        assert [row.id for row in first] == ids[:3]
+        assert [row.id for row in second] == ids[3:]
+        assert service.claim_unprocessed_audio_data("worker-c", limit=3) == []
+        
+        holders = dict(db_session.query(TelemetryData.id, TelemetryData.claimed_by).filter(TelemetryData.id.in_(ids)))
+        assert holders == {**{i: "worker-a" for i in ids[:3]}, **{i: "worker-b" for i in ids[3:]}}
+    
+    def test_expired_lease_is_reclaimed(self, db_session, add_audio):
+        ids = add_audio(2)
+        service = TelemetryService(db_session)
+        service.claim_unprocessed_audio_data("worker-a", limit=2, lease_seconds=300)
+        
+        # worker-a crashed; its lease on the first row runs out
+        db_session.query(TelemetryData).filter(TelemetryData.id == ids[0]).update(
+            {TelemetryData.claimed_until: datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False
+        )
+        db_session.commit()
+        
+        reclaimed = service.claim_unprocessed_audio_data("worker-b", limit=2)
+        
+        assert [row.id for row in reclaimed] == [ids[0]]
+        assert db_session.get(TelemetryData, ids[0]).claimed_by == "worker-b"
+        assert db_session.get(TelemetryData, ids[1]).claimed_by == "worker-a"
+    
+    def test_processed_rows_are_not_reclaimed(self, db_session, add_audio):
+        ids = add_audio(1)
+        service = TelemetryService(db_session)
+        service.claim_unprocessed_audio_data("worker-a", lease_seconds=300)
+        
+        assert service.update_processing_result(ids[0], processing_result())
+        
+        row = db_session.get(TelemetryData, ids[0])
+        db_session.refresh(row)
+        assert row.processed and row.claimed_by is None and row.claimed_until is None
+        assert service.claim_unprocessed_audio_data("worker-b") == []
+
+
+class TestClaimByDevice:
+    """Test claiming one device's audio leaves other devices' rows unclaimed."""
+    
+    @pytest.fixture
+    def two_devices(self, db_session, make_device, add_audio):
+        other = make_device("sensor-002")
+        add_audio(3)
+        db_session.add_all(
+            TelemetryData(device_id=other.id, data_type="audio", payload={}, audio_file_path=f"other-{i}.wav")
+            for i in range(3)
+        )
+        db_session.commit()
+    
+    def test_only_device_rows_claimed(self, db_session, two_devices):
+        service = TelemetryService(db_session)
+        
+        claimed = service.claim_unprocessed_audio_data("worker-a", limit=10, device_id="sensor-002")
+        
+        assert [row.device_external_id for row in claimed] == ["sensor-002"] * 3
+        assert len(service.claim_unprocessed_audio_data("worker-b", limit=10)) == 3
+        assert service.claim_unprocessed_audio_data("worker-c", device_id="unknown-device") == []
+    
+    def test_trigger_processing_for_device(self, db_session, two_devices):
+        """Test the manual trigger processes and alerts on the requested device only."""
+        executor = Mock()
+        executor.process_audio_file_async = AsyncMock(return_value=ProcessingResult(
+            is_drone_detected=True, confidence_score=0.95, classification="drone", processing_time=0.2
+        ))
+        app = FastAPI()
+        app.include_router(analytics_router.router)
+        app.dependency_overrides[get_telemetry_service] = lambda: TelemetryService(db_session)
+        app.dependency_overrides[get_alert_service] = lambda: AlertService(db_session)
+        app.dependency_overrides[get_ml_executor] = lambda: executor
+        
+        response = TestClient(app).post("/analytics/trigger-processing", params={"device_id": "sensor-002"})
+        
+        assert response.status_code == 200
+        assert response.json()["processed_count"] == 3
+        assert response.json()["alerts_created"] == 3
+        alerts = db_session.query(Alert).all()
+        assert {alert.device.device_id for alert in alerts} == {"sensor-002"}
+        # sensor-001's rows were never claimed, so a worker can take them at once
+        assert len(TelemetryService(db_session).claim_unprocessed_audio_data("worker-b", limit=10)) == 3
+
+
+class TestReleaseClaims:
+    """Test releasing claims hands rows back immediately."""
+    
+    def test_release_only_own_claims(self, db_session, add_audio):
+        ids = add_audio(2)
+        service = TelemetryService(db_session)
+        service.claim_unprocessed_audio_data("worker-a", limit=2, lease_seconds=300)
+        
+        assert service.release_claims(ids, "worker-b") == 0
+        assert service.claim_unprocessed_audio_data("worker-b") == []
+        
+        assert service.release_claims(ids[:1], "worker-a") == 1
+        assert [row.id for row in service.claim_unprocessed_audio_data("worker-b")] == ids[:1]
+        assert service.release_claims([], "worker-a") == 0
+
+
+class TestPreLeaseDatabase:
+    """Test a database created before leases gets the lease columns at startup."""
+    
+    def test_claim_after_migration(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            for ddl in PRE_LEASE_SCHEMA:
+                connection.execute(text(ddl))
+        
+        added = SchemaIndexManager(engine).add_missing_columns()
+        
+        assert {"telemetry_data.claimed_by", "telemetry_data.claimed_until"} <= set(added)
+        assert {"claimed_by", "claimed_until"} <= {c["name"] for c in inspect(engine).get_columns("telemetry_data")}
+        
+        session = sessionmaker(bind=engine)()
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "INSERT INTO devices (id, device_id, device_type, name) VALUES ('pk-1', 'legacy-001', 'sensor', 'legacy')"
+                ))
+                connection.execute(text(
+                    "INSERT INTO telemetry_data (id, device_id, timestamp, data_type, payload, audio_file_path, "
+                    "processed, created_at) VALUES ('row-1', 'pk-1', '2024-01-01 00:00:00', 'audio', '{}', "
+                    "'clip.wav', 0, '2024-01-01 00:00:00')"
+                ))
+            
+            claimed = TelemetryService(session).claim_unprocessed_audio_data("worker-a")
+            assert [row.id for row in claimed] == ["row-1"]
+        finally:
+            session.close()
+            engine.dispose()
@@ -0,0 +1,129 @@
+"""Tests for the unified audio decoder."""
+import io
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.services.audio_decoder import decode_audio, parse_wav_header, resample, _resample_kernel
+
+
+def wav_bytes(samples: np.ndarray, sample_rate: int, subtype: str) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, sample_rate, format="WAV", subtype=subtype)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def tone():
+    t = np.linspace(0, 1, 22050, endpoint=False)
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+class TestDecodeAudio:
+    """Test decoding from each supported source."""
+    
+    def test_float_wav_is_a_zero_copy_view(self, tone):
+        data = wav_bytes(tone, 22050, "FLOAT")
+        samples, sample_rate = decode_audio(data)
+        
+        assert sample_rate == 22050
+        assert samples.dtype == np.float32
+        np.testing.assert_array_equal(samples, tone)
+        assert not samples.flags.owndata
+    
+    @pytest.mark.parametrize("subtype,tolerance", [("PCM_16", 1e-4), ("PCM_U8", 1e-2), ("PCM_32", 1e-6)])
+    def test_integer_wav_matches_soundfile(self, tone, subtype, tolerance):
+        data = wav_bytes(tone, 22050, subtype)
+        expected, _ = sf.read(io.BytesIO(data), dtype="float32")
+        
+        samples, _ = decode_audio(memoryview(data))
+        np.testing.assert_allclose(samples, expected, atol=tolerance)
+    
+    def test_stereo_path_is_downmixed_and_windowed(self, tone, tmp_path):
+        path = tmp_path / "stereo.wav"
+        sf.write(path, np.stack([tone, -tone * 0], axis=1), 22050, subtype="PCM_16")
+        
+        samples, _ = decode_audio(str(path), offset=0.5, duration=0.25)
+        
+        assert len(samples) == 22050 // 4
+        np.testing.assert_allclose(samples, tone[11025:11025 + 5512] / 2, atol=1e-4)
+    
+    def test_file_object_and_flac(self, tone):
+        buffer = io.BytesIO()
+        sf.write(buffer, tone, 22050, format="FLAC")
+        buffer.seek(0)
+        
+        samples, sample_rate = decode_audio(buffer)
+        assert sample_rate == 22050
+        np.testing.assert_allclose(samples, tone, atol=1e-4)
+    
+    def test_bytesio_can_be_closed_after_decode(self, tone):
+        buffer = io.BytesIO(wav_bytes(tone, 22050, "FLOAT"))
+        samples, _ = decode_audio(buffer)
+        buffer.close()
+        np.testing.assert_array_equal(samples, tone)
+    
+    def test_raw_float32(self, tone):
+        samples, sample_rate = decode_audio(tone.tobytes(), raw_sample_rate=16000)
+        assert sample_rate == 16000
+        np.testing.assert_array_equal(samples, tone)
+    
+    def test_raw_float32_not_probed(self, tone):
+        """Test raw samples are told apart from containers without handing them to soundfile."""
+        with patch("app.services.audio_decoder.sf.info") as info:
+            decode_audio(tone.tobytes(), raw_sample_rate=16000)
+        info.assert_not_called()
+    
+    def test_raw_float32_resembling_mpeg_sync(self, tone):
+        """Test raw samples whose first bytes look like an MPEG frame sync are still read as raw."""
+        raw = np.concatenate([np.frombuffer(bytes([0xFF, 0xFF, 0x7F, 0x3F]), dtype="<f4"), tone])
+        
+        samples, sample_rate = decode_audio(raw.tobytes(), raw_sample_rate=16000)
+        
+        assert sample_rate == 16000
+        np.testing.assert_array_equal(samples, raw)
+    
+    @pytest.mark.parametrize("container", ["FLAC", "OGG"])
+    def test_container_not_read_as_raw(self, tone, container):
+        """Test compressed containers are decoded even when a raw sample rate is given."""
+        buffer = io.BytesIO()
+        sf.write(buffer, tone, 22050, format=container)
+        
+        samples, sample_rate = decode_audio(buffer.getvalue(), raw_sample_rate=16000)
+        
+        assert sample_rate == 22050
+        assert len(samples) == len(tone)
+        if container == "FLAC":
+            np.testing.assert_allclose(samples, tone, atol=1e-4)
+    
+    def test_invalid_audio_raises(self):
+        with pytest.raises(ValueError):
+            decode_audio(b"invalid audio data")
+        with pytest.raises(ValueError):
+            decode_audio(b"")
+    
+    def test_not_a_wav_header(self):
+        assert parse_wav_header(memoryview(b"RIFF....AVI ")) is None
+
+
+class TestResample:
+    """Test resampling with cached kernels."""
+    
+    def test_resample_to_target_rate(self, tone):
+        data = wav_bytes(tone, 22050, "FLOAT")
+        samples, sample_rate = decode_audio(data, target_sr=16000)
+        
+        assert sample_rate == 16000
+        assert samples.dtype == np.float32
+        assert len(samples) == 16000
+        # The tone survives: same dominant frequency
+        spectrum = np.abs(np.fft.rfft(samples))
+        assert abs(np.argmax(spectrum) - 440) <= 1
+    
+    def test_kernel_is_cached(self, tone):
+        _resample_kernel.cache_clear()
+        resample(tone, 22050, 16000)
+        resample(tone, 22050, 16000)
+        assert _resample_kernel.cache_info().hits == 1
@@ -0,0 +1,111 @@
+"""Tests for the shared spectral feature front end."""
+import pytest
+import numpy as np
+import librosa
+import librosa.core.spectrum
+from unittest.mock import patch
+
+from app.services.audio_features import SpectralFrontEnd, extract_basic_features, extract_enhanced_features
+from app.services.ml_service import ml_service
+from app.services.use_case_ml_service import use_case_ml_service
+
+SAMPLE_RATE = 22050
+
+
+def reference_basic_features(audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
+    """54-element vector computed with one librosa call (and STFT) per feature."""
+    features = []
+    mfccs = librosa.feature.mfcc(y=audio_data, sr=sample_rate, n_mfcc=13)
+    features.extend(np.mean(mfccs, axis=1))
+    features.extend(np.std(mfccs, axis=1))
+    for values in (
+        librosa.feature.spectral_centroid(y=audio_data, sr=sample_rate)[0],
+        librosa.feature.zero_crossing_rate(audio_data)[0],
+        librosa.feature.spectral_rolloff(y=audio_data, sr=sample_rate)[0]
+    ):
+        features.append(np.mean(values))
+        features.append(np.std(values))
+    features.extend(np.mean(librosa.feature.chroma_stft(y=audio_data, sr=sample_rate), axis=1))
+    features.extend(np.mean(librosa.feature.melspectrogram(y=audio_data, sr=sample_rate), axis=1)[:10])
+    return np.array(features)
+
+
+def reference_enhanced_features(audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Enhanced vector computed with one librosa call (and STFT) per feature."""
+    features = list(reference_basic_features(audio_data, sample_rate)[:44])
+    mel_spec = librosa.feature.melspectrogram(y=audio_data, sr=sample_rate, n_mels=128)
+    features.extend(np.mean(mel_spec, axis=1)[:20])
+    features.extend(np.mean(librosa.feature.spectral_contrast(y=audio_data, sr=sample_rate), axis=1))
+    features.extend(np.mean(librosa.feature.tonnetz(y=audio_data, sr=sample_rate), axis=1))
+    tempo, beats = librosa.beat.beat_track(y=audio_data, sr=sample_rate)
+    features.append(float(np.atleast_1d(tempo)[0]))
+    features.append(len(beats))
+    rms = librosa.feature.rms(y=audio_data)[0]
+    features.append(np.mean(rms))
+    features.append(np.std(rms))
+    return np.array(features)
+
+
+def make_clips():
+    """Noise, tone and click-train clips of two seconds."""
+    rng = np.random.default_rng(42)
+    t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t) + 0.1 * rng.standard_normal(len(t))
+    clicks = librosa.clicks(times=np.arange(0, 2, 0.25), sr=SAMPLE_RATE, length=len(t))
+    return [
+        rng.random(len(t)).astype(np.float32),
+        tone.astype(np.float32),
+        (clicks + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+    ]
+
+
+class TestSpectralFrontEnd:
+    """Test shared-STFT features match per-feature librosa calls."""
+    
+    @pytest.mark.parametrize("clip_index", [0, 1, 2])
+    def test_basic_features_equivalent(self, clip_index):
+        """Test the 54-element vector is unchanged."""
+        audio_data = make_clips()[clip_index]
+        features = ml_service.extract_audio_features(audio_data, SAMPLE_RATE)
+        
+        assert features.shape == (54,)
+        np.testing.assert_allclose(features, reference_basic_features(audio_data, SAMPLE_RATE), rtol=1e-5, atol=1e-6)
+    
+    @pytest.mark.parametrize("clip_index", [0, 1, 2])
+    def test_enhanced_features_equivalent(self, clip_index):
+        """Test the enhanced vector is unchanged."""
+        audio_data = make_clips()[clip_index]
+        features = use_case_ml_service.extract_enhanced_features(audio_data, SAMPLE_RATE)
+        
+        np.testing.assert_allclose(features, reference_enhanced_features(audio_data, SAMPLE_RATE), rtol=1e-5, atol=1e-6)
+
+
+class TestSharedStft:
+    """Test each clip is transformed once, whatever the number of features."""
+    
+    def _count_stft_calls(self, extract, clip):
+        """Run ``extract`` counting front-end STFTs and per-feature spectrogram STFTs."""
+        with patch.object(librosa, "stft", wraps=librosa.stft) as front_end_stft, \
+                patch.object(librosa.core.spectrum, "stft", wraps=librosa.core.spectrum.stft) as feature_stft:
+            extract(clip)
+        return front_end_stft.call_count, feature_stft.call_count
+    
+    @pytest.mark.parametrize("clip_index", [0, 1, 2])
+    def test_basic_features_single_stft(self, clip_index):
+        """Test the 54-element vector needs one STFT and no per-feature spectrograms."""
+        clip = make_clips()[clip_index]
+        calls = self._count_stft_calls(
+            lambda audio_data: extract_basic_features(SpectralFrontEnd(audio_data, SAMPLE_RATE)), clip
+        )
+        
+        assert calls == (1, 0)
+    
+    @pytest.mark.parametrize("clip_index", [0, 1, 2])
+    def test_enhanced_features_single_stft(self, clip_index):
+        """Test the enhanced vector needs one STFT and no per-feature spectrograms."""
+        clip = make_clips()[clip_index]
+        calls = self._count_stft_calls(
+            lambda audio_data: extract_enhanced_features(SpectralFrontEnd(audio_data, SAMPLE_RATE), 13, 128), clip
+        )
+        
+        assert calls == (1, 0)
@@ -0,0 +1,97 @@
+"""Tests for the memory-mapped audio store reader."""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.config import settings
+from app.services.audio_mmap_reader import audio_store_reader
+from app.services.ml_service import ml_service
+
+
+@pytest.fixture
+def tone():
+    t = np.linspace(0, 1, settings.audio_sample_rate, endpoint=False)
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+class TestAudioStoreReader:
+    """Test reading stored clips through a memory map."""
+    
+    def test_native_rate_float_clip_is_a_view(self, tone, tmp_path):
+        path = tmp_path / "clip.wav"
+        sf.write(path, tone, settings.audio_sample_rate, subtype="FLOAT")
+        
+        clip = audio_store_reader.open(str(path))
+        samples = clip.samples(target_sr=settings.audio_sample_rate)
+        
+        np.testing.assert_array_equal(samples, tone)
+        assert not samples.flags.owndata
+        assert not samples.flags.writeable
+        assert clip.describe()["resample_required"] is False
+    
+    def test_window_and_resampling(self, tone, tmp_path):
+        path = tmp_path / "clip.wav"
+        sf.write(path, tone, settings.audio_sample_rate, subtype="PCM_16")
+        
+        clip = audio_store_reader.open(str(path))
+        frames = clip.frames(offset=0.5, duration=0.25)
+        assert frames.dtype == np.dtype("<i2")
+        assert frames.shape == (settings.audio_sample_rate // 4, 1)
+        
+        resampled = clip.samples(duration=0.5, target_sr=settings.audio_sample_rate // 2)
+        assert abs(len(resampled) - settings.audio_sample_rate // 4) <= 1
+    
+    def test_probe_describes_format(self, tone, tmp_path):
+        path = tmp_path / "clip.wav"
+        sf.write(path, np.stack([tone, tone], axis=1), 16000, subtype="PCM_16")
+        
+        described = audio_store_reader.probe(str(path))
+        
+        assert described == {
+            "sample_rate": 16000,
+            "channels": 2,
+            "sample_format": "<i2",
+            "frames": len(tone),
+            "resample_required": settings.audio_sample_rate != 16000
+        }
+    
+    def test_unmappable_files(self, tone, tmp_path):
+        flac = tmp_path / "clip.flac"
+        sf.write(flac, tone, settings.audio_sample_rate, format="FLAC")
+        empty = tmp_path / "empty.wav"
+        empty.write_bytes(b"")
+        
+        with pytest.raises(ValueError):
+            audio_store_reader.open(str(flac))
+        assert audio_store_reader.probe(str(empty)) is None
+        assert audio_store_reader.probe(str(tmp_path / "missing.wav")) is None
+
+
+class TestProcessStoredClip:
+    """Test the ML service reads stored clips without leaking the mapping."""
+    
+    def test_features_read_from_mapping_then_closed(self, tone, tmp_path):
+        """Test a native-rate float32 clip is analysed in place and unmapped afterwards."""
+        path = tmp_path / "clip.wav"
+        sf.write(path, tone, settings.audio_sample_rate, subtype="FLOAT")
+        opened, seen = [], []
+        real_open = audio_store_reader.open
+        
+        def open_clip(clip_path):
+            opened.append(real_open(clip_path))
+            return opened[-1]
+        
+        def extract(audio_data, sample_rate):
+            # A plain function, not a Mock, so no call record keeps the view alive
+            seen.append((audio_data.flags.owndata, opened[0]._mapping.closed, audio_data.sum()))
+            return np.zeros(54)
+        
+        with patch("app.services.ml_service.audio_store_reader.open", side_effect=open_clip), \
+                patch.object(ml_service, "extract_audio_features", extract):
+            result = ml_service.process_audio_file(str(path))
+        
+        assert result.classification != "error"
+        assert seen == [(False, False, pytest.approx(tone.sum()))]
+        assert opened[0]._mapping.closed
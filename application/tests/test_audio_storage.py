@@ -0,0 +1,88 @@
+"""Tests for content-addressed audio storage and its migration tool."""
+import hashlib
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.services.audio_storage import AudioStorageMigrator, ContentAddressedAudioStorage, is_storage_key
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return ContentAddressedAudioStorage(str(tmp_path / "audio"))
+
+
+class TestContentAddressedAudioStorage:
+    """Test sharded layout and deduplication."""
+    
+    def test_put_bytes_uses_fan_out_layout(self, storage):
+        data = b"RIFF clip"
+        sha256 = hashlib.sha256(data).hexdigest()
+        
+        stored = storage.put_bytes(data)
+        
+        assert stored.key == f"{sha256[:2]}/{sha256[2:4]}/{sha256}.wav"
+        assert stored.created and stored.sha256 == sha256
+        assert is_storage_key(stored.key)
+        with open(storage.path(stored.key), "rb") as f:
+            assert f.read() == data
+    
+    def test_identical_content_is_stored_once(self, storage):
+        first = storage.put_bytes(b"same")
+        staged = storage.staging_path()
+        with open(staged, "wb") as f:
+            f.write(b"same")
+        second = storage.commit(staged, hashlib.sha256(b"same").hexdigest())
+        
+        assert second.key == first.key
+        assert not second.created
+        assert not os.path.exists(staged)
+        assert os.listdir(storage.staging_dir) == []
+    
+    def test_resolve_and_invalid_keys(self, storage):
+        stored = storage.put_bytes(b"clip")
+        
+        assert storage.resolve(stored.key) == storage.path(stored.key)
+        assert storage.resolve("storage/audio/dev-1/legacy.wav") == "storage/audio/dev-1/legacy.wav"
+        with pytest.raises(ValueError):
+            storage.path("../../etc/passwd")
+        
+        storage.delete(stored.key)
+        assert not os.path.exists(storage.path(stored.key))
+
+
+class TestAudioStorageMigrator:
+    """Test moving legacy per-device files into the store."""
+    
+    def test_migrate_repoints_rows_and_removes_legacy_files(self, storage, tmp_path):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE telemetry_data (id VARCHAR PRIMARY KEY, audio_file_path VARCHAR)"))
+        
+        legacy_paths = []
+        for name, content in [("a", b"one"), ("b", b"one"), ("c", b"two")]:
+            path = tmp_path / "legacy" / "dev-1" / f"{name}.wav"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            legacy_paths.append(str(path))
+        already = storage.put_bytes(b"three").key
+        rows = list(zip(["1", "2", "3", "4", "5"], legacy_paths + [already, str(tmp_path / "gone.wav")]))
+        with engine.begin() as connection:
+            for row_id, path in rows:
+                connection.execute(text("INSERT INTO telemetry_data VALUES (:id, :path)"), {"id": row_id, "path": path})
+        
+        migrator = AudioStorageMigrator(engine, storage)
+        assert migrator.migrate(batch_size=2, dry_run=True)["migrated"] == 3
+        assert all(os.path.exists(path) for path in legacy_paths)
+        
+        counts = migrator.migrate(batch_size=2)
+        
+        assert counts == {"migrated": 2, "deduplicated": 1, "missing": 1, "already_migrated": 1}
+        assert not any(os.path.exists(path) for path in legacy_paths)
+        with engine.connect() as connection:
+            migrated = dict(connection.execute(text("SELECT id, audio_file_path FROM telemetry_data")).fetchall())
+        assert migrated["1"] == migrated["2"] == ContentAddressedAudioStorage.key_for(hashlib.sha256(b"one").hexdigest())
+        with open(storage.path(migrated["3"]), "rb") as f:
+            assert f.read() == b"two"
+        assert migrated["5"].endswith("gone.wav")
@@ -0,0 +1,101 @@
+"""Tests for chunked audio uploads."""
+import hashlib
+import io
+import os
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_async_telemetry_service
+from app.api.routers import telemetry as telemetry_router
+from app.services.audio_storage import ContentAddressedAudioStorage
+from app.services.audio_upload import UploadTooLargeError, check_upload_size, stream_upload_to_file
+
+
+def make_upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="clip.wav")
+
+
+class TestStreamUpload:
+    """Test streaming uploads to storage."""
+    
+    @pytest.mark.asyncio
+    async def test_streams_in_chunks_and_hashes(self, tmp_path):
+        data = os.urandom(10_000)
+        path = str(tmp_path / "device-1" / "clip.wav")
+        
+        stored = await stream_upload_to_file(make_upload(data), path, max_bytes=1_000_000, chunk_size=1024)
+        
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        with open(path, "rb") as f:
+            assert f.read() == data
+    
+    @pytest.mark.asyncio
+    async def test_oversized_upload_leaves_no_file(self, tmp_path):
+        path = str(tmp_path / "clip.wav")
+        
+        with pytest.raises(UploadTooLargeError):
+            await stream_upload_to_file(make_upload(b"x" * 5000), path, max_bytes=4096, chunk_size=1024)
+        
+        assert os.listdir(tmp_path) == []
+
+
+class TestCheckUploadSize:
+    """Test size checks on received uploads."""
+    
+    def test_rejects_without_reading(self):
+        upload = make_upload(b"x" * 2048)
+        with pytest.raises(UploadTooLargeError):
+            check_upload_size(upload, max_bytes=1024)
+        
+        check_upload_size(upload, max_bytes=4096)
+        assert upload.file.tell() == 0
+
+
+class TestUploadEndpoint:
+    """Test the upload route validates the device before storing anything."""
+    
+    @pytest.mark.parametrize("device_id", ["unknown-device", "../.."])
+    def test_unknown_device_writes_nothing(self, tmp_path, device_id):
+        service = AsyncMock()
+        service.device_exists.return_value = False
+        app = FastAPI()
+        app.include_router(telemetry_router.router)
+        app.dependency_overrides[get_async_telemetry_service] = lambda: service
+        
+        with patch.object(telemetry_router, "audio_storage", ContentAddressedAudioStorage(str(tmp_path / "audio"))):
+            response = TestClient(app).post(
+                "/telemetry/audio",
+                data={"device_id": device_id, "duration": "2.0"},
+                files={"audio_file": ("clip.wav", b"RIFF" + os.urandom(100), "audio/wav")}
+            )
+        
+        assert response.status_code == 400
+        service.device_exists.assert_awaited_once_with(device_id)
+        service.register_audio_file.assert_not_called()
+        assert os.listdir(tmp_path) == []
+    
+    def test_failed_registration_keeps_stored_file(self, tmp_path):
+        """Test a failed registration does not delete the clip a concurrent identical upload may reference."""
+        data = b"RIFF" + os.urandom(100)
+        storage = ContentAddressedAudioStorage(str(tmp_path / "audio"))
+        service = AsyncMock()
+        service.device_exists.return_value = True
+        service.register_audio_file.side_effect = RuntimeError("database unavailable")
+        app = FastAPI()
+        app.include_router(telemetry_router.router)
+        app.dependency_overrides[get_async_telemetry_service] = lambda: service
+        
+        with patch.object(telemetry_router, "audio_storage", storage):
+            response = TestClient(app).post(
+                "/telemetry/audio",
+                data={"device_id": "sensor-001", "duration": "2.0"},
+                files={"audio_file": ("clip.wav", data, "audio/wav")}
+            )
+        
+        assert response.status_code == 500
+        key = ContentAddressedAudioStorage.key_for(hashlib.sha256(data).hexdigest())
+        assert os.path.exists(storage.path(key))
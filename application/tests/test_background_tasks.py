@@ -0,0 +1,69 @@
+"""Audio worker processing tests."""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.database import Alert, TelemetryData
+from app.schemas.alert import AlertSeverity, AlertType
+from app.schemas.telemetry import ProcessingResult
+from app.services import background_tasks as background_tasks_module
+from app.services.background_tasks import BackgroundTaskService
+
+
+@pytest.fixture
+def worker_env(db_session, make_device):
+    """Route the worker's session, ML pool and metrics to the test doubles."""
+    device = make_device("sensor-001")
+    db_session.add(TelemetryData(device_id=device.id, data_type="audio", payload={}, audio_file_path="clip.wav"))
+    db_session.commit()
+    
+    metrics = Mock()
+    rollups = Mock()
+    executor = Mock()
+    with patch.object(background_tasks_module.db_service, "get_session", return_value=db_session), \
+            patch.object(background_tasks_module.db_service, "close_session"), \
+            patch.object(background_tasks_module, "ml_executor", executor), \
+            patch.object(background_tasks_module, "metrics_service", metrics), \
+            patch.object(background_tasks_module, "rollup_engine", rollups):
+        yield device, executor, metrics, rollups
+
+
+class TestProcessAudioData:
+    """Test a claimed clip is processed, measured and alerted on."""
+    
+    def test_detected_clip_creates_alert_and_metrics(self, db_session, worker_env):
+        device, executor, metrics, rollups = worker_env
+        executor.process_audio_file.return_value = ProcessingResult(
+            is_drone_detected=True, confidence_score=0.95, classification="drone", processing_time=0.2
+        )
+        
+        assert BackgroundTaskService()._process_audio_data("worker-test") == 1
+        
+        executor.process_audio_file.assert_called_once_with("clip.wav")
+        metrics.record_audio_processing.assert_called_once_with("sensor-001", 0.2)
+        metrics.record_drone_detection.assert_called_once_with("sensor-001", 0.95)
+        rollups.record_analysis.assert_called_once_with(
+            "drone_detection", "sensor-001", pytest.approx(200.0), confidence=0.95, detected=True
+        )
+        
+        alerts = db_session.query(Alert).all()
+        assert len(alerts) == 1
+        assert alerts[0].device_id == device.id
+        assert alerts[0].alert_type == AlertType.DRONE_DETECTED.value
+        assert alerts[0].severity == AlertSeverity.HIGH.value
+        
+        row = db_session.query(TelemetryData).one()
+        assert row.processed and row.processing_result["is_drone_detected"]
+    
+    def test_quiet_clip_records_metrics_without_alert(self, db_session, worker_env):
+        _, executor, metrics, _ = worker_env
+        executor.process_audio_file.return_value = ProcessingResult(
+            is_drone_detected=False, confidence_score=0.1, processing_time=0.1
+        )
+        
+        assert BackgroundTaskService()._process_audio_data("worker-test") == 1
+        
+        metrics.record_audio_processing.assert_called_once_with("sensor-001", 0.1)
+        metrics.record_drone_detection.assert_not_called()
+        assert db_session.query(Alert).count() == 0
+        assert db_session.query(TelemetryData).one().processed
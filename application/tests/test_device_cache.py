@@ -0,0 +1,68 @@
+"""Device ID resolution cache tests."""
+import pytest
+import time
+from unittest.mock import Mock
+
+from app.services.device_cache import DeviceIdCache
+
+
+class TestDeviceIdCache:
+    """Test device ID to primary key cache."""
+    
+    def test_hit_and_miss(self):
+        """Test cache hits and misses are counted."""
+        cache = DeviceIdCache(max_size=10, ttl_seconds=60)
+        
+        assert cache.get("device-001") is None
+        cache.set("device-001", "pk-001")
+        assert cache.get("device-001") == "pk-001"
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+    
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first."""
+        cache = DeviceIdCache(max_size=2, ttl_seconds=60)
+        cache.set("device-001", "pk-001")
+        cache.set("device-002", "pk-002")
+        
+        # Touch device-001 so device-002 becomes least recently used
+        cache.get("device-001")
+        cache.set("device-003", "pk-003")
+        
+        assert cache.get("device-001") == "pk-001"
+        assert cache.get("device-002") is None
+        assert cache.get("device-003") == "pk-003"
+        assert cache.get_stats()["size"] == 2
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = DeviceIdCache(max_size=10, ttl_seconds=0.01)
+        cache.set("device-001", "pk-001")
+        time.sleep(0.02)
+        
+        assert cache.get("device-001") is None
+        assert cache.get_stats()["size"] == 0
+    
+    def test_invalidate(self):
+        """Test explicit invalidation."""
+        cache = DeviceIdCache(max_size=10, ttl_seconds=60)
+        cache.set("device-001", "pk-001")
+        cache.invalidate("device-001")
+        
+        assert cache.get("device-001") is None
+    
+    def test_resolve_uses_cache(self):
+        """Test resolve only queries the database on a miss."""
+        cache = DeviceIdCache(max_size=10, ttl_seconds=60)
+        cache.set("device-001", "pk-001")
+        db = Mock()
+        
+        assert cache.resolve(db, "device-001") == "pk-001"
+        db.query.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
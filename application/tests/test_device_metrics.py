@@ -0,0 +1,86 @@
+"""Tests for bounded-cardinality device metrics."""
+from prometheus_client import CollectorRegistry, REGISTRY
+
+from app.services.device_metrics import DeviceMetricsTable, TopDevicesCollector, OTHER_GROUP
+from app.services.metrics_service import metrics_service
+
+
+class TestDeviceMetricsTable:
+    """Test the array-backed per-device table."""
+    
+    def test_counts_and_grows(self):
+        """Test counters survive the table growing past its initial capacity."""
+        table = DeviceMetricsTable(max_devices=100, initial_capacity=2)
+        for i in range(10):
+            for _ in range(i + 1):
+                table.add(f"sensor-{i}", "telemetry_total")
+        
+        assert len(table) == 10
+        assert table.get("sensor-9")["telemetry_total"] == 10
+        assert table.get("sensor-0")["telemetry_total"] == 1
+        assert table.get("sensor-0")["last_seen"] is not None
+        assert table.get("missing") is None
+    
+    def test_overflow_row(self):
+        """Test devices beyond the cap are folded into the overflow row."""
+        table = DeviceMetricsTable(max_devices=3, initial_capacity=1)
+        for i in range(5):
+            table.add(f"sensor-{i}", "telemetry_total")
+        
+        assert len(table) == 3
+        assert table.get("sensor-4") is None
+        assert table.overflow()["telemetry_total"] == 2
+    
+    def test_top_k_and_page(self):
+        """Test top-K export and sorted pagination."""
+        table = DeviceMetricsTable()
+        for i in range(5):
+            table.add(f"sensor-{i}", "drone_detections_total", i)
+        
+        assert [device_id for device_id, _ in table.top_k("drone_detections_total", 2)] == ["sensor-4", "sensor-3"]
+        
+        items, total = table.page(offset=1, limit=2, sort_by="drone_detections_total")
+        assert total == 5
+        assert [item["device_id"] for item in items] == ["sensor-3", "sensor-2"]
+    
+    def test_group_labels_are_bounded(self):
+        """Test group labels collapse into the overflow group past the cap."""
+        table = DeviceMetricsTable(group_mode="prefix", max_groups=2)
+        assert table.group_of("north-1") == "north"
+        assert table.group_of("north-2") == "north"
+        assert table.group_of("south-1") == "south"
+        assert table.group_of("east-1") == OTHER_GROUP
+        
+        fleet = DeviceMetricsTable(group_mode="fleet")
+        assert fleet.group_of("north-1") == fleet.group_of("south-1") == "fleet"
+    
+    def test_collector_exports_top_k_only(self):
+        """Test the collector exposes at most K device series."""
+        table = DeviceMetricsTable()
+        for i in range(10):
+            table.add(f"sensor-{i}", "telemetry_total", i + 1)
+        
+        registry = CollectorRegistry()
+        registry.register(TopDevicesCollector(table, k=3))
+        
+        assert registry.get_sample_value("device_top_telemetry_total", {"device_id": "sensor-9"}) == 10
+        assert registry.get_sample_value("device_top_telemetry_total", {"device_id": "sensor-0"}) is None
+        assert registry.get_sample_value("device_metrics_tracked_devices") == 10
+
+
+class TestMetricsServiceDeviceLabels:
+    """Test metrics service records device metrics without per-device labels."""
+    
+    def test_record_telemetry_uses_group_label(self):
+        """Test telemetry counters are labelled by device group."""
+        labels = {"device_group": "grouptest", "data_type": "audio"}
+        before = REGISTRY.get_sample_value("telemetry_data_total", labels) or 0.0
+        
+        metrics_service.record_telemetry("grouptest-1", "audio")
+        metrics_service.record_telemetry("grouptest-2", "audio")
+        
+        assert REGISTRY.get_sample_value("telemetry_data_total", labels) == before + 2
+        assert metrics_service.device_table.get("grouptest-1")["telemetry_total"] >= 1
+        
+        page = metrics_service.get_device_metrics(limit=1000)
+        assert "grouptest-2" in {item["device_id"] for item in page["items"]}
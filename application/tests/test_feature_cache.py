@@ -0,0 +1,70 @@
+"""Tests for the content-hash feature cache."""
+import numpy as np
+from unittest.mock import Mock, patch
+
+from app.config import settings
+from app.services.feature_cache import FeatureCache
+from app.services.ml_service import ml_service
+
+
+class TestFeatureCache:
+    """Test feature cache keys, eviction and tiers."""
+    
+    def test_identical_audio_hits_cache(self):
+        """Test identical samples reuse one extraction."""
+        cache = FeatureCache(max_bytes=1024 * 1024)
+        audio_data = np.random.random(22050).astype(np.float32)
+        compute = Mock(return_value=np.arange(54, dtype=float))
+        
+        first = cache.get_or_compute(audio_data, 22050, "basic", compute)
+        second = cache.get_or_compute(audio_data.copy(), 22050, "basic", compute)
+        
+        assert compute.call_count == 1
+        np.testing.assert_array_equal(first, second)
+        assert cache.get_stats()["hit_rate"] == 0.5
+    
+    def test_key_covers_kind_rate_and_config(self):
+        """Test keys change with feature kind, sample rate and feature config."""
+        cache = FeatureCache()
+        audio_data = np.zeros(1000, dtype=np.float32)
+        key = cache.key(audio_data, 22050, "basic")
+        
+        assert cache.key(audio_data, 22050, "enhanced") != key
+        assert cache.key(audio_data, 16000, "basic") != key
+        with patch.object(settings, "mfcc_features_count", 20):
+            assert cache.key(audio_data, 22050, "basic") != key
+    
+    def test_lru_eviction_by_bytes(self):
+        """Test least recently used entries are evicted once over the byte budget."""
+        vector_bytes = np.zeros(10).nbytes
+        cache = FeatureCache(max_bytes=vector_bytes * 2)
+        cache.set("a", np.zeros(10))
+        cache.set("b", np.ones(10))
+        cache.get("a")
+        cache.set("c", np.full(10, 2.0))
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["bytes"] <= vector_bytes * 2
+    
+    def test_disk_tier(self, tmp_path):
+        """Test vectors survive in the disk tier after the memory tier is cleared."""
+        cache = FeatureCache(disk_path=str(tmp_path))
+        cache.set("abcdef", np.arange(5, dtype=float))
+        cache.clear()
+        
+        features = cache.get("abcdef")
+        
+        np.testing.assert_array_equal(features, np.arange(5, dtype=float))
+        assert cache.get_stats()["disk_hits"] == 1
+    
+    def test_ml_service_uses_cache(self):
+        """Test extract_audio_features consults the cache first."""
+        audio_data = np.random.random(22050).astype(np.float32)
+        
+        with patch("app.services.ml_service.extract_basic_features", return_value=np.ones(54)) as extract:
+            first = ml_service.extract_audio_features(audio_data, 22050)
+            second = ml_service.extract_audio_features(audio_data, 22050)
+        
+        assert extract.call_count == 1
+        np.testing.assert_array_equal(first, second)
@@ -0,0 +1,82 @@
+"""Tests for the micro-batching inference layer."""
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.inference_batcher import InferenceBatcher
+
+
+class CountingModel:
+    """Deterministic model recording the shape of every call."""
+    
+    classes_ = np.array(["low", "high"])
+    
+    def __init__(self):
+        self.calls = []
+    
+    def predict_proba(self, X):
+        self.calls.append(X.shape)
+        high = 1 / (1 + np.exp(-X.sum(axis=1)))
+        return np.column_stack([1 - high, high])
+
+
+class FailingModel:
+    """Model whose scoring always fails."""
+    
+    def predict_proba(self, X):
+        raise RuntimeError("model unavailable")
+
+
+class TestInferenceBatcher:
+    """Test batching of concurrent single-vector requests."""
+    
+    def test_concurrent_requests_share_one_call(self):
+        """Test concurrent vectors are scored in one predict_proba call."""
+        model = CountingModel()
+        batcher = InferenceBatcher("counting", model, max_batch_size=8, max_wait_ms=200)
+        vectors = [np.full(4, value, dtype=float) for value in np.linspace(-1, 1, 8)]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(batcher.predict_proba, vectors))
+        
+        assert sum(rows for rows, _ in model.calls) == 8
+        assert len(model.calls) < 8
+        for vector, proba in zip(vectors, results):
+            np.testing.assert_allclose(proba, model.predict_proba(vector.reshape(1, -1))[0])
+    
+    def test_batch_size_limit(self):
+        """Test batches never exceed the configured size."""
+        model = CountingModel()
+        batcher = InferenceBatcher("counting", model, max_batch_size=3, max_wait_ms=50)
+        futures = [batcher.submit(np.ones(2)) for _ in range(7)]
+        
+        for future in futures:
+            future.result(timeout=5)
+        
+        assert max(rows for rows, _ in model.calls) <= 3
+        assert batcher.get_stats()["items"] == 7
+    
+    def test_label_from_probabilities(self):
+        """Test labels are derived from the same probability output."""
+        batcher = InferenceBatcher("counting", CountingModel(), max_wait_ms=0)
+        
+        label, proba = batcher.predict(np.ones(3))
+        
+        assert label == "high"
+        assert proba[1] > proba[0]
+    
+    @pytest.mark.asyncio
+    async def test_async_prediction(self):
+        """Test async callers await the batched result."""
+        batcher = InferenceBatcher("counting", CountingModel(), max_wait_ms=0)
+        
+        proba = await batcher.predict_proba_async(np.zeros((1, 3)))
+        
+        np.testing.assert_allclose(proba, [0.5, 0.5])
+    
+    def test_model_errors_reach_callers(self):
+        """Test a failing batch raises in every waiting caller."""
+        batcher = InferenceBatcher("failing", FailingModel(), max_wait_ms=0)
+        
+        with pytest.raises(RuntimeError):
+            batcher.predict_proba(np.ones(3))
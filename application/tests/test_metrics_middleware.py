@@ -0,0 +1,74 @@
+"""Tests for the request metrics middleware."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.middleware.metrics_middleware import MetricsMiddleware, OTHER_ROUTE, UNMATCHED_ROUTE
+from app.services.metrics_service import latency_buckets
+
+
+def request_count(method: str, endpoint: str, status_code: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "http_requests_total",
+        {"method": method, "endpoint": endpoint, "status_code": status_code}
+    )
+    return value or 0.0
+
+
+def create_app(max_series: int = 100) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/middleware-test/devices/{device_id}")
+    async def get_device(device_id: str):
+        return {"device_id": device_id}
+    
+    @app.get("/middleware-test/health")
+    async def health():
+        return {"status": "ok"}
+    
+    app.add_middleware(MetricsMiddleware, max_series=max_series)
+    return app
+
+
+class TestMetricsMiddleware:
+    """Test route-template labelling and cardinality limits."""
+    
+    def test_labels_by_route_template(self):
+        """Test requests for different devices share one series."""
+        client = TestClient(create_app())
+        endpoint = "/middleware-test/devices/{device_id}"
+        before = request_count("GET", endpoint, "200")
+        
+        for device_id in ("sensor-1", "sensor-2", "sensor-3"):
+            assert client.get(f"/middleware-test/devices/{device_id}").status_code == 200
+        
+        assert request_count("GET", endpoint, "200") - before == 3
+        assert request_count("GET", "/middleware-test/devices/sensor-1", "200") == 0.0
+    
+    def test_unmatched_paths_share_one_label(self):
+        """Test 404s are not labelled by their raw path."""
+        client = TestClient(create_app())
+        before = request_count("GET", UNMATCHED_ROUTE, "404")
+        
+        client.get("/middleware-test/unknown-1")
+        client.get("/middleware-test/unknown-2")
+        
+        assert request_count("GET", UNMATCHED_ROUTE, "404") - before == 2
+    
+    def test_series_cap(self):
+        """Test routes beyond the series cap fold into one label."""
+        client = TestClient(create_app(max_series=1))
+        before = request_count("GET", OTHER_ROUTE, "200")
+        
+        client.get("/middleware-test/devices/sensor-1")
+        client.get("/middleware-test/health")
+        
+        assert request_count("GET", OTHER_ROUTE, "200") - before == 1
+    
+    def test_latency_buckets_around_target(self):
+        """Test histogram buckets bracket the latency target."""
+        buckets = latency_buckets(100)
+        
+        assert 0.1 in buckets
+        assert buckets[0] < 0.01
+        assert buckets == tuple(sorted(buckets))
@@ -0,0 +1,38 @@
+"""Tests for the process-pool ML inference executor."""
+import pytest
+import numpy as np
+
+from app.schemas.telemetry import ProcessingResult
+from app.services.ml_executor import MLExecutor
+
+
+class TestMLExecutor:
+    """Test ML executor dispatch and fallback."""
+    
+    def test_disabled_executor_runs_in_process(self):
+        """Test inference falls back to the in-process ML service."""
+        executor = MLExecutor(max_workers=1, enabled=False)
+        executor.start()
+        assert not executor.running
+        
+        audio_data = np.random.random(22050).astype(np.float32).tobytes()
+        result = executor.process_audio_data(audio_data, 22050)
+        
+        assert isinstance(result, ProcessingResult)
+        assert result.classification != "error"
+    
+    @pytest.mark.asyncio
+    async def test_worker_pool_processes_shared_buffer(self):
+        """Test audio bytes are processed in a worker via shared memory."""
+        executor = MLExecutor(max_workers=1, enabled=True)
+        executor.start()
+        try:
+            assert executor.running
+            audio_data = np.random.random(22050).astype(np.float32).tobytes()
+            result = await executor.process_audio_data_async(audio_data, 22050)
+            
+            assert isinstance(result, ProcessingResult)
+            assert result.classification != "error"
+            assert 0.0 <= result.confidence_score <= 1.0
+        finally:
+            executor.shutdown()
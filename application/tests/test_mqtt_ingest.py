@@ -0,0 +1,115 @@
+"""Tests for the MQTT ingest pipeline."""
+import json
+import threading
+import time
+
+from app.services.mqtt_ingest import MQTTIngestPipeline, OverflowPolicy
+from app.services.mqtt_service import MQTTService
+
+
+def payload(**data) -> bytes:
+    return json.dumps(data).encode()
+
+
+class TestMQTTIngestPipeline:
+    """Test queueing, batching and overflow handling."""
+    
+    def test_messages_are_decoded_and_batched(self):
+        batches = []
+        pipeline = MQTTIngestPipeline(batches.append, worker_count=1, batch_size=10, batch_wait_ms=50)
+        for i in range(5):
+            assert pipeline.offer("devices/d1/telemetry", payload(value=i))
+        pipeline.offer("devices/d1/telemetry", b"not json")
+        
+        pipeline.start()
+        pipeline.stop()
+        
+        messages = [m for batch in batches for m in batch]
+        assert [m.data["value"] for m in messages] == [0, 1, 2, 3, 4]
+        assert len(batches) == 1
+        assert pipeline.processed == 6
+        assert pipeline.dropped == 1
+    
+    def test_slow_handler_does_not_block_offer(self):
+        release = threading.Event()
+        pipeline = MQTTIngestPipeline(lambda batch: release.wait(5), queue_size=100, worker_count=1, batch_size=1)
+        pipeline.start()
+        try:
+            start = time.monotonic()
+            for i in range(50):
+                assert pipeline.offer("t", payload(value=i))
+            assert time.monotonic() - start < 1.0
+            assert pipeline.depth() >= 48
+        finally:
+            release.set()
+            pipeline.stop()
+        assert pipeline.depth() == 0
+    
+    def test_drop_newest_rejects_when_full(self):
+        pipeline = MQTTIngestPipeline(lambda batch: None, queue_size=2, overflow_policy=OverflowPolicy.DROP_NEWEST)
+        
+        results = [pipeline.offer("t", payload(value=i)) for i in range(3)]
+        
+        assert results == [True, True, False]
+        assert pipeline.dropped == 1
+    
+    def test_drop_oldest_keeps_newest(self):
+        batches = []
+        pipeline = MQTTIngestPipeline(batches.append, queue_size=2, worker_count=1, overflow_policy="drop_oldest")
+        for i in range(4):
+            assert pipeline.offer("t", payload(value=i))
+        
+        pipeline.start()
+        pipeline.stop()
+        
+        assert [m.data["value"] for batch in batches for m in batch] == [2, 3]
+        assert pipeline.dropped == 2
+    
+    def test_block_applies_backpressure_then_drops(self):
+        pipeline = MQTTIngestPipeline(lambda batch: None, queue_size=1, block_timeout_s=0.05)
+        assert pipeline.offer("t", payload(value=1))
+        
+        start = time.monotonic()
+        assert not pipeline.offer("t", payload(value=2))
+        assert time.monotonic() - start >= 0.05
+
+
+class TestMQTTServiceDispatch:
+    """Test handler dispatch from ingest batches."""
+    
+    def test_single_and_batch_handlers(self):
+        service = MQTTService()
+        service.ingest = MQTTIngestPipeline(service._dispatch, worker_count=1)
+        single, batched = [], []
+        service.add_handler("devices/+/status", lambda topic, data: single.append((topic, data)))
+        service.add_handler("devices/+/telemetry", batched.append, batch=True)
+        
+        for topic, value in [("devices/d1/telemetry", 1), ("devices/d1/status", 2), ("devices/d2/telemetry", 3), ("other", 4)]:
+            service.ingest.offer(topic, payload(value=value))
+        service.ingest.start()
+        service.ingest.stop()
+        
+        assert single == [("devices/d1/status", {"value": 2})]
+        assert [[m.data["value"] for m in batch] for batch in batched] == [[1, 3]]
+    
+    def test_overlapping_filters_batch_message_once(self):
+        """Test a batch handler behind two matching filters receives each message once."""
+        service = MQTTService()
+        batched = []
+        
+        class Sink:
+            def store(self, messages):
+                batched.append([m.data["value"] for m in messages])
+        
+        sink = Sink()
+        # Separate bound-method objects for the same handler
+        service.add_handler("devices/+/telemetry", sink.store, batch=True)
+        service.add_handler("devices/#", sink.store, batch=True)
+        service.ingest = MQTTIngestPipeline(service._dispatch, worker_count=1)
+        
+        for topic, value in [("devices/d1/telemetry", 1), ("devices/d1/status", 2)]:
+            service.ingest.offer(topic, payload(value=value))
+        service.ingest.start()
+        service.ingest.stop()
+        
+        assert batched == [[1, 2]]
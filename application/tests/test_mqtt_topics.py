@@ -0,0 +1,59 @@
+"""Tests for MQTT topic filter matching."""
+import pytest
+
+from app.services.mqtt_topics import TopicTrie, validate_topic_filter
+
+
+@pytest.fixture
+def trie():
+    trie = TopicTrie(max_cache_size=2)
+    for topic_filter in ["devices/+/telemetry", "devices/d1/#", "devices/d1/status", "#", "+/+", "$SYS/#"]:
+        trie.add(topic_filter)
+    return trie
+
+
+class TestTopicTrie:
+    """Test wildcard matching and the match cache."""
+    
+    @pytest.mark.parametrize("topic,expected", [
+        ("devices/d1/telemetry", {"devices/+/telemetry", "devices/d1/#", "#"}),
+        ("devices/d2/telemetry", {"devices/+/telemetry", "#"}),
+        ("devices/d1/status", {"devices/d1/#", "devices/d1/status", "#"}),
+        ("devices/d1", {"devices/d1/#", "#", "+/+"}),
+        ("devices/d2/telemetry/extra", {"#"}),
+        ("$SYS/broker/load", {"$SYS/#"}),
+    ])
+    def test_match(self, trie, topic, expected):
+        matched = trie.match(topic)
+        assert set(matched) == expected
+        assert len(matched) == len(expected)
+    
+    def test_cache_hits_and_invalidation(self, trie):
+        assert trie.match("devices/d9/telemetry") == trie.match("devices/d9/telemetry")
+        assert (trie.hits, trie.misses) == (1, 1)
+        
+        assert trie.remove("#")
+        assert "#" not in trie.match("devices/d9/telemetry")
+        assert trie.misses == 2
+    
+    def test_cache_is_bounded(self, trie):
+        for device in range(5):
+            trie.match(f"devices/d{device}/telemetry")
+        assert len(trie._cache) == 2
+    
+    def test_add_and_remove(self, trie):
+        assert not trie.add("devices/+/telemetry")
+        assert len(trie) == 6
+        
+        assert trie.remove("devices/d1/status")
+        assert not trie.remove("devices/d1/status")
+        assert not trie.remove("devices/unknown")
+        assert set(trie.match("devices/d1/status")) == {"devices/d1/#", "#"}
+        assert trie.remove("devices/d1/#")
+        assert "d1" not in trie._root.children["devices"].children
+        assert len(trie) == 4
+    
+    @pytest.mark.parametrize("topic_filter", ["", "devices/#/telemetry", "devices/d+", "devices/a#"])
+    def test_invalid_filters(self, topic_filter):
+        with pytest.raises(ValueError):
+            validate_topic_filter(topic_filter)
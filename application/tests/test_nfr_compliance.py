@@ -80,7 +80,7 @@ class TestNFRCompliance:
         """Test alert filtering functionality."""
         # Generate alerts with different statuses
         nfr_compliance_service.record_metric("NFR-01", "p95_latency_ms", 150.0, "ms")  # Violation
-        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 12000, "devices")  # Violation
+        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 4000, "devices")  # Violation
         
         # Test filtering by status
         critical_alerts = nfr_compliance_service.get_alerts(status=NFRStatus.CRITICAL)
@@ -155,16 +155,23 @@ class TestNFRPerformance:
     
     def test_scalability_requirements(self):
         """Test NFR-02: Scalability requirements."""
-        # Test concurrent devices requirement
-        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 8000, "devices")
+        # Test concurrent devices requirement (higher is better)
+        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 12000, "devices")
         metric = nfr_compliance_service.compliance_status["NFR-02"]["concurrent_devices"]
         assert metric.status == NFRStatus.COMPLIANT
         
         # Test violation
-        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 12000, "devices")
+        nfr_compliance_service.record_metric("NFR-02", "concurrent_devices", 4000, "devices")
         metric = nfr_compliance_service.compliance_status["NFR-02"]["concurrent_devices"]
         assert metric.status in [NFRStatus.WARNING, NFRStatus.VIOLATION, NFRStatus.CRITICAL]
     
+    def test_warning_between_target_and_critical(self):
+        """Test every metric's warning band can be reached between target and critical."""
+        for nfr in nfr_compliance_service.nfr_targets.values():
+            for thresholds in nfr["metrics"].values():
+                low, high = sorted((thresholds["target"], thresholds["critical"]))
+                assert low < thresholds["warning"] < high
+    
     def test_availability_requirements(self):
         """Test NFR-03: Availability requirements."""
         # Test uptime requirement
@@ -0,0 +1,107 @@
+"""Tests for the dashboard rollup engine."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers import monitoring, use_cases
+from app.services.rollup_engine import RollupEngine, rollup_engine, trend, REQUESTS, ANALYSIS, ALL, HOUR
+
+
+class TestRollupEngine:
+    """Test incremental minute/hour bucketing."""
+    
+    def test_window_aggregates(self):
+        """Test events are folded into windows with count, average, extremes and flags."""
+        engine = RollupEngine()
+        now = 1_700_000_000.0
+        engine.record_request(50.0, 200, timestamp=now - 30)
+        engine.record_request(150.0, 503, timestamp=now - 20)
+        engine.record_request(100.0, 404, timestamp=now - 10)
+        
+        window = engine.window(REQUESTS, seconds=HOUR, end=now)
+        assert window["count"] == 3
+        assert window["avg"] == 100.0
+        assert window["max"] == 150.0
+        assert window["min"] == 50.0
+        assert window["flagged"] == 1
+        assert window["errors"] == 1
+    
+    def test_old_buckets_fall_out(self):
+        """Test events outside the window or overwritten slots are not counted."""
+        engine = RollupEngine(minute_slots=10, hour_slots=4)
+        now = 1_700_000_000.0
+        engine.record_request(10.0, 200, timestamp=now - 5 * HOUR)
+        engine.record_request(10.0, 200, timestamp=now - 2 * HOUR)
+        engine.record_request(10.0, 200, timestamp=now)
+        
+        assert engine.window(REQUESTS, seconds=5 * 60, end=now)["count"] == 1
+        assert engine.window(REQUESTS, seconds=3 * HOUR, end=now)["count"] == 2
+        # Older buckets still in the ring are outside the window
+        assert engine.window(REQUESTS, seconds=4 * HOUR, end=now)["count"] == 2
+    
+    def test_analysis_keys(self):
+        """Test analyses are rolled up per use case and device group."""
+        engine = RollupEngine()
+        engine.record_analysis("siren_detection", "north-1", 40.0, confidence=0.9, detected=True)
+        engine.record_analysis("siren_detection", "north-2", 60.0, confidence=0.5)
+        engine.record_analysis("traffic_monitoring", "south-1", 80.0, error=True)
+        
+        summary = engine.use_case_summary()
+        assert summary["siren_detection"]["count"] == 2
+        assert summary["siren_detection"]["flagged"] == 1
+        assert abs(summary["siren_detection"]["avg_confidence"] - 0.7) < 1e-9
+        assert summary["traffic_monitoring"]["errors"] == 1
+        assert engine.window(ANALYSIS, "group:north")["count"] == 2
+        assert engine.window(ANALYSIS, ALL)["count"] == 3
+    
+    def test_trend(self):
+        """Test window comparison."""
+        assert trend(120, 100) == "degrading"
+        assert trend(80, 100) == "improving"
+        assert trend(120, 100, higher_is_worse=False) == "improving"
+        assert trend(101, 100) == "stable"
+        assert trend(5, 0) == "stable"
+
+
+class TestDashboardEndpoints:
+    """Test dashboards are served from the rollups."""
+    
+    def setup_method(self):
+        rollup_engine.clear()
+        app = FastAPI()
+        app.include_router(monitoring.router)
+        app.include_router(use_cases.router)
+        self.client = TestClient(app)
+    
+    def test_use_cases_dashboard(self):
+        """Test the use case dashboard reflects recorded analyses."""
+        rollup_engine.record_analysis("siren_detection", "dash-1", 30.0, confidence=0.95, detected=True)
+        
+        response = self.client.get("/monitoring/dashboard/use-cases")
+        assert response.status_code == 200
+        siren = response.json()["use_cases_data"]["siren_detection"]
+        assert siren["events_processed"] == 1
+        assert siren["sirens_detected"] == 1
+        assert siren["processing_time_ms"] == 30.0
+    
+    def test_dashboard_metrics(self):
+        """Test dashboard metrics count analyses and alerts in the window."""
+        rollup_engine.record_analysis("noise_mapping", "dash-1", 10.0)
+        rollup_engine.record_alert("dash-1", "high")
+        
+        response = self.client.get("/use-cases/dashboard/metrics?hours=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["events_processed"] == 1
+        assert data["alerts_generated"] == 1
+    
+    def test_overview_and_performance(self):
+        """Test overview and performance dashboards use request rollups."""
+        rollup_engine.record_request(20.0, 200)
+        rollup_engine.record_request(40.0, 500)
+        
+        overview = self.client.get("/monitoring/dashboard/overview").json()
+        assert overview["system_metrics"]["error_rate_percent"] > 0
+        
+        performance = self.client.get("/monitoring/dashboard/performance").json()["performance_data"]
+        assert performance["error_metrics"]["5xx_errors"] >= 1
+        assert performance["latency_metrics"]["max_latency_ms"] >= 40.0
@@ -0,0 +1,95 @@
+"""Query-plan regression tests for the managed indexes."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.services.schema_indexes import MANAGED_INDEXES, SchemaIndexManager, index_ddl
+
+# Pre-index shape of the tables the hot queries touch
+LEGACY_SCHEMA = (
+    "CREATE TABLE devices (id VARCHAR PRIMARY KEY, device_id VARCHAR, status VARCHAR, location VARCHAR, "
+    "last_seen DATETIME, created_at DATETIME)",
+    "CREATE TABLE telemetry_data (id VARCHAR PRIMARY KEY, device_id VARCHAR, timestamp DATETIME, data_type VARCHAR, "
+    "processed BOOLEAN, audio_file_path VARCHAR, created_at DATETIME)",
+    "CREATE TABLE alerts (id VARCHAR PRIMARY KEY, device_id VARCHAR, alert_type VARCHAR, severity VARCHAR, "
+    "status VARCHAR, created_at DATETIME, resolved_at DATETIME)",
+)
+
+# Each hot query as the services issue it, with the index it must use
+QUERY_PLANS = (
+    (
+        "SELECT * FROM telemetry_data WHERE device_id = 'd1' ORDER BY timestamp DESC, id DESC LIMIT 51",
+        "ix_telemetry_data_device_id_timestamp"
+    ),
+    (
+        "SELECT id FROM telemetry_data WHERE data_type = 'audio' AND processed = 0 "
+        "AND audio_file_path IS NOT NULL AND (claimed_until IS NULL OR claimed_until < '2024-01-01') "
+        "ORDER BY timestamp LIMIT 5",
+        "ix_telemetry_data_unprocessed_audio"
+    ),
+    (
+        "SELECT * FROM alerts WHERE severity = 'critical' AND status = 'active' ORDER BY created_at DESC",
+        "ix_alerts_status_severity_created_at"
+    ),
+    (
+        "SELECT * FROM alerts WHERE device_id = 'd1' ORDER BY created_at DESC LIMIT 50",
+        "ix_alerts_device_id_created_at"
+    ),
+    (
+        "SELECT * FROM devices WHERE last_seen < '2024-01-01' AND status != 'offline'",
+        "ix_devices_last_seen_status"
+    ),
+    (
+        "SELECT count(*), count(*) FILTER (WHERE status = 'active') FROM devices WHERE swarm_type = 'sound-agent'",
+        "ix_devices_swarm_type_status"
+    ),
+    (
+        "SELECT * FROM devices WHERE swarm_type = 'sound-agent' AND location = 'north'",
+        "ix_devices_swarm_type_location"
+    ),
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        for ddl in LEGACY_SCHEMA:
+            connection.execute(text(ddl))
+    return engine
+
+
+class TestMigration:
+    """Test the migration path for existing databases."""
+    
+    def test_migrate_adds_columns_and_indexes(self, engine):
+        manager = SchemaIndexManager(engine)
+        result = manager.migrate()
+        
+        assert result["columns"] == [
+            "telemetry_data.claimed_by", "telemetry_data.claimed_until", "devices.swarm_type", "devices.tags"
+        ]
+        assert sorted(result["indexes"]) == sorted(spec.name for spec in MANAGED_INDEXES)
+        assert manager.missing_indexes() == []
+        assert manager.migrate() == {"columns": [], "indexes": []}
+    
+    def test_ddl_per_dialect(self):
+        spec = next(spec for spec in MANAGED_INDEXES if spec.name == "ix_telemetry_data_unprocessed_audio")
+        assert index_ddl(spec, postgresql.dialect(), concurrently=True) == (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_telemetry_data_unprocessed_audio ON telemetry_data (timestamp) "
+            "INCLUDE (claimed_until) WHERE processed = false AND data_type = 'audio'"
+        )
+        assert "INCLUDE" not in index_ddl(spec, sqlite.dialect())
+        assert "CONCURRENTLY" not in index_ddl(spec, sqlite.dialect(), concurrently=True)
+
+
+class TestQueryPlans:
+    """Test the hot queries are answered from their index."""
+    
+    @pytest.mark.parametrize("query,index_name", QUERY_PLANS)
+    def test_query_uses_index(self, engine, query, index_name):
+        SchemaIndexManager(engine).migrate()
+        with engine.connect() as connection:
+            plan = " ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+        
+        assert index_name in plan
@@ -0,0 +1,116 @@
+"""Tests for ring buffers and streaming quantile estimation."""
+import numpy as np
+import pytest
+
+from app.services.streaming_metrics import MetricRingBuffer, QuantileSketch
+from app.services.nfr_compliance_service import NFRComplianceService, NFRStatus
+
+
+class TestMetricRingBuffer:
+    """Test fixed-size metric history."""
+    
+    def test_wraps_and_keeps_order(self):
+        """Test the oldest samples are overwritten and reads stay chronological."""
+        buffer = MetricRingBuffer(capacity=5)
+        for i in range(8):
+            buffer.append(float(i), timestamp=1000.0 + i)
+        
+        assert len(buffer) == 5
+        assert buffer.last(3).tolist() == [5.0, 6.0, 7.0]
+        
+        timestamps, values = buffer.since(0)
+        assert values.tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+        assert timestamps.tolist() == sorted(timestamps.tolist())
+        
+        _, recent = buffer.since(1006.0)
+        assert recent.tolist() == [6.0, 7.0]
+    
+    def test_last_before_full(self):
+        """Test reads of a partially filled buffer."""
+        buffer = MetricRingBuffer(capacity=10)
+        buffer.append(1.0)
+        buffer.append(2.0)
+        assert buffer.last(10).tolist() == [1.0, 2.0]
+
+
+class TestQuantileSketch:
+    """Test streaming percentile estimation."""
+    
+    def test_percentiles_within_relative_accuracy(self):
+        """Test p50/p95/p99 match exact percentiles within the configured error."""
+        rng = np.random.default_rng(42)
+        samples = rng.lognormal(mean=3.5, sigma=0.6, size=20000)
+        
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        sketch.add_many(samples[:10000])
+        for value in samples[10000:]:
+            sketch.add(float(value))
+        
+        assert sketch.count == 20000
+        for q in (0.50, 0.95, 0.99):
+            exact = np.quantile(samples, q)
+            assert abs(sketch.quantile(q) - exact) / exact < 0.03
+    
+    def test_empty_and_reset(self):
+        """Test an empty sketch reports no percentiles."""
+        sketch = QuantileSketch()
+        assert sketch.quantile(0.95) is None
+        sketch.add(10.0)
+        assert sketch.quantile(0.95) is not None
+        sketch.reset()
+        assert sketch.percentiles() == {"p50": None, "p95": None, "p99": None}
+
+
+class TestNFRLatencyPercentiles:
+    """Test NFR-01 p95 latency from raw request samples."""
+    
+    def test_evaluate_records_p95(self):
+        """Test evaluating raw samples records p95 against NFR-01 and resets the window."""
+        service = NFRComplianceService()
+        for latency in range(1, 101):
+            service.record_latency_sample(float(latency))
+        
+        percentiles = service.evaluate_latency_percentiles()
+        
+        assert abs(percentiles["p95"] - 95) / 95 < 0.03
+        assert len(service.metrics_history["NFR-01"]["p95_latency_ms"]) == 1
+        assert "p95_latency_ms" in service.compliance_status["NFR-01"]
+        assert service.get_latency_percentiles()["samples"] == 0
+    
+    def test_healthy_latency_is_compliant(self):
+        """Test a window well under the p95 target raises no alert."""
+        service = NFRComplianceService()
+        for latency in range(1, 51):
+            service.record_latency_sample(float(latency))
+        
+        service.evaluate_latency_percentiles()
+        
+        assert service.compliance_status["NFR-01"]["p95_latency_ms"].status == NFRStatus.COMPLIANT
+        assert service.alerts == []
+    
+    @pytest.mark.parametrize("latency,status", [
+        (105.0, NFRStatus.WARNING),
+        (115.0, NFRStatus.VIOLATION),
+        (250.0, NFRStatus.CRITICAL)
+    ])
+    def test_breaching_latency_alerts(self, latency, status):
+        """Test a window over the p95 target is flagged by how far it breaches."""
+        service = NFRComplianceService()
+        for _ in range(100):
+            service.record_latency_sample(latency)
+        
+        service.evaluate_latency_percentiles()
+        
+        assert service.compliance_status["NFR-01"]["p95_latency_ms"].status == status
+        assert [alert["status"] for alert in service.alerts] == [status.value]
+    
+    def test_history_is_bounded(self):
+        """Test metric history never grows past its capacity."""
+        service = NFRComplianceService(history_size=50)
+        for i in range(120):
+            service.record_metric("NFR-08", "query_response_s", float(i), "s")
+        
+        history = service.get_metric_history("NFR-08", "query_response_s")
+        assert len(history) == 50
+        assert history[-1]["value"] == 119.0
+        assert history[0]["unit"] == "s"
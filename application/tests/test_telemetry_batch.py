@@ -0,0 +1,114 @@
+"""Batch telemetry ingest tests."""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_async_telemetry_service
+from app.api.routers import telemetry as telemetry_router
+from app.config import settings
+from app.models.database import TelemetryData
+from app.schemas.telemetry import BatchItemStatus
+from app.services.telemetry_service import TelemetryService
+
+
+def reading(device_id: str, value: float = 21.5) -> dict:
+    return {"device_id": device_id, "data_type": "sensor", "payload": {"temperature": value}}
+
+
+class SyncTelemetryService:
+    """Stands in for the async service, running the real service on the test session."""
+    
+    def __init__(self, session):
+        self.service = TelemetryService(session)
+    
+    async def create_telemetry_batch(self, readings):
+        return self.service.create_telemetry_batch(readings)
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(telemetry_router.router)
+    app.dependency_overrides[get_async_telemetry_service] = lambda: SyncTelemetryService(db_session)
+    return TestClient(app)
+
+
+class TestCreateTelemetryBatch:
+    """Test the batch service method."""
+    
+    def test_mixed_items_reported_individually(self, db_session, make_device):
+        """Test valid, invalid and unknown-device readings in one batch."""
+        make_device("sensor-001")
+        make_device("sensor-002")
+        readings = [
+            reading("sensor-001"),
+            {"device_id": "sensor-001", "data_type": "not-a-type", "payload": {}},
+            reading("unknown-device"),
+            reading("sensor-002", 19.0),
+            "not-an-object"
+        ]
+        
+        result = TelemetryService(db_session).create_telemetry_batch(readings)
+        
+        assert (result.total, result.created, result.failed) == (5, 2, 3)
+        assert [r.index for r in result.results] == [0, 1, 2, 3, 4]
+        assert [r.status for r in result.results] == [
+            BatchItemStatus.CREATED,
+            BatchItemStatus.INVALID,
+            BatchItemStatus.DEVICE_NOT_FOUND,
+            BatchItemStatus.CREATED,
+            BatchItemStatus.INVALID
+        ]
+        
+        stored = {row.id: row for row in db_session.query(TelemetryData).all()}
+        assert set(stored) == {result.results[0].id, result.results[3].id}
+        assert stored[result.results[3].id].payload == {"temperature": 19.0}
+
+
+class TestBatchEndpoint:
+    """Test body parsing, limits and status codes of POST /telemetry/batch."""
+    
+    def test_all_created_returns_201(self, client, make_device):
+        make_device("sensor-001")
+        
+        response = client.post("/telemetry/batch", json=[reading("sensor-001"), reading("sensor-001", 22.0)])
+        
+        assert response.status_code == 201
+        assert response.json()["created"] == 2
+    
+    def test_partial_result_returns_207(self, client, make_device):
+        make_device("sensor-001")
+        
+        response = client.post("/telemetry/batch", json=[reading("sensor-001"), reading("unknown-device")])
+        
+        assert response.status_code == 207
+        body = response.json()
+        assert (body["created"], body["failed"]) == (1, 1)
+        assert body["results"][1]["status"] == BatchItemStatus.DEVICE_NOT_FOUND.value
+    
+    def test_ndjson_body(self, client, make_device):
+        make_device("sensor-001")
+        body = "\n".join(json.dumps(reading("sensor-001", value)) for value in (1.0, 2.0, 3.0)) + "\n\n"
+        
+        response = client.post(
+            "/telemetry/batch", content=body, headers={"content-type": "application/x-ndjson"}
+        )
+        
+        assert response.status_code == 201
+        assert response.json()["created"] == 3
+    
+    def test_batch_size_limit(self, client, make_device, monkeypatch):
+        make_device("sensor-001")
+        monkeypatch.setattr(settings, "telemetry_batch_max_items", 2)
+        
+        response = client.post("/telemetry/batch", json=[reading("sensor-001")] * 3)
+        
+        assert response.status_code == 413
+        assert client.post("/telemetry/batch", json=[reading("sensor-001")] * 2).status_code == 201
+    
+    @pytest.mark.parametrize("body", ["{not json", "{}", "[]"])
+    def test_rejects_malformed_bodies(self, client, body):
+        response = client.post("/telemetry/batch", content=body, headers={"content-type": "application/json"})
+        assert response.status_code == 400
@@ -0,0 +1,158 @@
+"""Tests for telemetry day partitioning and retention planning."""
+from datetime import date
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from sqlalchemy import create_engine
+
+from app.services.telemetry_partitions import (
+    TelemetryPartitionManager, legacy_index_name, partition_name, partition_day, plan_retention,
+    DETACH, DROP, MOVE_TO_WARM
+)
+
+
+class TestPartitionNaming:
+    """Test partition names round-trip to days."""
+    
+    def test_round_trip(self):
+        day = date(2024, 3, 9)
+        assert partition_name(day) == "telemetry_data_p20240309"
+        assert partition_day(partition_name(day)) == day
+    
+    def test_other_tables_ignored(self):
+        assert partition_day("telemetry_data_default") is None
+        assert partition_day("telemetry_data") is None
+
+
+class TestRetentionPlan:
+    """Test hot/warm/cold retention decisions."""
+    
+    def plan(self, partitions, warm_tablespace=None):
+        return dict(plan_retention(
+            partitions, date(2024, 6, 30), hot_days=7, warm_days=30, cold_days=365,
+            warm_tablespace=warm_tablespace
+        ))
+    
+    def test_attached_partitions(self):
+        """Test partitions are detached past warm retention and dropped past cold retention."""
+        plan = self.plan([
+            ("telemetry_data_p20240629", True, None),  # yesterday: hot
+            ("telemetry_data_p20240530", True, None),  # 30 full days since it ended
+            ("telemetry_data_p20240531", True, None),  # 29 full days since it ended
+            ("telemetry_data_p20230601", True, None)   # past cold retention
+        ])
+        assert plan == {
+            "telemetry_data_p20240530": DETACH,
+            "telemetry_data_p20230601": DROP
+        }
+    
+    def test_detached_partitions_dropped_after_cold(self):
+        """Test detached archives are kept until cold retention."""
+        plan = self.plan([
+            ("telemetry_data_p20240101", False, None),
+            ("telemetry_data_p20230101", False, None)
+        ])
+        assert plan == {"telemetry_data_p20230101": DROP}
+    
+    def test_warm_tablespace(self):
+        """Test partitions past hot retention move to the warm tablespace once."""
+        plan = self.plan([
+            ("telemetry_data_p20240620", True, None),
+            ("telemetry_data_p20240619", True, "warm"),
+            ("telemetry_data_p20240628", True, None)
+        ], warm_tablespace="warm")
+        assert plan == {"telemetry_data_p20240620": MOVE_TO_WARM}
+
+
+class TestPartitionManager:
+    """Test the manager is inert on databases without partitioning."""
+    
+    def test_sqlite_not_supported(self):
+        manager = TelemetryPartitionManager(create_engine("sqlite://"))
+        assert not manager.supported
+        assert not manager.is_partitioned()
+        assert manager.run_maintenance() == {}
+
+
+class TestEnsurePartitions:
+    """Test partition creation with rows already in the default partition."""
+    
+    def executed_sql(self, stranded_rows):
+        engine = MagicMock()
+        connection = engine.begin.return_value.__enter__.return_value
+        connection.execute.return_value.scalar.return_value = stranded_rows
+        TelemetryPartitionManager(engine)._create_day_partition("telemetry_data_p20240630", date(2024, 6, 30))
+        return [str(call.args[0]) for call in connection.execute.call_args_list]
+    
+    def test_empty_range_created_directly(self):
+        sql = self.executed_sql(0)
+        assert len(sql) == 2
+        assert sql[1].startswith("CREATE TABLE IF NOT EXISTS telemetry_data_p20240630 PARTITION OF telemetry_data")
+    
+    def test_stranded_rows_moved_before_attach(self):
+        """Test rows for the day leave the default partition before the partition is attached."""
+        sql = self.executed_sql(3)
+        assert "DELETE FROM telemetry_data_default" in sql[2]
+        assert "INSERT INTO telemetry_data_p20240630" in sql[2]
+        assert sql[3].startswith("ALTER TABLE telemetry_data ATTACH PARTITION telemetry_data_p20240630")
+    
+    def test_one_failure_keeps_other_partitions(self):
+        """Test each day partition is created independently."""
+        manager = TelemetryPartitionManager(MagicMock())
+        
+        def create(name, day):
+            if day == date(2024, 6, 30):
+                raise RuntimeError("updated partition constraint for default partition would be violated")
+        
+        with patch.object(manager, "is_partitioned", return_value=True), \
+                patch.object(manager, "list_partitions", return_value=[]), \
+                patch.object(manager, "_create_day_partition", side_effect=create) as create_day:
+            assert manager.ensure_partitions(days_ahead=2, today=date(2024, 6, 30)) == 3
+        
+        assert [call.args[0] for call in create_day.call_args_list] == [
+            "telemetry_data_p20240629", "telemetry_data_p20240630", "telemetry_data_p20240701", "telemetry_data_p20240702"
+        ]
+
+
+class TestMigrateToPartitioned:
+    """Test the in-place migration keeps telemetry_data indexed."""
+    
+    INDEXES = [
+        ("ix_telemetry_data_device_id", "CREATE INDEX ix_telemetry_data_device_id ON public.telemetry_data USING btree (device_id)"),
+        ("ix_telemetry_data_timestamp", "CREATE INDEX ix_telemetry_data_timestamp ON public.telemetry_data USING btree (\"timestamp\")"),
+        (
+            "ix_telemetry_data_device_id_timestamp",
+            "CREATE INDEX ix_telemetry_data_device_id_timestamp ON public.telemetry_data "
+            "USING btree (device_id, \"timestamp\" DESC)"
+        )
+    ]
+    
+    def test_parent_gets_legacy_indexes(self):
+        engine = MagicMock()
+        connection = engine.begin.return_value.__enter__.return_value
+        connection.execute.return_value.all.return_value = self.INDEXES
+        manager = TelemetryPartitionManager(engine)
+        
+        with patch.object(TelemetryPartitionManager, "supported", new_callable=PropertyMock, return_value=True), \
+                patch.object(manager, "is_partitioned", return_value=False), \
+                patch.object(manager, "ensure_partitions"):
+            manager.migrate_to_partitioned(today=date(2024, 6, 30))
+        
+        sql = [str(call.args[0]) for call in connection.execute.call_args_list]
+        renames = [i for i, statement in enumerate(sql) if statement.startswith("ALTER INDEX")]
+        parent = sql.index(
+            "CREATE TABLE telemetry_data (LIKE telemetry_data_p20240629 INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        attach = next(i for i, statement in enumerate(sql) if "ATTACH PARTITION telemetry_data_p20240629" in statement)
+        
+        # Legacy indexes give up their names before the parent claims them
+        assert sql[renames[0]] == (
+            "ALTER INDEX ix_telemetry_data_device_id RENAME TO ix_telemetry_data_p20240629_device_id"
+        )
+        assert len(renames) == 3 and max(renames) < parent
+        for _, definition in self.INDEXES:
+            assert parent < sql.index(definition) < attach
+    
+    def test_legacy_index_names_fit_postgres_limit(self):
+        assert legacy_index_name("custom_idx", "telemetry_data_p20240629") == "telemetry_data_p20240629_custom_idx"
+        assert len(legacy_index_name("ix_telemetry_data_" + "x" * 50, "telemetry_data_p20240629")) == 63
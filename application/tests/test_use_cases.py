@@ -261,6 +261,35 @@ class TestUnifiedAnalysis:
         assert isinstance(result.alerts_generated, list)
         assert isinstance(result.recommendations, list)
     
+    @pytest.mark.asyncio
+    async def test_unified_analysis_decodes_once(self):
+        """Test the clip is decoded and featurised once for all use cases."""
+        import io
+        import soundfile as sf
+        
+        t = np.arange(44100) / 22050
+        buffer = io.BytesIO()
+        sf.write(buffer, (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32), 22050, format="WAV")
+        
+        request = UnifiedAnalysisRequest(
+            device_id="test-device-009",
+            location="Mixed Zone",
+            audio_data=buffer.getvalue(),
+            use_cases=list(UseCaseType),
+            priority=3
+        )
+        
+        with patch.object(use_case_ml_service, "decode_audio", wraps=use_case_ml_service.decode_audio) as decode, \
+             patch.object(use_case_ml_service, "extract_enhanced_features",
+                          wraps=use_case_ml_service.extract_enhanced_features) as extract:
+            result = await use_case_ml_service.analyze_unified(request)
+        
+        assert decode.call_count == 1
+        assert extract.call_count == 1
+        assert len(result.results) == len(UseCaseType)
+        assert result.results[UseCaseType.NOISE_MAPPING]["spl_db"] != 0.0
+        assert result.results[UseCaseType.TRAFFIC_MONITORING]["features"]
+    
     def test_all_use_cases_enabled(self):
         """Test that all use cases are enabled."""
         enabled_use_cases = [